@@ -0,0 +1,497 @@
+"""
+Performance benchmarks for the budget app.
+
+    python benchmarks.py startup                 # import and first-output latency
+    python benchmarks.py startup --budget-ms 100 # exit with 1 if reports start slower
+    python benchmarks.py suite --json new.json   # load/mutate/report/chart timings
+    python benchmarks.py compare old.json new.json  # exit with 1 on regressions
+
+Each startup measurement runs in a fresh interpreter so nothing is already
+imported. Times are taken inside that interpreter, from just after it
+started to the moment in question, so they do not include Python's own
+start-up cost.
+
+The suite generates synthetic ledgers (10k, 100k and 1M rows by default)
+and times TransactionManager loads and mutations, every Reports summary and
+the data preparation behind each chart, on each size.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Text-only report runs must print their first line within this many ms
+STARTUP_BUDGET_MS = 100
+
+# Code run in a child interpreter for each startup case. Each prints one
+# JSON object of {measurement: milliseconds}.
+_IMPORT_CASE = """
+import json, time
+start = time.perf_counter()
+import {module}
+print(json.dumps({{"import {module}": (time.perf_counter() - start) * 1000}}))
+"""
+
+_REPORTS_CASE = """
+import io, json, sys, time
+start = time.perf_counter()
+
+class FirstWrite(io.StringIO):
+    first = None
+    def write(self, text):
+        if self.first is None:
+            self.first = time.perf_counter()
+        return super().write(text)
+
+sys.stdout = out = FirstWrite()
+import main
+sys.argv = ["main.py", "reports", "--no-charts", "--file", {ledger!r}]
+main.main()
+done = time.perf_counter()
+sys.stdout = sys.__stdout__
+print(json.dumps({{
+    "reports first output": (out.first - start) * 1000,
+    "reports total": (done - start) * 1000,
+}}))
+"""
+
+_GUI_CASE = """
+import json, time
+start = time.perf_counter()
+from gui import MainGui
+imported = time.perf_counter()
+app = MainGui()
+app.root.update()
+shown = time.perf_counter()
+try:
+    app.on_close()
+except SystemExit:
+    pass  # on_close ends the program; the timings still need printing
+print(json.dumps({
+    "import gui": (imported - start) * 1000,
+    "gui first window": (shown - start) * 1000,
+}))
+"""
+
+
+def _run_case(code):
+    """
+    Run one case in a fresh interpreter and return its timings.
+
+    Returns:
+        dict: The timings, or None if the case failed or printed nothing
+        (its stderr is passed on so the cause is visible).
+    """
+    result = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True)
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not lines:
+        if result.stderr.strip():
+            print(f"benchmark case failed:\n{result.stderr.strip()}", file=sys.stderr)
+        return None
+    return json.loads(lines[-1])
+
+
+def _write_sample_ledger(path, rows=100):
+    """Write a small ledger for the report startup case."""
+    with open(path, "w", newline="") as f:
+        f.write("id,transaction_name,transaction_category,date,income_expense,amount,essential\n")
+        for i in range(1, rows + 1):
+            kind = "income" if i % 5 == 0 else "expense"
+            f.write(f"{i},Item {i},Food,2025-{i % 12 + 1:02d}-{i % 28 + 1:02d},{kind},{i * 1.25:.2f},no\n")
+
+
+def startup_benchmark(repeat=5, gui=True):
+    """
+    Measure cold import and first-output latency.
+
+    Args:
+        repeat (int): Runs per case; the median is reported.
+        gui (bool): Also time the GUI's first window (needs a display).
+
+    Returns:
+        dict: measurement name -> median milliseconds. Cases that could not
+        run (e.g. the GUI without a display) are left out.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ledger = os.path.join(tmp_dir, "transactions.csv")
+        _write_sample_ledger(ledger)
+        cases = [_IMPORT_CASE.format(module=m) for m in ("transactions", "reports", "main")]
+        cases.append(_REPORTS_CASE.format(ledger=ledger))
+        if gui:
+            cases.append(_GUI_CASE)
+
+        samples = {}
+        for code in cases:
+            for _ in range(repeat):
+                timings = _run_case(code)
+                if timings is None:
+                    break
+                for name, ms in timings.items():
+                    samples.setdefault(name, []).append(ms)
+    return {name: statistics.median(values) for name, values in samples.items()}
+
+
+# Expense categories of the synthetic ledgers:
+# (category, weight, transaction names, amount range, essential)
+LEDGER_CATEGORIES = [
+    ("Food", 30, ["Groceries", "Restaurant", "Coffee", "Takeout"], (3, 150), "yes"),
+    ("Transportation", 15, ["Bus fare", "Gas", "Parking", "Train ticket"], (2, 80), "yes"),
+    ("Housing", 5, ["Rent", "Electricity", "Internet", "Water"], (40, 1800), "yes"),
+    ("Entertainment", 12, ["Movies", "Concert", "Streaming", "Games"], (5, 120), "no"),
+    ("Shopping", 12, ["Clothes", "Electronics", "Books", "Gifts"], (10, 400), "no"),
+    ("Health", 6, ["Pharmacy", "Doctor", "Gym"], (10, 250), "yes"),
+    ("Education", 4, ["Tuition", "Course", "Supplies"], (15, 900), "yes"),
+]
+LEDGER_INCOME = ("Income", ["Salary", "Freelance", "Refund", "Interest"], (20, 3500))
+
+# Share of generated rows that are income
+INCOME_SHARE = 0.08
+
+DEFAULT_SIZES = ["10k", "100k", "1M"]
+
+# A case must get this much slower (and by at least COMPARE_MIN_MS) to
+# count as a regression in compare mode
+COMPARE_THRESHOLD_PERCENT = 10.0
+COMPARE_MIN_MS = 1.0
+
+
+def parse_size(text):
+    """Turn '10k', '1M' or '2500' into a row count."""
+    text = text.strip()
+    multiplier = {"k": 1000, "m": 1000 * 1000}.get(text[-1:].lower(), 1)
+    digits = text[:-1] if multiplier != 1 else text
+    return int(float(digits) * multiplier)
+
+
+def size_label(rows):
+    """Turn a row count into the short label results are keyed by ('10k', '1M')."""
+    for suffix, unit in (("M", 1000 * 1000), ("k", 1000)):
+        if rows >= unit and rows % unit == 0:
+            return f"{rows // unit}{suffix}"
+    return str(rows)
+
+
+def generate_ledger(path, rows, seed=0, start=datetime.date(2020, 1, 1), years=5):
+    """
+    Write a synthetic transactions CSV file.
+
+    Rows are in date order, spread evenly over the given number of years.
+    Categories, names and amounts are drawn from LEDGER_CATEGORIES (and
+    LEDGER_INCOME for about INCOME_SHARE of the rows), so summaries and
+    charts have realistic shapes. The same seed gives the same file.
+
+    Args:
+        path (str): CSV file to write
+        rows (int): Number of transactions
+        seed (int): Random seed
+        start (date): Date of the first transaction
+        years (int): Time span of the ledger
+    """
+    rng = random.Random(seed)
+    days = 365 * years
+    weights = [weight for _, weight, _, _, _ in LEDGER_CATEGORIES]
+    lines = ["id,transaction_name,transaction_category,date,income_expense,amount,essential\n"]
+    for i in range(rows):
+        day = (start + datetime.timedelta(days=i * days // max(rows, 1))).isoformat()
+        if rng.random() < INCOME_SHARE:
+            category, names, (low, high) = LEDGER_INCOME
+            kind, essential = "income", "no"
+        else:
+            category, _, names, (low, high), essential = rng.choices(LEDGER_CATEGORIES, weights)[0]
+            kind = "expense"
+        amount = round(rng.uniform(low, high), 2)
+        lines.append(f"{i + 1},{rng.choice(names)},{category},{day},{kind},{amount},{essential}\n")
+    with open(path, "w", newline="") as f:
+        f.writelines(lines)
+
+
+def _time_ms(func, repeat):
+    """Run func repeat times and return the median wall time in ms."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _load_cases(path, repeat):
+    """Time every way of loading the ledger at path."""
+    import ledger, scanner, snapshot  # noqa: F401 (NumPy import is not part of a timed load)
+    from reports import Reports
+    from storage import CsvBackend
+    from transactions import TransactionManager
+
+    # Load once so a snapshot is built where the app would have one
+    warm = TransactionManager(path)
+    warm.refresh()
+    snapshot = warm.backend.snapshot()
+    if snapshot is not None:
+        snapshot.wait()
+
+    reports = Reports()
+    return {
+        "load": _time_ms(lambda: TransactionManager(path).refresh(), repeat),
+        "load (no snapshot)": _time_ms(
+            lambda: TransactionManager(path, backend=CsvBackend(path, snapshot_min_bytes=None)).refresh(),
+            repeat),
+        "load_transactions_from_csv": _time_ms(lambda: reports.load_transactions_from_csv(path), repeat),
+        "load_ledger": _time_ms(lambda: reports.load_ledger(path), repeat),
+        "scan_csv": _time_ms(lambda: reports.scan_csv(path), repeat),
+    }
+
+
+def _mutation_cases(path, ops, seed=0):
+    """Time single add, update and delete calls (median per call) on a copy of the ledger."""
+    from storage import CsvBackend
+    from transactions import TransactionManager
+
+    work = path + ".mutations.csv"
+    shutil.copyfile(path, work)
+    try:
+        # No snapshot: a background rebuild would compete with the timed calls
+        tm = TransactionManager(work, backend=CsvBackend(work, snapshot_min_bytes=None))
+        tm.refresh()
+        rng = random.Random(seed)
+        ids = rng.sample(list(tm._rows), min(2 * ops, len(tm._rows)))
+        to_update, to_delete = ids[:ops], ids[ops:]
+
+        def timed(calls):
+            samples = []
+            for call in calls:
+                start = time.perf_counter()
+                call()
+                samples.append((time.perf_counter() - start) * 1000)
+            return statistics.median(samples) if samples else None
+
+        results = {
+            "add_transaction": timed(
+                [lambda: tm.add_transaction("Coffee", "Food", "2025-01-01", "expense", 4.5, "no")] * ops),
+            "update_transaction": timed(
+                [lambda i=i: tm.update_transaction(i, {"amount": 12.34}) for i in to_update]),
+            "delete_transaction": timed([lambda i=i: tm.delete_transaction(i) for i in to_delete]),
+        }
+        return {name: ms for name, ms in results.items() if ms is not None}
+    finally:
+        os.remove(work)
+
+
+def _report_cases(transactions, repeat):
+    """Time every Reports summary on a list of transactions."""
+    from reports import Reports
+
+    reports = Reports()
+    cases = {
+        "calculate_total_income": reports.calculate_total_income,
+        "calculate_total_expenses": reports.calculate_total_expenses,
+        "calculate_balance": reports.calculate_balance,
+        "get_monthly_summary": reports.get_monthly_summary,
+        "get_category_summary": reports.get_category_summary,
+        "get_top_expenses": reports.get_top_expenses,
+        "compute_all": reports.compute_all,
+    }
+    return {name: _time_ms(lambda f=func: f(transactions), repeat) for name, func in cases.items()}
+
+
+def _chart_cases(transactions, repeat):
+    """Time the data preparation and drawing (without rendering) of each chart."""
+    import pandas  # noqa: F401 (imported here so the first timed draw does not pay for it)
+    from matplotlib.figure import Figure
+
+    import reports as reports_module
+    from charts import DecimatedSeries
+    from ledger import cumulative_balance_series
+
+    reports = reports_module.Reports()
+    dates, balances = cumulative_balance_series(transactions)
+    results = {
+        "cumulative_balance_series": _time_ms(lambda: cumulative_balance_series(transactions), repeat),
+        "decimate balance (800 px)": _time_ms(
+            lambda: DecimatedSeries(dates.astype("int64"), balances).points(800), repeat),
+    }
+    for chart, (method, figsize) in reports_module.CHARTS.items():
+        draw = getattr(reports, method)
+        results[f"draw {chart}"] = _time_ms(
+            lambda d=draw, size=figsize: d(Figure(figsize=size).add_subplot(), transactions), repeat)
+    return results
+
+
+def suite_benchmark(sizes=DEFAULT_SIZES, repeat=3, ops=5, charts=True, progress=None):
+    """
+    Time loads, mutations, report summaries and chart preparation on
+    synthetic ledgers.
+
+    Args:
+        sizes (list): Ledger sizes, as row counts or labels like '100k'
+        repeat (int): Runs per case; the median is reported
+        ops (int): Calls timed for each mutation
+        charts (bool): Also time chart preparation (imports matplotlib)
+        progress (callable): Called with a message before each size
+
+    Returns:
+        dict: size label -> {case name: median milliseconds}
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            rows = parse_size(str(size))
+            label = size_label(rows)
+            if progress is not None:
+                progress(f"{label} rows")
+            path = os.path.join(tmp_dir, f"ledger_{label}.csv")
+            generate_ledger(path, rows)
+
+            from transactions import TransactionManager
+            transactions = TransactionManager(path).load_transactions()
+
+            timings = _load_cases(path, repeat)
+            timings.update(_mutation_cases(path, ops))
+            timings.update(_report_cases(transactions, repeat))
+            if charts:
+                timings.update(_chart_cases(transactions, repeat))
+            results[label] = timings
+    return results
+
+
+def _flatten(results, prefix=""):
+    """Turn nested {size: {case: ms}} results into {'size/case': ms}."""
+    flat = {}
+    for name, value in results.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{name}/"))
+        else:
+            flat[prefix + name] = value
+    return flat
+
+
+def load_results(path):
+    """Read a results file written by the startup or suite mode as {case: ms}."""
+    with open(path) as f:
+        data = json.load(f)
+    return _flatten(data.get("results", data))
+
+
+def compare_results(base, new, threshold=COMPARE_THRESHOLD_PERCENT, min_ms=COMPARE_MIN_MS):
+    """
+    Compare two sets of timings.
+
+    Args:
+        base, new (dict): case name -> milliseconds
+        threshold (float): Percent slowdown that counts as a regression
+        min_ms (float): Slowdowns smaller than this many ms are noise
+
+    Returns:
+        list: (case, base ms, new ms, percent change, status) for every case
+        in both sets, where status is 'regression', 'improvement' or 'ok'
+    """
+    rows = []
+    for name in base:
+        if name not in new:
+            continue
+        before, after = base[name], new[name]
+        change = (after - before) / before * 100 if before else 0.0
+        if change > threshold and after - before >= min_ms:
+            status = "regression"
+        elif change < -threshold and before - after >= min_ms:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append((name, before, after, change, status))
+    return rows
+
+
+def _run_startup(args):
+    results = startup_benchmark(args.repeat, gui=not args.no_gui)
+    for name, ms in results.items():
+        print(f"{name:<24} {ms:8.1f} ms")
+    if not args.no_gui and "gui first window" not in results:
+        print("gui first window         skipped (no display?)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    first_output = results.get("reports first output")
+    if first_output is None or first_output > args.budget_ms:
+        print(f"Text reports must print within {args.budget_ms:.0f} ms")
+        return 1
+    return 0
+
+
+def _run_suite(args):
+    results = suite_benchmark(args.sizes, args.repeat, args.ops, charts=not args.no_charts,
+                              progress=lambda message: print(f"== {message}", flush=True))
+    for label, timings in results.items():
+        print(f"\n{label} rows")
+        for name, ms in timings.items():
+            print(f"  {name:<30} {ms:10.2f} ms")
+    with open(args.json, "w") as f:
+        json.dump({
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "results": results,
+        }, f, indent=2)
+    print(f"\nWrote {args.json}")
+    return 0
+
+
+def _run_compare(args):
+    base, new = load_results(args.base), load_results(args.new)
+    rows = compare_results(base, new, args.threshold, args.min_ms)
+    for name, before, after, change, status in rows:
+        flag = {"regression": "  REGRESSION", "improvement": "  faster"}.get(status, "")
+        print(f"{name:<45} {before:10.2f} -> {after:10.2f} ms {change:+7.1f}%{flag}")
+    for name in sorted(set(base) ^ set(new)):
+        print(f"{name:<45} only in {'base' if name in base else 'new'}")
+
+    regressions = sum(1 for row in rows if row[4] == "regression")
+    print(f"{regressions} regression(s) over {args.threshold:g}%")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Budget app benchmarks")
+    modes = parser.add_subparsers(dest="mode", required=True)
+
+    startup_parser = modes.add_parser("startup", help="time imports and first output")
+    startup_parser.add_argument("--repeat", type=int, default=5, help="runs per case (default: 5)")
+    startup_parser.add_argument("--no-gui", action="store_true", help="skip the GUI first-window case")
+    startup_parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS,
+                                help="fail if text reports print later than this (default: 100)")
+    startup_parser.add_argument("--json", metavar="FILE", help="also write the results to FILE")
+
+    suite_parser = modes.add_parser("suite", help="time loads, mutations, reports and charts")
+    suite_parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES,
+                              help="ledger sizes in rows, e.g. 10k 100k 1M (default)")
+    suite_parser.add_argument("--repeat", type=int, default=3, help="runs per case (default: 3)")
+    suite_parser.add_argument("--ops", type=int, default=5, help="calls per mutation case (default: 5)")
+    suite_parser.add_argument("--no-charts", action="store_true", help="skip the chart cases")
+    suite_parser.add_argument("--json", metavar="FILE", default="benchmark_results.json",
+                              help="results file (default: benchmark_results.json)")
+
+    compare_parser = modes.add_parser("compare", help="flag regressions between two results files")
+    compare_parser.add_argument("base", help="results of the earlier run")
+    compare_parser.add_argument("new", help="results of the run to check")
+    compare_parser.add_argument("--threshold", type=float, default=COMPARE_THRESHOLD_PERCENT,
+                                help="percent slowdown that counts as a regression (default: 10)")
+    compare_parser.add_argument("--min-ms", type=float, default=COMPARE_MIN_MS,
+                                help="ignore slowdowns smaller than this (default: 1 ms)")
+
+    args = parser.parse_args(argv)
+    return {"startup": _run_startup, "suite": _run_suite, "compare": _run_compare}[args.mode](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
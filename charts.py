@@ -0,0 +1,173 @@
+"""
+Helpers for drawing long series quickly and readably.
+
+A line chart only has so many pixels across, so plotting more points than
+that costs time without showing anything extra. DecimatedSeries reduces a
+series to about one or two points per pixel column, using LTTB
+(largest-triangle-three-buckets) or a min/max envelope per bucket, and
+caches the result for each zoom level it has been asked for.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from money import format_money
+
+# Only draw point markers when a series is this short
+MARKER_LIMIT = 200
+
+
+def money_axis(axis):
+    """
+    Label an axis' ticks as money, e.g. '$1,250.00'.
+
+    Args:
+        axis: A matplotlib Axis, such as ax.yaxis.
+    """
+    from matplotlib.ticker import FuncFormatter
+
+    axis.set_major_formatter(FuncFormatter(lambda value, _: format_money(value)))
+
+
+def decimate_lttb(x, y, n_out):
+    """
+    Downsample with largest-triangle-three-buckets.
+
+    Keeps the first and last points and, from each bucket in between, the
+    point forming the largest triangle with the previously kept point and
+    the average of the next bucket. Preserves the visual shape well.
+
+    Args:
+        x, y (ndarray): Series to downsample, x ascending.
+        n_out (int): Number of points to keep.
+
+    Returns:
+        tuple: (x, y) arrays of at most n_out points.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        keep[i + 1] = a
+    return x[keep], y[keep]
+
+
+def decimate_minmax(x, y, n_buckets):
+    """
+    Downsample to the minimum and maximum of each bucket.
+
+    Guarantees every peak and dip survives, at up to two points per bucket.
+
+    Args:
+        x, y (ndarray): Series to downsample, x ascending.
+        n_buckets (int): Number of equal-count buckets.
+
+    Returns:
+        tuple: (x, y) arrays of at most 2 * n_buckets points.
+    """
+    n = len(x)
+    if 2 * n_buckets >= n or n_buckets < 1:
+        return x, y
+
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+    keep = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        lo = start + int(y[start:end].argmin())
+        hi = start + int(y[start:end].argmax())
+        keep.extend(sorted({lo, hi}))
+    keep = np.asarray(keep, dtype=np.int64)
+    return x[keep], y[keep]
+
+
+class DecimatedSeries:
+    """
+    A series that hands out pixel-width-sized versions of itself.
+
+    Args:
+        x, y (array-like): Numeric series, x ascending (use
+            matplotlib.dates.date2num for dates).
+        method (str): 'lttb' or 'minmax'.
+        cache_size (int): Number of zoom levels to remember.
+    """
+
+    def __init__(self, x, y, method="lttb", cache_size=32):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.method = method
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    def __len__(self):
+        return len(self.x)
+
+    def points(self, width_px, xlim=None):
+        """
+        Return the points worth drawing at a given width and zoom.
+
+        Args:
+            width_px (int): Width of the plot area in pixels.
+            xlim (tuple): Visible (left, right) x range, or None for all.
+
+        Returns:
+            tuple: (x, y) arrays, at most about 2 * width_px long.
+        """
+        start, end = 0, len(self.x)
+        if xlim is not None:
+            # One point either side of the view so the line reaches the edges
+            start = max(int(np.searchsorted(self.x, min(xlim), side="left")) - 1, 0)
+            end = min(int(np.searchsorted(self.x, max(xlim), side="right")) + 1, len(self.x))
+
+        width_px = max(int(width_px), 1)
+        key = (start, end, width_px)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        x, y = self.x[start:end], self.y[start:end]
+        if self.method == "minmax":
+            result = decimate_minmax(x, y, width_px)
+        else:
+            result = decimate_lttb(x, y, 2 * width_px)
+
+        self._cache[key] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def plot(self, ax, **kwargs):
+        """
+        Draw the series on an Axes and keep it decimated while zooming.
+
+        Markers are only drawn for short series. The line is re-decimated
+        from the cache whenever the x limits change (zoom or pan).
+
+        Returns:
+            Line2D: The plotted line.
+        """
+        if len(self) > MARKER_LIMIT:
+            kwargs.pop("marker", None)
+        line, = ax.plot(*self.points(self._width_px(ax)), **kwargs)
+
+        def on_xlim_changed(changed_ax):
+            line.set_data(*self.points(self._width_px(changed_ax), changed_ax.get_xlim()))
+
+        ax.callbacks.connect("xlim_changed", on_xlim_changed)
+        return line
+
+    @staticmethod
+    def _width_px(ax):
+        return ax.get_window_extent().width
@@ -1,12 +1,87 @@
+import math
+import time
+import types
 import tkinter as tk
 from tkinter import *
-import matplotlib.pyplot as plt
+from concurrent.futures import ThreadPoolExecutor
+import matplotlib.dates as mdates
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import seaborn as sns
-import pandas as pd
+from matplotlib.figure import Figure
+import charts
+import ledger
 import transactions
 import reports
 
+# Transactions entered within this many seconds of each other are saved
+# together in one write
+COMMIT_WINDOW_SECONDS = 0.5
+
+
+class RenderScheduler:
+    """
+    Decides when each chart canvas really needs to be redrawn.
+
+    Every chart remembers the widget size and data version it was last
+    rendered with. A render pass skips charts where neither changed, redraws
+    only the ones that did, and passes are rate limited to max_fps so
+    dragging the window edge cannot queue up a storm of redraws.
+    """
+
+    def __init__(self, root, max_fps=10):
+        self.root = root
+        self.min_interval = 1.0 / max_fps
+        self.canvases = {}   # name -> FigureCanvasTkAgg
+        self.versions = {}   # name -> data version
+        self.sizes = {}      # name -> latest widget size reported by Tk
+        self.rendered = {}   # name -> (size, version) of the last render
+        self._job = None
+        self._last_render = 0.0
+
+    def register(self, name, canvas):
+        """
+        Track a canvas. Its widget's <Configure> events are routed through the
+        scheduler instead of matplotlib's resize-and-redraw-on-every-event.
+        """
+        widget = canvas.get_tk_widget()
+        self.canvases[name] = canvas
+        self.versions[name] = 0
+        self.sizes[name] = (widget.winfo_width(), widget.winfo_height())
+        self.rendered[name] = (self.sizes[name], 0)
+        widget.bind("<Configure>", lambda event, n=name: self.on_configure(n, event))
+
+    def on_configure(self, name, event):
+        size = (event.width, event.height)
+        if size != self.sizes[name]:
+            self.sizes[name] = size
+            self.schedule()
+
+    def mark_dirty(self, name):
+        """Record that a chart's data changed and schedule a render."""
+        self.versions[name] += 1
+        self.schedule()
+
+    def schedule(self):
+        if self._job is not None:
+            return  # a render is already coming and will pick this up
+        wait = self.min_interval - (time.monotonic() - self._last_render)
+        self._job = self.root.after(max(0, int(wait * 1000)), self.render)
+
+    def render(self):
+        """Redraw every chart whose size or data changed since its last render."""
+        self._job = None
+        self._last_render = time.monotonic()
+        for name, canvas in self.canvases.items():
+            size, version = self.sizes[name], self.versions[name]
+            rendered_size, rendered_version = self.rendered[name]
+            if size != rendered_size:
+                # matplotlib's own resize handler: resizes the figure and redraws
+                canvas.resize(types.SimpleNamespace(width=size[0], height=size[1]))
+            elif version != rendered_version:
+                canvas.draw_idle()
+            else:
+                continue  # nothing changed for this chart
+            self.rendered[name] = (size, version)
+
 
 class MainGui:
     """
@@ -20,9 +95,21 @@ class MainGui:
         self.root.geometry("1400x800")
 
         # Initialize managers
-        self.tm = transactions.TransactionManager()
+        self.tm = transactions.TransactionManager(commit_window=COMMIT_WINDOW_SECONDS)
         self.reports = reports.Reports()
 
+        # All ledger I/O and aggregation runs on this single worker thread, in
+        # submission order, so the Tk main thread never waits on a big file
+        self._worker = ThreadPoolExecutor(max_workers=1)
+        self._load_future = None
+        self._load_generation = 0
+
+        # Chart totals kept current by the transaction manager on every change
+        self.summary = reports.RunningSummary()
+        self.balance_history = ledger.CumulativeBalance()
+        self._worker.submit(self.tm.add_listener, self.summary)
+        self._worker.submit(self.tm.add_listener, self.balance_history)
+
         #frames for feilds 
         self.input_frame = tk.LabelFrame(self.root, text="Budget Inputs")
         self.input_frame.grid(row=0, column=0, padx=5, pady=5, sticky="nw")
@@ -44,6 +131,11 @@ class MainGui:
         submit_button = Button(self.input_frame, text="Submit", command=self.on_submit) # Calls the on_submit function when clicked
         submit_button.grid(row=len(self.fields), column=0, columnspan=2, padx=15, pady=15)
 
+        # Shown while the worker is loading data for the charts
+        self.loading_label = tk.Label(self.input_frame, text="Loading...", fg="gray")
+        self.loading_label.grid(row=len(self.fields) + 1, column=0, columnspan=2)
+        self.loading_label.grid_remove()
+
         self.charts_frame = tk.Frame(self.root) #new frame for charts
         self.charts_frame.grid(row=0, column=1, padx=2, pady=2) #organizing...
         self.root.columnconfigure(1, weight=1) 
@@ -53,13 +145,13 @@ class MainGui:
         self.chart1_canvas = None 
         self.chart2_canvas = None
         self.chart3_canvas = None
+        self.render_scheduler = RenderScheduler(self.root)
+        self._root_size = None
 
         #Ensure proper closure of the window
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
-        # Load initial data
-        self.load_and_display_data()
-        
+        # Creates the charts and loads the initial data
         self.create_charts()
         
 
@@ -116,8 +208,9 @@ class MainGui:
             print("Invalid amount value")
             return
             
-        # Add transaction to CSV
-        self.tm.add_transaction(
+        # Add transaction to CSV (on the worker, queued ahead of the reload below)
+        future = self._worker.submit(
+            self.tm.add_transaction,
             name = data['Transaction Name'],
             transaction_category = data['Transaction Category'],
             date = data['Date (YYYY-MM-DD)'],
@@ -125,6 +218,7 @@ class MainGui:
             amount = amount,
             essential = data['Essential']
         )
+        self.root.after(50, self._poll_submit, future)
         
         # Clear form fields -- help from chat 
         for _, widget in self.entries:
@@ -140,157 +234,229 @@ class MainGui:
 
     def create_charts(self):
         """
-        Creates the initial charts with empty data.
+        Creates the three chart figures once; later updates reuse them.
         """
-        # Create empty charts first
-        self.chart1_canvas = self.create_pie_chart([], [])
-        self.chart2_canvas = self.create_bar_chart([], [])
-        self.chart3_canvas = self.create_line_chart([], [])
+        if self.chart1_canvas is None:
+            self.chart1_canvas = self.create_pie_chart([], [])
+            self.chart2_canvas = self.create_bar_chart([], [])
+            self.chart3_canvas = self.create_line_chart([], [])
         
-        # Bind the window resize event
-        self.root.bind('<Configure>', self.handle_resize)
+            # Bind the window resize event
+            self.root.bind('<Configure>', self.handle_resize)
         
         # Load and display initial data
         self.load_and_display_data() #using methods from reports and transactions to help!
 
-    def create_pie_chart(self, labels, sizes):
-        """Creates a pie chart using seaborn styling"""
+    def make_chart_canvas(self, row, column, columnspan=1):
+        """
+        Creates a frame, figure and canvas for one chart slot.
+
+        Returns:
+            tuple: (FigureCanvasTkAgg, Axes)
+        """
         chart_frame = tk.Frame(self.charts_frame)
-        chart_frame.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
-      
+        chart_frame.grid(row=row, column=column, columnspan=columnspan, sticky="nsew", padx=5, pady=5)
+
         # Update the chart frame's grid weight to allow expansion -- CHAT assist
-        self.charts_frame.grid_columnconfigure(0, weight=1)
-        self.charts_frame.grid_rowconfigure(0, weight=1)
-      
-        # Create figure with dynamic sizing 
-        fig = plt.Figure(tight_layout=True) #CHAT assist 
+        self.charts_frame.grid_columnconfigure(column, weight=1)
+        self.charts_frame.grid_rowconfigure(row, weight=1)
 
+        # Create figure with dynamic sizing; tight_layout runs on every draw
+        fig = Figure(tight_layout=True) #CHAT assist
         ax = fig.add_subplot()
-        
-        if sum(sizes) > 0:
 
-            ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90)
-            ax.set_title("Transaction Distribution", pad=20)
-            fig.tight_layout()
-        else:
-            ax.text(0.5, 0.5, "No data", ha='center', va='center')
-        
         canvas = FigureCanvasTkAgg(fig, master=chart_frame)
         canvas.get_tk_widget().pack(fill="both", expand=True)
-      
-        # Make sure the figure reacts to canvas resize
-        fig.canvas.draw()
+        return canvas, ax
+
+    def create_pie_chart(self, labels, sizes):
+        """Creates the pie chart figure and draws the given data in it"""
+        canvas, self.pie_ax = self.make_chart_canvas(row=0, column=0)
+        self.pie_artists = ([], [], [])  # wedges, labels, percentages
+        self.pie_empty_text = self.pie_ax.text(0.5, 0.5, "No data", ha='center', va='center')
+        self.chart1_canvas = canvas
+        self.render_scheduler.register('pie', canvas)
+        self.update_pie_chart(labels, sizes)
         return canvas
 
+    def update_pie_chart(self, labels, sizes):
+        """
+        Updates the pie chart in place.
+
+        With the same number of slices the existing wedges and texts are just
+        moved; a different number of slices rebuilds the pie on the same axes.
+        """
+        ax = self.pie_ax
+        total = sum(sizes)
+        has_data = total > 0
+        wedges, label_texts, pct_texts = self.pie_artists
+
+        if has_data and len(wedges) == len(sizes):
+            theta = 90  # same start angle as ax.pie(startangle=90)
+            for wedge, label_text, pct_text, label, size in zip(wedges, label_texts, pct_texts, labels, sizes):
+                span = 360 * size / total
+                wedge.set_theta1(theta)
+                wedge.set_theta2(theta + span)
+                mid = math.radians(theta + span / 2)
+                x, y = math.cos(mid), math.sin(mid)
+                label_text.set_position((1.1 * x, 1.1 * y))
+                label_text.set_horizontalalignment('left' if x > 0 else 'right')
+                label_text.set_text(label)
+                pct_text.set_position((0.6 * x, 0.6 * y))
+                pct_text.set_text('%1.1f%%' % (100 * size / total))
+                theta += span
+        else:
+            for artist in wedges + label_texts + pct_texts:
+                artist.remove()
+            self.pie_artists = ([], [], [])
+            if has_data:
+                colors = [f"C{i % 10}" for i in range(len(sizes))]  # restart the color cycle on rebuild
+                wedges, label_texts, pct_texts = ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90, colors=colors)
+                self.pie_artists = (list(wedges), list(label_texts), list(pct_texts))
+
+        ax.set_title("Transaction Distribution" if has_data else "", pad=20)
+        ax.set_axis_off()
+        self.pie_empty_text.set_visible(not has_data)
+        self.render_scheduler.mark_dirty('pie')
+
 
     def create_bar_chart(self, labels, sizes):
         """
         Creates a bar chart that will resize with its container.
         """
-        # Create chart frame
-        chart_frame = tk.Frame(self.charts_frame)
-        chart_frame.grid(row=0, column=1, sticky="nsew", padx=5, pady=5)
-        
-        # Update the chart frame's grid weight to allow expansion -- CHAT
-        self.charts_frame.grid_columnconfigure(1, weight=1)
-        self.charts_frame.grid_rowconfigure(0, weight=1)
-        
-        # Create figure with dynamic sizing
-        fig = plt.Figure(tight_layout=True) # -- CHAT
+        canvas, self.bar_ax = self.make_chart_canvas(row=0, column=1)
+        self.bar_container = None
+        self.bar_labels = None
+        self.bar_empty_text = self.bar_ax.text(0.5, 0.5, "No data", ha='center', va='center')
+        charts.money_axis(self.bar_ax.yaxis)
+        self.chart2_canvas = canvas
+        self.render_scheduler.register('bar', canvas)
+        self.update_bar_chart(labels, sizes)
+        return canvas
 
-        ax = fig.add_subplot()
-        
-        if sum(sizes) > 0:
-            # Create bar chart with seaborn
-            df = pd.DataFrame({'Category': labels, 'Amount': sizes})
-            sns.barplot(data=df, x='Category', y='Amount', ax=ax, hue='Category', legend=False)
-            plt.setp(ax.get_xticklabels(), rotation=90, ha='right')
-            ax.set_title("Transaction Amounts by Category", pad=20)
-            fig.tight_layout()
+    def update_bar_chart(self, labels, sizes):
+        """
+        Updates the bar chart in place: same categories only change bar
+        heights, new categories rebuild the bars on the same axes.
+        """
+        ax = self.bar_ax
+        has_data = sum(sizes) > 0
+
+        if has_data and self.bar_container is not None and list(labels) == self.bar_labels:
+            for bar, size in zip(self.bar_container, sizes):
+                bar.set_height(size)
         else:
-            ax.text(0.5, 0.5, "No data", ha='center', va='center')
-        
-        # Create canvas with expansion enabled -- CHAT 
-        canvas = FigureCanvasTkAgg(fig, master=chart_frame)
-        canvas.get_tk_widget().pack(fill="both", expand=True)
-        fig.canvas.draw()
-        return canvas
+            if self.bar_container is not None:
+                self.bar_container.remove()
+                self.bar_container = None
+            if has_data:
+                positions = range(len(labels))
+                self.bar_container = ax.bar(positions, sizes, color=[f"C{i % 10}" for i in range(len(labels))])
+                ax.set_xticks(positions, labels, rotation=90, ha='right')
+            else:
+                ax.set_xticks([])
+            self.bar_labels = list(labels)
 
+        ax.relim()
+        ax.autoscale_view()
+        ax.set_title("Transaction Amounts by Category" if has_data else "", pad=20)
+        ax.set_xlabel("Category" if has_data else "")
+        ax.set_ylabel("Amount" if has_data else "")
+        self.bar_empty_text.set_visible(not has_data)
+        self.render_scheduler.mark_dirty('bar')
 
-    def create_line_chart(self, labels, sizes):
+
+    def create_line_chart(self, x, balances, full_length=None):
         """
-        Creates a line chart that will resize with its container.
+        Creates a line chart of the balance over time that will resize with its container.
         """
-        # Create chart frame
-        chart_frame = tk.Frame(self.charts_frame)
-        chart_frame.grid(row=1, column=0, columnspan=2, sticky="nsew", padx=5, pady=5)
-        
-        # Update the chart frame's grid weight to allow expansion
-        self.charts_frame.grid_rowconfigure(1, weight=1)
-        
-        # Create figure with dynamic sizing
-        fig = plt.Figure(tight_layout=True) #--CHAT 
-        ax = fig.add_subplot()
-        
-        if sum(sizes) > 0:
-            # Create line chart with seaborn - some chat help /w3 schools
-            sns.lineplot(x=range(len(labels)), y=sizes, ax=ax, marker='o')
-            ax.set_xticks(range(len(labels)))
-            plt.setp(ax.get_xticklabels(), rotation=90, ha='right')
-            ax.set_title("Transaction Trend", pad=20)
-            fig.tight_layout()
-        else:
-            ax.text(0.5, 0.5, "No data", ha='center', va='center')
-        
-        canvas = FigureCanvasTkAgg(fig, master=chart_frame)
-        canvas.get_tk_widget().pack(fill="both", expand=True)
-        
-        # Make sure the figure reacts to canvas resize
-        fig.canvas.draw()
+        canvas, self.line_ax = self.make_chart_canvas(row=1, column=0, columnspan=2)
+        self.trend_line, = self.line_ax.plot([], [], marker='o')
+        self.line_empty_text = self.line_ax.text(0.5, 0.5, "No data", ha='center', va='center',
+                                                 transform=self.line_ax.transAxes)
+
+        # A date locator picks a readable number of ticks for any time span
+        locator = mdates.AutoDateLocator()
+        self.line_ax.xaxis.set_major_locator(locator)
+        self.line_ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        charts.money_axis(self.line_ax.yaxis)
+
+        self.chart3_canvas = canvas
+        self.render_scheduler.register('line', canvas)
+        self.update_line_chart(x, balances, full_length)
         return canvas
+
+    def update_line_chart(self, x, balances, full_length=None):
+        """
+        Updates the line chart in place by replacing the line's data.
+
+        Args:
+            x (array): Dates as matplotlib date numbers, already decimated
+                (see prepare_chart_data)
+            balances (array): Balance at each date
+            full_length (int): Length of the series before decimation
+                (default: len(x)); markers are only drawn for short series
+        """
+        ax = self.line_ax
+        has_data = len(x) > 0
+        if full_length is None:
+            full_length = len(x)
+
+        self.trend_line.set_data(x, balances)
+        self.trend_line.set_marker('o' if full_length <= charts.MARKER_LIMIT else '')
+
+        ax.relim()
+        ax.autoscale_view()
+        ax.set_title("Balance Over Time" if has_data else "", pad=20)
+        self.line_empty_text.set_visible(not has_data)
+        self.render_scheduler.mark_dirty('line')
     
     def handle_resize(self, event): #--CHAT
        """
        Handle window resize event and update charts if needed.
        """
-       # Check if this is a window resize (not a widget internal event)
+       # Only a real size change of the window matters; moves are ignored
        if event.widget == self.root:
-           # Cancel previous scheduled resize if it exists
-           if hasattr(self, '_resize_job') and self._resize_job: 
-               self.root.after_cancel(self._resize_job)
-          
-           # Schedule new resize with 200ms delay
-           self._resize_job = self.root.after(200, self.redraw_charts)
+           size = (event.width, event.height)
+           if size != self._root_size:
+               self._root_size = size
+               self.render_scheduler.schedule()
     
     def redraw_charts(self): #--chat assist
         """
-        Redraw charts using current data and window size.
+        Redraw the charts whose size or data changed since they were last drawn.
         """
-        self._resize_job = None  # Clear the job 
-        
-        if hasattr(self, 'chart_data'):
-            self.update_charts(self.chart_data['labels'], self.chart_data['sizes'])
+        self.render_scheduler.render()
 
 
-    def update_charts(self, labels, sizes):
+    def update_charts(self, labels, sizes, balance=None):
         """
         Updates the charts with new data.
+
+        Args:
+            labels (list): Category names for the pie and bar charts
+            sizes (list): Category totals for the pie and bar charts
+            balance (tuple): (x, balances, full length) for the line chart,
+                as from prepare_chart_data; None leaves the line chart unchanged
         """
         # Store the latest data
         self.chart_data = {
             'labels': labels,
-            'sizes': sizes
+            'sizes': sizes,
+            'balance': balance
         }
         
-        # destroy the old canvases to make space for new charts -- now a loop cuz its cleeeannerr
-        for canvas in [self.chart1_canvas, self.chart2_canvas, self.chart3_canvas]:
-            if canvas:
-                canvas.get_tk_widget().destroy()
-        
-        # update the charts
-        self.chart1_canvas = self.create_pie_chart(labels, sizes)
-        self.chart2_canvas = self.create_bar_chart(labels, sizes)
-        self.chart3_canvas = self.create_line_chart(labels, sizes)
+        if self.chart1_canvas is None:
+            self.chart1_canvas = self.create_pie_chart(labels, sizes)
+            self.chart2_canvas = self.create_bar_chart(labels, sizes)
+            self.chart3_canvas = self.create_line_chart(*(balance or ([], [])))
+            return
+
+        # update the existing figures in place -- no widgets are destroyed
+        self.update_pie_chart(labels, sizes)
+        self.update_bar_chart(labels, sizes)
+        if balance is not None:
+            self.update_line_chart(*balance)
 
     def setup_charts_grid(self):
         """
@@ -313,17 +479,89 @@ class MainGui:
         """
         Handles the window close event.
         """
+        saved = self._worker.submit(self.tm.flush)  # don't wait out the commit window
+        self._worker.shutdown(wait=True)  # let queued saves finish
+        if saved.exception() is not None:
+            print("Failed to save transactions:", saved.exception())
         self.root.destroy()  # Destroys the Tkinter window
         exit()  # Terminates the program
        
     def load_and_display_data(self):
-        """Load transaction data and prepare it for display"""
-        transactions = self.tm.load_transactions()
-        if transactions:
-            category_summary = self.reports.get_category_summary(transactions)
+        """
+        Load transaction data and prepare it for display.
+
+        The work runs on the worker thread; the charts are updated from the
+        Tk main thread once it finishes. If an earlier request is still
+        waiting in the queue it is cancelled, so rapid submits lead to one
+        reload instead of a backlog of them.
+        """
+        if self._load_future is not None:
+            self._load_future.cancel()  # no effect if it already started
+
+        self._load_generation += 1
+        width_px = self.line_ax.get_window_extent().width
+        self._load_future = self._worker.submit(self.prepare_chart_data, width_px)
+        self.loading_label.grid()
+        self.root.after(50, self._poll_load, self._load_future, self._load_generation)
+
+    def prepare_chart_data(self, width_px):
+        """
+        Runs on the worker thread: refresh the ledger and build the chart data.
+
+        The running balance is also converted to date numbers and decimated
+        to the line chart's width here, so the Tk thread only swaps in the
+        few points it draws.
+
+        Args:
+            width_px (float): Width of the line chart in pixels
+
+        Returns:
+            dict: 'categories' (category totals) and 'balance' (x, balances
+                and full length of the running balance, for update_line_chart).
+        """
+        self.tm.refresh()  # only re-reads the file if it changed outside the app
+        dates, balances = self.balance_history.series()
+        series = charts.DecimatedSeries(mdates.date2num(dates) if len(dates) else [], balances)
+        return {
+            'categories': self.reports.get_category_summary(self.summary),
+            'balance': (*series.points(width_px), len(series)),
+        }
+
+    def _poll_submit(self, future):
+        """
+        Check (from the Tk main thread) whether a submitted transaction was
+        saved, and report the error if it was rejected.
+        """
+        if not future.done():
+            self.root.after(50, self._poll_submit, future)
+            return
+        if future.exception() is not None:
+            print("Failed to add transaction:", future.exception())
+
+    def _poll_load(self, future, generation):
+        """
+        Check (from the Tk main thread) whether a load request has finished.
+        """
+        if generation != self._load_generation:
+            return  # superseded by a newer request, which has its own poll
+        if not future.done():
+            self.root.after(50, self._poll_load, future, generation)
+            return
+
+        self.loading_label.grid_remove()
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            print("Failed to load transactions:", future.exception())
+            return
+
+        data = future.result()
+        category_summary = data['categories']
+        if category_summary:
             self.update_charts(
                 labels=list(category_summary.keys()),
-                sizes=list(category_summary.values())
+                sizes=[float(total) for total in category_summary.values()],
+                balance=data['balance']
             )
 
 if __name__ == "__main__":
@@ -0,0 +1,158 @@
+"""
+Date and category indexes over the transactions held by a TransactionManager.
+
+Filtering "last quarter" or "Food only" by scanning every row gets slow on
+long ledgers. TransactionIndex keeps
+
+- a sorted list of epoch day/position keys, searched with bisect, and
+- an inverted index from category to the positions of its rows,
+
+so a filtered query only touches the rows it returns. It listens to the
+TransactionManager (see add_listener) and updates itself on every change:
+
+    tm.where(start_date="2025-01-01", end_date="2025-03-31", category="Food")
+"""
+
+from bisect import bisect_left, insort
+from datetime import date
+
+_EPOCH = date(1970, 1, 1).toordinal()
+
+# Date keys are day * _SHIFT + position: plain ints sort like (day, position)
+# tuples but are much cheaper to create and compare
+_SHIFT = 1 << 32
+
+
+def epoch_day(value):
+    """
+    Convert a 'YYYY-MM-DD' string (or a date) to days since 1970-01-01.
+
+    Returns:
+        int: The day number, or None if the value is not a valid date.
+    """
+    if isinstance(value, date):
+        return value.toordinal() - _EPOCH
+    try:
+        return date.fromisoformat(value.strip()).toordinal() - _EPOCH
+    except (ValueError, AttributeError):
+        return None
+
+
+class TransactionIndex:
+    """
+    Date-range and category lookups over a set of transaction rows.
+
+    Rows are records.Transaction objects, tracked in storage order by
+    identity (ids can repeat in a hand-edited ledger). The sorted structures
+    are built from them the first time the index is queried, and kept
+    current from then on, so loading a ledger that is never filtered costs
+    nothing extra.
+    """
+
+    def __init__(self, rows=()):
+        self.on_reload(rows)
+
+    def on_reload(self, rows):
+        self._order = {id(row): row for row in rows}  # id(row) -> row, storage order
+        self._built = False
+
+    def _build(self):
+        rows = list(self._order.values())
+        self._rows = dict(enumerate(rows))                           # position -> row
+        self._positions = {id(row): i for i, row in enumerate(rows)}  # id(row) -> position
+        self._days = {i: row.date - _EPOCH for i, row in enumerate(rows) if row.date is not None}
+        self._keys = sorted(day * _SHIFT + i for i, day in self._days.items())
+        self._categories = {}  # stripped category -> set of positions
+        for i, row in enumerate(rows):
+            self._categories.setdefault(row.transaction_category.strip(), set()).add(i)
+        self._next = len(rows)
+        self._built = True
+
+    def _insert(self, row, position=None):
+        if position is None:
+            position = self._next
+            self._next += 1
+        self._rows[position] = row
+        self._positions[id(row)] = position
+        if row.date is not None:
+            day = self._days[position] = row.date - _EPOCH
+            insort(self._keys, day * _SHIFT + position)
+        self._categories.setdefault(row.transaction_category.strip(), set()).add(position)
+        return position
+
+    def _remove(self, row, key):
+        position = self._positions.pop(key)
+        del self._rows[position]
+        day = self._days.pop(position, None)
+        if day is not None:
+            del self._keys[bisect_left(self._keys, day * _SHIFT + position)]
+        category = row.transaction_category.strip()
+        positions = self._categories[category]
+        positions.discard(position)
+        if not positions:
+            del self._categories[category]
+        return position
+
+    def on_add(self, row):
+        self._order[id(row)] = row
+        if self._built:
+            self._insert(row)
+
+    def on_delete(self, row):
+        self._order.pop(id(row), None)
+        if self._built:
+            self._remove(row, id(row))
+
+    def on_update(self, old_row, new_row):
+        # new_row is the object the index holds; old_row has its old values
+        if self._built:
+            self._insert(new_row, self._remove(old_row, id(new_row)))
+
+    def __len__(self):
+        return len(self._order)
+
+    def query(self, start_date=None, end_date=None, category=None):
+        """
+        Return the rows matching every given filter, in storage order.
+
+        Args:
+            start_date (str): Earliest date to include (YYYY-MM-DD)
+            end_date (str): Latest date to include (YYYY-MM-DD)
+            category (str): Only include this transaction category
+                (surrounding whitespace is ignored)
+
+        Returns:
+            list: The matching Transactions (not copies). Rows without a
+            valid date only match queries without date bounds.
+
+        Raises:
+            ValueError: If a bound is not a valid date
+        """
+        start, end = (None if bound is None else epoch_day(bound) for bound in (start_date, end_date))
+        for bound, day in ((start_date, start), (end_date, end)):
+            if bound is not None and day is None:
+                raise ValueError(f"invalid date {bound!r}, expected YYYY-MM-DD")
+        dated = start is not None or end is not None
+        if category is None and not dated:
+            return list(self._order.values())
+        if not self._built:
+            self._build()
+
+        if dated:
+            lo = 0 if start is None else bisect_left(self._keys, start * _SHIFT)
+            hi = len(self._keys) if end is None else bisect_left(self._keys, (end + 1) * _SHIFT)
+        if category is None:
+            positions = [key % _SHIFT for key in self._keys[lo:hi]]
+        else:
+            in_category = self._categories.get(category.strip(), ())
+            if not dated:
+                positions = list(in_category)
+            elif len(in_category) < hi - lo:
+                # Fewer rows in the category than in the range: check those
+                positions = [p for p in in_category if p in self._days
+                             and (start is None or self._days[p] >= start)
+                             and (end is None or self._days[p] <= end)]
+            else:
+                positions = [key % _SHIFT for key in self._keys[lo:hi] if key % _SHIFT in in_category]
+        positions.sort()
+        return [self._rows[position] for position in positions]
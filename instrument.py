@@ -0,0 +1,288 @@
+"""
+Opt-in timing instrumentation for the app's hot paths.
+
+Turned on with the --instrument/--instrument-file/--profile flags of
+main.py or the BUDGET_INSTRUMENT/BUDGET_PROFILE environment variables:
+
+    BUDGET_INSTRUMENT=stats.json python main.py reports
+    python main.py --instrument-file stats.json --profile app.prof
+
+enable() replaces the methods listed in TARGETS on their classes with timed
+wrappers, so when instrumentation is off nothing is wrapped and there is no
+overhead at all. Every call adds to a per-stage count, total, minimum and
+maximum, plus a rolling window of recent durations for percentiles and a
+histogram. The stats are written as JSON when the process exits.
+
+Times are inclusive: a stage that calls another instrumented stage includes
+its time.
+"""
+
+import atexit
+import cProfile
+import datetime
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+# Methods timed per module and class. Only modules already imported when
+# enable() or attach() runs are instrumented, so enabling never pulls in Tk
+# or matplotlib by itself.
+TARGETS = {
+    "transactions": {
+        "TransactionManager": [
+            "load_transactions", "refresh", "flush", "save_transactions", "add_transaction",
+            "add_transactions", "update_transaction", "delete_transaction", "where",
+        ],
+    },
+    "storage": {
+        "CsvBackend": ["load", "commit", "append", "write_all"],
+        "SqliteBackend": ["load", "commit", "write_all"],
+    },
+    "reports": {
+        "Reports": [
+            "load_transactions_from_csv", "load_ledger", "scan_csv",
+            "calculate_total_income", "calculate_total_expenses", "calculate_balance",
+            "get_monthly_summary", "get_category_summary", "get_top_expenses", "compute_all",
+            "summarize_files", "render_charts", "export_chart_packs",
+        ],
+    },
+    "gui": {
+        "MainGui": [
+            "prepare_chart_data", "update_charts", "create_pie_chart", "create_bar_chart",
+            "create_line_chart", "update_pie_chart", "update_bar_chart", "update_line_chart",
+        ],
+        "RenderScheduler": ["render"],
+    },
+    "matplotlib.backends.backend_tkagg": {
+        "FigureCanvasTkAgg": ["draw"],
+    },
+}
+
+# Durations kept per stage for percentiles and the histogram
+WINDOW = 1024
+
+# Upper bounds (ms) of the histogram buckets; slower calls go in the last one
+HISTOGRAM_BOUNDS_MS = [0.1, 1, 10, 100, 1000]
+
+DEFAULT_STATS_FILE = "instrument_stats.json"
+
+
+class StageStats:
+    """Counters and a rolling window of durations for one instrumented stage."""
+
+    def __init__(self, window=WINDOW):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.recent = deque(maxlen=window)  # seconds, newest last
+
+    def record(self, seconds, failed=False):
+        self.calls += 1
+        self.errors += failed
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: Totals over every call, and percentiles and a histogram
+            over the last WINDOW calls, all in milliseconds.
+        """
+        recent = sorted(self.recent)
+
+        def percentile(p):
+            return recent[min(len(recent) - 1, int(p / 100 * len(recent)))] * 1000
+
+        histogram = {f"<={bound:g}ms": 0 for bound in HISTOGRAM_BOUNDS_MS}
+        histogram[f">{HISTOGRAM_BOUNDS_MS[-1]:g}ms"] = 0
+        labels = list(histogram)
+        for seconds in recent:
+            ms = seconds * 1000
+            bucket = next((i for i, bound in enumerate(HISTOGRAM_BOUNDS_MS) if ms <= bound), -1)
+            histogram[labels[bucket]] += 1
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_ms": self.total * 1000,
+            "mean_ms": self.total / self.calls * 1000 if self.calls else 0.0,
+            "min_ms": (self.min or 0.0) * 1000,
+            "max_ms": (self.max or 0.0) * 1000,
+            "window": {
+                "calls": len(recent),
+                "p50_ms": percentile(50) if recent else 0.0,
+                "p90_ms": percentile(90) if recent else 0.0,
+                "p99_ms": percentile(99) if recent else 0.0,
+                "histogram": histogram,
+            },
+        }
+
+
+class Recorder:
+    """Thread-safe collection of StageStats keyed by stage name."""
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds, failed=False):
+        with self._lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = StageStats(self.window)
+            stats.record(seconds, failed)
+
+    def to_dict(self):
+        with self._lock:
+            return {stage: stats.to_dict() for stage, stats in sorted(self.stages.items())}
+
+    def dump(self, path):
+        """Write the stats of every stage to a JSON file."""
+        with open(path, "w") as f:
+            json.dump({
+                "created": datetime.datetime.now().isoformat(timespec="seconds"),
+                "argv": sys.argv,
+                "stages": self.to_dict(),
+            }, f, indent=2)
+
+
+# The active recorder, or None while instrumentation is off
+recorder = None
+
+# (class, attribute, original function) for every wrapped method
+_wrapped = []
+_profiler = None
+
+
+def timed(stage, func):
+    """Return a wrapper around func that records each call under stage."""
+    perf_counter = time.perf_counter
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        failed = True
+        try:
+            result = func(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            if recorder is not None:
+                recorder.record(stage, perf_counter() - start, failed)
+
+    return wrapper
+
+
+def attach():
+    """
+    Wrap the TARGETS of every module imported since the last call.
+
+    Call it again after importing a module lazily (main.py does this after
+    importing the GUI). Methods that are already wrapped are left alone,
+    and nothing happens while instrumentation is off.
+    """
+    if recorder is None:
+        return
+    done = {(cls, name) for cls, name, _ in _wrapped}
+    for module_name, classes in TARGETS.items():
+        module = sys.modules.get(module_name)
+        if module is None:
+            continue
+        for class_name, methods in classes.items():
+            cls = getattr(module, class_name, None)
+            if cls is None:
+                continue
+            for name in methods:
+                original = cls.__dict__.get(name)
+                if original is None or (cls, name) in done:
+                    continue
+                setattr(cls, name, timed(f"{class_name}.{name}", original))
+                _wrapped.append((cls, name, original))
+
+
+def enable(stats_file=DEFAULT_STATS_FILE, window=WINDOW):
+    """
+    Start timing the instrumented methods and dump the stats on exit.
+
+    Args:
+        stats_file (str): JSON file written at exit (None to skip writing)
+        window (int): Recent calls kept per stage
+
+    Returns:
+        Recorder: The recorder collecting the stats.
+    """
+    global recorder
+    if recorder is None:
+        recorder = Recorder(window)
+        if stats_file is not None:
+            atexit.register(recorder.dump, stats_file)
+    attach()
+    return recorder
+
+
+def disable():
+    """Restore every wrapped method and stop recording (without a dump at exit)."""
+    global recorder
+    if recorder is not None:
+        atexit.unregister(recorder.dump)
+    while _wrapped:
+        cls, name, original = _wrapped.pop()
+        setattr(cls, name, original)
+    recorder = None
+
+
+def start_profile(path):
+    """
+    Run cProfile until the process exits, then write its stats to path.
+
+    The profile covers the calling (main) thread; open it with
+    python -m pstats PATH or a viewer such as snakeviz.
+    """
+    global _profiler
+    if _profiler is None:
+        _profiler = cProfile.Profile()
+        atexit.register(_stop_profile, path)
+        _profiler.enable()
+    return _profiler
+
+
+def _stop_profile(path):
+    global _profiler
+    if _profiler is not None:
+        _profiler.disable()
+        _profiler.dump_stats(path)
+        _profiler = None
+
+
+def configure(stats_file=None, profile_file=None, environ=os.environ):
+    """
+    Turn on what the command line or environment asks for.
+
+    Args:
+        stats_file (str): --instrument-file value, '1' for --instrument
+            (the default file), or None
+        profile_file (str): --profile value, or None
+        environ (dict): Read for BUDGET_INSTRUMENT (a stats file, or '1'
+            for the default one) and BUDGET_PROFILE (a profile file)
+
+    Returns:
+        bool: True if anything was turned on.
+    """
+    stats_file = stats_file or environ.get("BUDGET_INSTRUMENT") or None
+    if stats_file == "1":
+        stats_file = DEFAULT_STATS_FILE
+    profile_file = profile_file or environ.get("BUDGET_PROFILE") or None
+    if stats_file:
+        enable(stats_file)
+    if profile_file:
+        start_profile(profile_file)
+    return bool(stats_file or profile_file)
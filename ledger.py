@@ -0,0 +1,443 @@
+"""
+Columnar, NumPy-backed view of a list of transactions.
+
+Reports methods loop over the transactions in Python on every call. A
+ColumnarLedger does that work once: amounts become an int64 array of cents,
+dates an array of days, and the text columns small integer codes. The
+summaries are then vectorized masks and bincounts, with exact integer
+totals. Pass a ledger anywhere Reports expects a list of transactions:
+
+    ledger = ColumnarLedger.from_transactions(tm.load_transactions())
+    Reports().get_category_summary(ledger)
+"""
+
+import numpy as np
+
+from money import Money
+from records import as_transactions, parse_date
+
+# Sums whose terms could reach this in magnitude are done in Python ints,
+# which cannot overflow (int64 sums) or round (float64 bincount weights)
+_INT64_SAFE = 2 ** 63
+_FLOAT64_SAFE = 2 ** 53
+
+
+def _bound(cents):
+    """Largest magnitude a sum over cents can reach."""
+    return max(int(cents.max()), -int(cents.min())) * len(cents) if len(cents) else 0
+
+
+def exact_sum(cents):
+    """
+    Sum an array of cents exactly.
+
+    Returns:
+        Money: The total.
+    """
+    if _bound(cents) >= _INT64_SAFE:
+        return Money(sum(cents.tolist()))
+    return Money(int(cents.sum()))
+
+
+def float_weights(cents):
+    """
+    Return cents as float64 bincount weights, or None if their sums could round.
+
+    float64 adds whole numbers exactly while every partial sum is below
+    2**53, and bincount is much faster with float weights than with ints.
+    """
+    return cents.astype(np.float64) if _bound(cents) < _FLOAT64_SAFE else None
+
+
+def group_sums(codes, cents, size, weights=None, select=slice(None)):
+    """
+    Sum cents per code exactly.
+
+    Args:
+        codes (ndarray): Group code per row.
+        cents (ndarray): int64 amount per row, in cents.
+        size (int): Number of codes.
+        weights (ndarray): float_weights(cents), if the caller keeps them.
+        select: Mask or slice of the rows to add up (default: all).
+
+    Returns:
+        list: size totals in int cents, indexed by code.
+    """
+    codes = codes[select]
+    if weights is None:
+        cents = cents[select]
+        weights = float_weights(cents)
+        if weights is None:
+            totals = [0] * size
+            for code, value in zip(codes.tolist(), cents.tolist()):
+                totals[code] += value
+            return totals
+    else:
+        weights = weights[select]
+    return np.bincount(codes, weights=weights, minlength=size).astype(np.int64).tolist()
+
+
+def monthly_sums(month, month_labels, cents, weights, income, expense):
+    """
+    Total income and expenses per month, as Reports.get_monthly_summary gives them.
+
+    Months are listed in the order they first occur among the income and
+    expense rows; rows of any other type are left out entirely.
+
+    Args:
+        month (ndarray): Month code per row, numbered in first-seen order.
+        month_labels (list): Month text per code.
+        cents (ndarray): int64 amount per row, in cents.
+        weights (ndarray): float_weights(cents), or None.
+        income (ndarray): Mask of the income rows.
+        expense (ndarray): Mask of the expense rows.
+
+    Returns:
+        dict: {month: {"income": Money, "expense": Money}}
+    """
+    size = len(month_labels)
+    income_totals = group_sums(month, cents, size, weights, income)
+    expense_totals = group_sums(month, cents, size, weights, expense)
+    counted = income | expense
+    if counted.all():
+        # The codes are already in first-seen order over every row
+        months = np.flatnonzero(np.bincount(month, minlength=size))
+    else:
+        codes = month[counted]
+        months = codes[np.sort(np.unique(codes, return_index=True)[1])]
+    return {
+        month_labels[m]: {"income": Money(income_totals[m]), "expense": Money(expense_totals[m])}
+        for m in months
+    }
+
+
+def top_indices(cents, select, n):
+    """
+    Return the rows with the n largest selected amounts, largest first.
+
+    Ties resolve by row order, as in the row-by-row top expenses.
+
+    Args:
+        cents (ndarray): int64 amount per row, in cents.
+        select (ndarray): Mask of the rows to consider.
+        n (int): Number of rows wanted; n <= 0 gives none.
+
+    Returns:
+        ndarray: Row positions.
+    """
+    idx = np.flatnonzero(select)
+    if n <= 0:
+        return idx[:0]
+    if n < len(idx):
+        # Keep every row tied with the n-th largest so ties resolve by row order
+        cutoff = np.partition(cents[idx], len(idx) - n)[len(idx) - n]
+        idx = idx[cents[idx] >= cutoff]
+    return idx[np.lexsort((idx, -cents[idx]))[:n]]
+
+
+def _encode(values):
+    """
+    Turn a sequence of strings into integer codes.
+
+    Returns:
+        tuple: (int32 code array, list of distinct values in first-seen order)
+    """
+    table = {}
+    codes = np.fromiter((table.setdefault(v, len(table)) for v in values), dtype=np.int32, count=len(values))
+    return codes, list(table)
+
+
+def _recode(codes, labels, key=None):
+    """
+    Re-encode codes after normalizing their labels with key, merging labels
+    that become equal. First-seen order is kept.
+
+    Returns:
+        tuple: (int32 code array, list of distinct normalized labels)
+    """
+    if key is None:
+        return np.asarray(codes, dtype=np.int32), list(labels)
+    table = {}
+    mapping = np.array([table.setdefault(key(label), len(table)) for label in labels], dtype=np.int32)
+    return mapping[codes], list(table)
+
+
+_NAT = np.datetime64("NaT").astype(np.int64)
+
+# date.toordinal() of 1970-01-01, to turn Transaction dates into epoch days
+_EPOCH_ORDINAL = 719163
+
+
+class ColumnarLedger:
+    """
+    Transactions stored column by column.
+
+    Attributes:
+        cents (ndarray): int64 amount per row, in cents
+        day (ndarray): int64 days since the epoch per row
+        category, kind, essential, month (ndarray): int32 codes into the
+            matching *_labels lists (kind is the income_expense column)
+        rows (list): The records.Transaction objects the ledger was built from
+    """
+
+    def __init__(self, rows, cents, day, category, category_labels, kind, kind_labels,
+                 essential, essential_labels, month, month_labels):
+        self.rows = rows
+        self.cents = cents
+        self._weights = float_weights(cents)
+        self.day = day
+        self.category = category
+        self.category_labels = category_labels
+        self.kind = kind
+        self.kind_labels = kind_labels
+        self.essential = essential
+        self.essential_labels = essential_labels
+        self.month = month
+        self.month_labels = month_labels
+
+    @classmethod
+    def from_transactions(cls, transactions):
+        """
+        Build a ledger from transactions.
+
+        Transactions are read from their typed slots without any parsing;
+        dictionaries (amounts may be str or float) are converted first.
+
+        Args:
+            transactions (iterable): Transactions or transaction dictionaries.
+
+        Returns:
+            ColumnarLedger: The columnar form of the transactions.
+        """
+        rows = list(as_transactions(transactions))
+        cents = np.fromiter((t.cents for t in rows), dtype=np.int64, count=len(rows))
+        days = np.fromiter((_NAT if t.date is None else t.date - _EPOCH_ORDINAL for t in rows),
+                           dtype=np.int64, count=len(rows))
+        category, category_labels = _recode(*_encode([t.transaction_category for t in rows]), key=str.strip)
+        kind, kind_labels = _encode([t.income_expense for t in rows])
+        essential, essential_labels = _encode([t.essential for t in rows])
+        month, month_labels = _encode([t.month for t in rows])
+        return cls(rows, cents, days, category, category_labels, kind, kind_labels,
+                   essential, essential_labels, month, month_labels)
+
+    @classmethod
+    def from_encoded(cls, rows, cents, columns):
+        """
+        Build a ledger from columns that are already integer-coded.
+
+        Applies the same clean-up as from_transactions (stripped categories
+        and dates, months from the date) to the labels only, so the cost is
+        per distinct value rather than per row.
+
+        Args:
+            rows (sequence): Transactions, indexable by row number.
+            cents (ndarray): int64 amount per row, in cents.
+            columns (dict): CSV column name -> (int code array, labels) for
+                transaction_category, date, income_expense and essential.
+
+        Returns:
+            ColumnarLedger: The columnar form of the transactions.
+        """
+        category = _recode(*columns["transaction_category"], key=str.strip)
+        kind = _recode(*columns["income_expense"])
+        essential = _recode(*columns["essential"])
+        date_codes, date_labels = columns["date"]
+        month = _recode(date_codes, date_labels, key=lambda d: d.strip()[:7])
+        # records.parse_date, like from_transactions, so both accept the same dates
+        ordinals = (parse_date(d) for d in date_labels)
+        label_days = np.fromiter((_NAT if o is None else o - _EPOCH_ORDINAL for o in ordinals),
+                                 dtype=np.int64, count=len(date_labels))
+        return cls(rows, cents, label_days[date_codes], *category, *kind, *essential, *month)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def mask(self, income_expense):
+        """Return a boolean array selecting rows of one type ('income' or 'expense')."""
+        if income_expense not in self.kind_labels:
+            return np.zeros(len(self.rows), dtype=bool)
+        return self.kind == self.kind_labels.index(income_expense)
+
+    def total_income(self):
+        return exact_sum(self.cents[self.mask("income")])
+
+    def total_expenses(self):
+        return exact_sum(self.cents[self.mask("expense")])
+
+    def balance(self):
+        return self.total_income() - self.total_expenses()
+
+    def monthly_summary(self):
+        return monthly_sums(self.month, self.month_labels, self.cents, self._weights,
+                            self.mask("income"), self.mask("expense"))
+
+    def category_summary(self):
+        totals = group_sums(self.category, self.cents, len(self.category_labels), self._weights)
+        return {label: Money(total) for label, total in zip(self.category_labels, totals)}
+
+    def top_expenses(self, n=5):
+        return [self.rows[i] for i in top_indices(self.cents, self.mask("expense"), n)]
+
+
+# Period each resampling frequency rounds dates down to
+_RESAMPLE_UNITS = {"D": "datetime64[D]", "W": "datetime64[W]", "M": "datetime64[M]"}
+
+
+def _signed_amounts(ledger):
+    """
+    Return (day, signed cents, has valid date) arrays for a ColumnarLedger:
+    income is positive, expenses negative, anything else zero.
+    """
+    signed = np.where(ledger.mask("income"), ledger.cents,
+                      np.where(ledger.mask("expense"), -ledger.cents, 0))
+    return ledger.day, signed, ledger.day != _NAT
+
+
+def _resample(days, balances, freq):
+    """Keep the closing balance of each day, week or month."""
+    if freq is None or len(days) == 0:
+        return days.astype("datetime64[D]"), balances
+    if freq not in _RESAMPLE_UNITS:
+        raise ValueError(f"freq must be one of {sorted(_RESAMPLE_UNITS)} or None, got {freq!r}")
+    periods = days.astype("datetime64[D]").astype(_RESAMPLE_UNITS[freq])
+    last = np.append(np.flatnonzero(periods[1:] != periods[:-1]), len(periods) - 1)
+    return periods[last].astype("datetime64[D]"), balances[last]
+
+
+def cumulative_balance_series(transactions, freq=None):
+    """
+    Running balance after every transaction, in date order.
+
+    Args:
+        transactions: Transactions (or dictionaries) or a ColumnarLedger.
+        freq (str): None for one point per transaction, or 'D', 'W' or 'M'
+            for the closing balance of each day, week or month.
+
+    Returns:
+        tuple: (datetime64[D] dates, float64 balances). The balances are
+        summed exactly in cents and converted to currency units last.
+    """
+    if not isinstance(transactions, ColumnarLedger):
+        transactions = ColumnarLedger.from_transactions(transactions)
+    days, signed, valid = _signed_amounts(transactions)
+    days, signed = days[valid], signed[valid]  # rows without a usable date are left out
+    order = np.argsort(days, kind="stable")
+    dates, balances = _resample(days[order], np.cumsum(signed[order]), freq)
+    return dates, balances / 100
+
+
+class CumulativeBalance:
+    """
+    A balance history that can be extended without recomputing it.
+
+    append() adds transactions; when they are not older than the last one
+    the new balances are just the running total continued, written into
+    preallocated buffers (amortized O(new rows)). Backdated rows trigger a
+    full re-sort. It also works as a TransactionManager listener, where
+    updates and deletes mark the history for a rebuild on next read; rows
+    are tracked by identity, so repeated ids are fine.
+    """
+
+    def __init__(self, transactions=()):
+        self.on_reload(transactions)
+
+    def __len__(self):
+        self._rebuild_if_dirty()
+        return self._size
+
+    def on_reload(self, rows):
+        self._entries = {}  # id(row) -> (day, signed cents, row), in row order
+        self._dirty = False
+        self._set(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+        self.append(rows)
+
+    def _set(self, days, signed):
+        order = np.argsort(days, kind="stable")
+        self._size = len(days)
+        capacity = max(16, 2 * self._size)
+        self._days = np.empty(capacity, dtype=np.int64)
+        self._signed = np.empty(capacity, dtype=np.int64)
+        self._balance = np.empty(capacity, dtype=np.int64)  # cents
+        self._days[:self._size] = days[order]
+        self._signed[:self._size] = signed[order]
+        np.cumsum(self._signed[:self._size], out=self._balance[:self._size])
+
+    def _rebuild_if_dirty(self):
+        if self._dirty:
+            self._dirty = False
+            values = list(self._entries.values())
+            self._set(np.array([d for d, _, _ in values], dtype=np.int64),
+                      np.array([s for _, s, _ in values], dtype=np.int64))
+
+    def append(self, transactions):
+        """
+        Add transactions to the history.
+
+        Args:
+            transactions: Transactions (or dictionaries) or a ColumnarLedger.
+        """
+        if isinstance(transactions, ColumnarLedger):
+            rows = transactions.rows
+        else:
+            rows = list(transactions)  # entries are keyed by the objects passed in
+            transactions = ColumnarLedger.from_transactions(rows)
+        self._rebuild_if_dirty()
+
+        days, signed, valid = _signed_amounts(transactions)
+        for row, day, amount, ok in zip(rows, days, signed, valid):
+            if ok:
+                self._entries[id(row)] = (int(day), int(amount), row)
+        days, signed = days[valid], signed[valid]
+        if len(days) == 0:
+            return
+
+        size = self._size
+        if size and days.min() < self._days[size - 1]:
+            # Backdated entries: merge and recompute the whole history
+            self._set(np.concatenate([self._days[:size], days]), np.concatenate([self._signed[:size], signed]))
+            return
+
+        new_size = size + len(days)
+        if new_size > len(self._days):
+            capacity = 2 * new_size
+            for name in ("_days", "_signed", "_balance"):
+                grown = np.empty(capacity, dtype=getattr(self, name).dtype)
+                grown[:size] = getattr(self, name)[:size]
+                setattr(self, name, grown)
+        order = np.argsort(days, kind="stable")
+        self._days[size:new_size] = days[order]
+        self._signed[size:new_size] = signed[order]
+        start = self._balance[size - 1] if size else 0
+        self._balance[size:new_size] = start + np.cumsum(signed[order])
+        self._size = new_size
+
+    def on_add(self, row):
+        self.append([row])
+
+    def on_delete(self, row):
+        self._entries.pop(id(row), None)
+        self._dirty = True
+
+    def on_update(self, old_row, new_row):
+        # A TransactionManager passes a copy as old_row and updates new_row
+        # in place; other callers may pass the row they appended as old_row
+        self._entries.pop(id(old_row), None)
+        self._entries.pop(id(new_row), None)
+        day, signed, valid = _signed_amounts(ColumnarLedger.from_transactions([new_row]))
+        if valid[0]:
+            self._entries[id(new_row)] = (int(day[0]), int(signed[0]), new_row)
+        self._dirty = True
+
+    def series(self, freq=None):
+        """
+        Return the history, see cumulative_balance_series().
+
+        Returns:
+            tuple: (datetime64[D] dates, float64 balances)
+        """
+        self._rebuild_if_dirty()
+        dates, balances = _resample(self._days[:self._size].copy(), self._balance[:self._size], freq)
+        return dates, balances / 100
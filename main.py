@@ -1,27 +1,75 @@
 """
 Main entry point for the Personal Finance Tracker application.
 
-This module provides two main functionalities:
+This module provides three main functionalities:
 1. Launching the GUI for interactive use.
 2. Running reports from the command line for summary and visualization.
+3. Migrating the CSV ledger into an SQLite database.
 
 Usage:
-    python main.py           # Launches the GUI
-    python main.py reports   # Runs reports in the console
+    python main.py                        # Launches the GUI
+    python main.py reports                # Runs reports in the console
+    python main.py reports --stream-threshold 1000000
+                                          # Streams ledgers bigger than 1 MB
+    python main.py reports --files "ledgers/*.csv"
+                                          # Summarizes many ledgers in parallel
+    python main.py reports --no-charts    # Prints the text reports only
+    python main.py reports --export charts --format png svg
+                                          # Saves the charts as files instead of showing them
+    python main.py migrate [CSV] [DB]     # Copies transactions.csv into transactions.db
+    python main.py --instrument reports   # Times the hot paths, see instrument.py
+    python main.py --instrument-file stats.json reports
+                                          # ... and writes the stats to stats.json
 """
 
-import sys
-from gui import MainGui
+import argparse
+import glob
+import os
+from money import format_money
 from reports import Reports
+from storage import SNAPSHOT_MIN_BYTES, JournaledCsvBackend, has_journal, migrate_csv_to_sqlite
 
-def run_gui():
+# Ledgers bigger than this are summarized by streaming instead of loading them
+STREAM_THRESHOLD_BYTES = 64 * 1024 * 1024
+
+def setup_instrumentation(stats_file=None, profile_file=None):
+    """
+    Turns on timing instrumentation and/or cProfile when the command line or
+    the BUDGET_INSTRUMENT/BUDGET_PROFILE environment variables ask for it.
+
+    Returns:
+        bool: True if instrumentation is on. When it is not, instrument.py
+            is never even imported.
+    """
+    if not (stats_file or profile_file or os.environ.get("BUDGET_INSTRUMENT")
+            or os.environ.get("BUDGET_PROFILE")):
+        return False
+    import instrument
+    return instrument.configure(stats_file, profile_file)
+
+def run_gui(instrumented=False):
     """
     Launches the main graphical user interface (GUI) of the application.
     """
+    # Imported here so report and migrate runs never load Tk or matplotlib
+    from gui import MainGui
+    if instrumented:
+        import instrument
+        instrument.attach()  # the GUI classes exist only now
+
     app = MainGui()
     app.root.mainloop()
 
-def run_reports():
+def fold_journal(filename):
+    """
+    Folds a ledger's pending edit journal into the CSV file, so the report
+    readers, which read the file directly, see every change.
+    """
+    if has_journal(filename):
+        JournaledCsvBackend(filename).compact()
+
+def run_reports(filename="transactions.csv", stream_threshold=STREAM_THRESHOLD_BYTES,
+                export_dir=None, formats=("png",), charts=True):
     """
     Runs financial reports in the console, including:
     - Total income, expenses, and net balance
@@ -29,38 +77,157 @@ def run_reports():
     - Top expenses
     - Expense and balance visualizations
 
-    Loads transactions from 'transactions.csv'.
+    Files larger than stream_threshold bytes are streamed in chunks so memory
+    use stays constant; the charts, which need every row, are skipped then.
+    Files of SNAPSHOT_MIN_BYTES or more are loaded through their binary
+    snapshot, or just scanned for the needed columns when no charts are
+    drawn.
+
+    With export_dir set, the charts are rendered headlessly to image files in
+    that directory instead of being shown. With charts=False only the text
+    reports are printed, and matplotlib is never loaded.
     """
+    fold_journal(filename)
     reports = Reports()
-    transactions = reports.load_transactions_from_csv("transactions.csv")
+    size = os.path.getsize(filename)
+    streaming = size > stream_threshold
+    if streaming:
+        transactions = reports.iter_transactions_from_csv(filename)
+    elif size >= SNAPSHOT_MIN_BYTES:
+        transactions = reports.load_ledger(filename) if charts else reports.scan_csv(filename)
+    else:
+        transactions = reports.load_transactions_from_csv(filename)
 
-    print("Total Income:", reports.calculate_total_income(transactions))
-    print("Total Expenses:", reports.calculate_total_expenses(transactions))
-    print("Net Balance:", reports.calculate_balance(transactions))
+    summary = reports.compute_all(transactions)
+    print_summary(summary)
 
-    print("\nMonthly Summary:")
-    for month, values in reports.get_monthly_summary(transactions).items():
-        print(f"{month}: Income = ${values['income']:.2f}, Expenses = ${values['expense']:.2f}")
+    if not charts:
+        return
+    if streaming:
+        print(f"\nLedger is larger than {stream_threshold} bytes; skipping charts.")
+        return
 
-    print("\nTop Expenses:")
-    for t in reports.get_top_expenses(transactions):
-        print(f"{t['date']} - {t['transaction_name']} - ${t['amount']}")
+    if export_dir:
+        export_charts([filename], export_dir, formats)
+        return
 
     reports.plot_expense_pie(transactions)
     reports.plot_cumulative_balance(transactions)
     reports.plot_stacked_expense_categories(transactions)
 
+def run_reports_for_files(patterns, workers=None, export_dir=None, formats=("png",)):
+    """
+    Prints one combined report for several ledger files.
+
+    Each pattern may be a file name or a glob such as 'ledgers/*.csv'. The
+    files are summarized in parallel worker processes and merged. With
+    export_dir set, a chart pack is also rendered for every file.
+    """
+    filenames = []
+    for pattern in patterns:
+        filenames.extend(sorted(glob.glob(pattern)) or [pattern])
+    for filename in filenames:
+        fold_journal(filename)
+
+    summary = Reports().summarize_files(filenames, max_workers=workers)
+    print(f"Ledgers: {len(filenames)}")
+    print_summary(summary)
+
+    if export_dir:
+        export_charts(filenames, export_dir, formats, workers)
+
+def export_charts(filenames, export_dir, formats=("png",), workers=None):
+    """
+    Renders the charts of each ledger to image files in worker processes.
+    """
+    packs = Reports().export_chart_packs(filenames, export_dir, formats, max_workers=workers)
+    count = sum(len(paths) for paths in packs.values())
+    print(f"\nWrote {count} chart files to {export_dir}")
+
+def print_summary(summary):
+    """
+    Prints totals, the monthly summary and the top expenses from compute_all.
+    Amounts are exact Money values until they are formatted here.
+    """
+    print("Total Income:", format_money(summary["total_income"]))
+    print("Total Expenses:", format_money(summary["total_expenses"]))
+    print("Net Balance:", format_money(summary["balance"]))
+
+    print("\nMonthly Summary:")
+    for month, values in summary["monthly_summary"].items():
+        print(f"{month}: Income = {format_money(values['income'])}, Expenses = {format_money(values['expense'])}")
+
+    print("\nTop Expenses:")
+    for t in summary["top_expenses"]:
+        print(f"{t['date']} - {t['transaction_name']} - {format_money(t['amount'])}")
+
+def run_migrate(csv_file="transactions.csv", db_file="transactions.db"):
+    """
+    Copies every transaction from the CSV ledger into an SQLite database.
+    """
+    count = migrate_csv_to_sqlite(csv_file, db_file)
+    print(f"Migrated {count} transactions from {csv_file} to {db_file}")
+
+def parse_args(argv=None):
+    """
+    Parses the command line. With no mode given, the GUI is launched.
+    """
+    parser = argparse.ArgumentParser(description="Personal Finance Tracker")
+    parser.add_argument(
+        "--instrument", action="store_true",
+        help="time the hot paths and write the stats to instrument_stats.json on exit "
+             "(also $BUDGET_INSTRUMENT)",
+    )
+    parser.add_argument("--instrument-file", metavar="FILE",
+                        help="like --instrument, but write the stats to FILE")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="write a cProfile capture to FILE on exit (also $BUDGET_PROFILE)")
+    modes = parser.add_subparsers(dest="mode")
+
+    reports_parser = modes.add_parser("reports", help="print reports and show charts")
+    reports_parser.add_argument("--file", default="transactions.csv", help="ledger CSV file")
+    reports_parser.add_argument(
+        "--stream-threshold", type=int,
+        default=int(os.environ.get("BUDGET_STREAM_THRESHOLD", STREAM_THRESHOLD_BYTES)),
+        help="stream files larger than this many bytes (default: $BUDGET_STREAM_THRESHOLD or 64 MB)",
+    )
+    reports_parser.add_argument(
+        "--files", nargs="+", metavar="FILE",
+        help="summarize several ledger files or globs together, in parallel (charts only with --export)",
+    )
+    reports_parser.add_argument("--workers", type=int, help="worker processes for --files (default: one per CPU)")
+    reports_parser.add_argument("--no-charts", action="store_true", help="print the text reports only")
+    reports_parser.add_argument("--export", metavar="DIR", help="save the charts to DIR instead of showing them")
+    reports_parser.add_argument(
+        "--format", nargs="+", default=["png"], choices=["png", "svg", "pdf"],
+        help="image formats for --export (default: png)",
+    )
+
+    migrate_parser = modes.add_parser("migrate", help="copy the CSV ledger into SQLite")
+    migrate_parser.add_argument("csv_file", nargs="?", default="transactions.csv")
+    migrate_parser.add_argument("db_file", nargs="?", default="transactions.db")
+
+    return parser.parse_args(argv)
+
 def main():
     """
     Main function to determine the mode of operation.
 
     If the first command-line argument is 'reports', runs reports in the console.
+    If it is 'migrate', converts the CSV ledger to SQLite.
     Otherwise, launches the GUI.
     """
-    if len(sys.argv) > 1 and sys.argv[1] == "reports":
-        run_reports()
+    args = parse_args()
+    stats_file = args.instrument_file or ("1" if args.instrument else None)
+    instrumented = setup_instrumentation(stats_file, args.profile)
+    if args.mode == "reports" and args.files:
+        run_reports_for_files(args.files, args.workers, args.export, args.format)
+    elif args.mode == "reports":
+        run_reports(args.file, args.stream_threshold, args.export, args.format, not args.no_charts)
+    elif args.mode == "migrate":
+        run_migrate(args.csv_file, args.db_file)
     else:
-        run_gui()
+        run_gui(instrumented)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,188 @@
+"""
+Exact money amounts as integer cents.
+
+Amounts used to be floats, parsed from the CSV text again by every report,
+and summing millions of floats drifts (0.1 + 0.2 != 0.3). Here an amount is
+converted once, when a row is read, to an int number of cents (to_cents),
+and every total is integer arithmetic, so it is exact however many rows are
+added. Columnar code keeps the cents in int64 arrays.
+
+Report totals are returned as Money, a small value type holding the cents.
+It adds exactly to other Money, compares equal to the float of the same
+amount (Money(1050) == 10.5), and is only turned into text at the output
+edges:
+
+    total = Money(1050) + Money(25)
+    str(total)            # '10.75'
+    format_money(total)   # '$10.75'
+    float(total)          # 10.75, e.g. for chart sizes
+    total * 2, round(total, 1), int(total)   # Money(2150), Money(1080), 10
+
+Money is not a float, so code that needs one, e.g. json.dumps, has to ask
+for it: json.dumps(summary, default=float) writes totals as numbers and
+default=str writes them as exact text ('10.75').
+"""
+
+from functools import total_ordering
+
+
+def to_cents(value):
+    """
+    Convert an amount to int cents, rounded to the nearest cent.
+
+    The float amount times 100 is rounded half to even, the rounding NumPy's
+    rint applies to whole columns, so rows and columns always agree. Amounts
+    with at most two decimals convert exactly.
+
+    Args:
+        value: A Money, or a number or numeric string in currency units
+            (e.g. '12.34', 12.34 or 12)
+
+    Returns:
+        int: The amount in cents
+
+    Raises:
+        ValueError: If value is not a finite number
+    """
+    if type(value) is Money:
+        return value.cents
+    if type(value) is int:
+        return value * 100
+    try:
+        return round(float(value) * 100)
+    except OverflowError:
+        raise ValueError(f"amount out of range: {value!r}") from None
+
+
+def format_money(value):
+    """
+    Format an amount for people to read, e.g. '$1,234.50' or '-$0.25'.
+
+    Args:
+        value: A Money, or an amount in currency units
+    """
+    cents = to_cents(value)
+    sign = "-" if cents < 0 else ""
+    units, rest = divmod(abs(cents), 100)
+    return f"{sign}${units:,}.{rest:02d}"
+
+
+@total_ordering
+class Money:
+    """
+    An exact amount of money.
+
+    Arithmetic with Money or ints stays exact (ints count as currency
+    units); mixing in a float gives a float. Comparisons with plain numbers
+    are in currency units. round() works like it does on floats, but rounds
+    the exact cents (half to even) and keeps the result Money when digits
+    are given.
+
+    Attributes:
+        cents (int): The amount in cents
+    """
+
+    __slots__ = ("cents",)
+
+    def __init__(self, cents=0):
+        self.cents = cents
+
+    @classmethod
+    def parse(cls, value):
+        """Return value (see to_cents) as Money."""
+        return cls(to_cents(value))
+
+    def __str__(self):
+        units, rest = divmod(abs(self.cents), 100)
+        return f"{'-' if self.cents < 0 else ''}{units}.{rest:02d}"
+
+    def __repr__(self):
+        return f"Money({self.cents})"
+
+    def __format__(self, spec):
+        return str(self) if not spec else format(float(self), spec)
+
+    def __float__(self):
+        return self.cents / 100
+
+    def __int__(self):
+        # Truncates toward zero, like int() of a float
+        units = abs(self.cents) // 100
+        return -units if self.cents < 0 else units
+
+    def __round__(self, ndigits=None):
+        step = 100 if ndigits is None else 10 ** max(2 - ndigits, 0)
+        steps, rest = divmod(self.cents, step)
+        if 2 * rest > step or (2 * rest == step and steps % 2):
+            steps += 1
+        return steps if ndigits is None else Money(steps * step)
+
+    def __bool__(self):
+        return self.cents != 0
+
+    def __reduce__(self):
+        return (Money, (self.cents,))
+
+    def __add__(self, other):
+        if type(other) is Money:
+            return Money(self.cents + other.cents)
+        if type(other) is int:
+            return Money(self.cents + other * 100)
+        if isinstance(other, float):
+            return float(self) + other
+        return NotImplemented
+
+    __radd__ = __add__  # sum() starts from 0
+
+    def __sub__(self, other):
+        if type(other) in (Money, int) or isinstance(other, float):
+            return self.__add__(-other)
+        return NotImplemented
+
+    def __rsub__(self, other):
+        return (-self).__add__(other)
+
+    def __neg__(self):
+        return Money(-self.cents)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return Money(abs(self.cents))
+
+    def __mul__(self, other):
+        if type(other) is int:
+            return Money(self.cents * other)
+        if isinstance(other, float):
+            return float(self) * other
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if type(other) is Money:
+            return self.cents / other.cents
+        return float(self) / other
+
+    def _compare_value(self, other):
+        """Return (own value, other value) in matching exact units, or None."""
+        if type(other) is Money:
+            return self.cents, other.cents
+        if type(other) is int:
+            return self.cents, other * 100
+        if isinstance(other, float):
+            return float(self), other
+        return None
+
+    def __eq__(self, other):
+        values = self._compare_value(other)
+        return NotImplemented if values is None else values[0] == values[1]
+
+    def __lt__(self, other):
+        values = self._compare_value(other)
+        return NotImplemented if values is None else values[0] < values[1]
+
+    def __hash__(self):
+        # Equal to the float of the same amount, so hash like it
+        return hash(self.cents / 100)
@@ -0,0 +1,360 @@
+"""
+Compact, typed transaction records.
+
+csv.DictReader gives every row as a dictionary of seven strings, and every
+summary then re-parses the amount and re-strips the date. A Transaction
+holds a row in slots instead, converted once when it is read:
+
+- id as an int (ids that are not plain integers are kept as text)
+- date as a date ordinal (date.toordinal()), or None if it is not a date
+- amount as an int number of cents (see money.py)
+- the name, category, type and essential columns as interned strings, so
+  rows share one copy of each distinct value
+
+A Transaction is also a read/write Mapping of the CSV columns, with the
+values a CSV row has (t["id"] is a string, t["date"] the date text), so
+code written for dictionaries keeps working:
+
+    t = Transaction.from_row({"id": "7", "date": "2025-01-31", ...})
+    t.id, t.date, t.month       # 7, 739282, '2025-01'
+    t.cents, t.amount           # 10050, Money(10050)
+    t["id"], t["amount"]        # '7', 100.5
+"""
+
+import sys
+from collections.abc import Mapping
+from datetime import date
+
+from money import Money, to_cents
+
+FIELDNAMES = ['id', 'transaction_name', 'transaction_category', 'date', 'income_expense', 'amount', 'essential']
+
+# Text columns, stored interned
+_TEXT_FIELDS = ('transaction_name', 'transaction_category', 'income_expense', 'essential')
+
+# Ledgers repeat a small set of dates, so conversions are memoized. The
+# memos are cleared if unusual data makes them grow past this many entries.
+_MEMO_LIMIT = 100000
+_DATES = {}   # date text -> (ordinal or None, text to keep or None)
+_ISO = {}     # ordinal -> 'YYYY-MM-DD'
+_MONTHS = {}  # ordinal -> 'YYYY-MM'
+
+_intern = sys.intern
+
+
+def _remember(memo, key, value):
+    if len(memo) >= _MEMO_LIMIT:
+        memo.clear()
+    memo[key] = value
+    return value
+
+
+def iso_date(ordinal):
+    """Return the 'YYYY-MM-DD' text of a date ordinal."""
+    try:
+        return _ISO[ordinal]
+    except KeyError:
+        return _remember(_ISO, ordinal, _intern(date.fromordinal(ordinal).isoformat()))
+
+
+def month_of(ordinal):
+    """Return the 'YYYY-MM' month of a date ordinal."""
+    try:
+        return _MONTHS[ordinal]
+    except KeyError:
+        return _remember(_MONTHS, ordinal, _intern(iso_date(ordinal)[:7]))
+
+
+def _date_fields(text):
+    """Return (ordinal, date_text) slot values for a date string, memoized."""
+    try:
+        return _DATES[text]
+    except KeyError:
+        pass
+    try:
+        stripped = text.strip()
+        ordinal = date.fromisoformat(stripped).toordinal()
+        if iso_date(ordinal) != stripped:
+            ordinal = None  # other ISO spellings such as '20250131'
+    except (ValueError, TypeError, AttributeError):
+        ordinal = None
+    keep = None if ordinal is not None and iso_date(ordinal) == text else _text(text)
+    return _remember(_DATES, text, (ordinal, keep))
+
+
+def parse_date(text):
+    """
+    Convert date text to an ordinal.
+
+    Surrounding whitespace is ignored, like the reports always did.
+
+    Returns:
+        int: The ordinal, or None unless the text is a YYYY-MM-DD date.
+    """
+    return _date_fields(text)[0]
+
+
+def parse_id(value):
+    """Return an id as an int, or as text if it is not written as a plain integer."""
+    if type(value) is int:
+        return value
+    text = '' if value is None else str(value)
+    try:
+        number = int(text)
+    except ValueError:
+        return text
+    return number if str(number) == text else text
+
+
+def _text(value):
+    return _intern('' if value is None else str(value))
+
+
+class Transaction(Mapping):
+    """
+    One transaction, see the module docstring.
+
+    The positional constructor takes already-converted values; use
+    from_row() to convert a CSV-style dictionary.
+
+    Attributes:
+        id (int): Transaction id (str if the ledger's id is not an integer)
+        date (int): Date ordinal, or None if the date is not valid
+        date_text (str): The original date text when it is not exactly
+            the ISO form of date (e.g. blank or padded), else None
+        cents (int): Amount of money in cents (amount gives it as Money)
+        transaction_name, transaction_category, income_expense, essential
+            (str): The text columns, interned
+    """
+
+    __slots__ = ('id', 'transaction_name', 'transaction_category', 'date', 'income_expense',
+                 'cents', 'essential', 'date_text')
+
+    def __init__(self, id, transaction_name, transaction_category, date, income_expense,
+                 cents, essential='', date_text=None):
+        self.id = id
+        self.transaction_name = transaction_name
+        self.transaction_category = transaction_category
+        self.date = date
+        self.income_expense = income_expense
+        self.cents = cents
+        self.essential = essential
+        self.date_text = date_text
+
+    @classmethod
+    def from_row(cls, row):
+        """
+        Convert a dictionary keyed like the CSV columns.
+
+        Raises:
+            ValueError: If the amount is not a number
+        """
+        values = [row.get(field, '') for field in FIELDNAMES]
+        if type(values[3]) is str:
+            try:
+                return from_values(values)
+            except TypeError:
+                pass  # some values are not text yet
+        record = cls.__new__(cls)
+        for field, value in zip(FIELDNAMES, values):
+            record[field] = value
+        return record
+
+    # Mapping interface, with CSV-style values (the amount as a float)
+
+    def __getitem__(self, key):
+        if key == 'id':
+            return str(self.id)
+        if key == 'date':
+            return self.date_str
+        if key == 'amount':
+            return self.cents / 100
+        if key in _SLOT_FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == 'id':
+            self.id = parse_id(value)
+        elif key == 'date':
+            self.date, self.date_text = _date_fields('' if value is None else str(value))
+        elif key == 'amount':
+            self.cents = to_cents(value)
+        elif key in _TEXT_FIELDS:
+            setattr(self, key, _text(value))
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        return iter(FIELDNAMES)
+
+    def __len__(self):
+        return len(FIELDNAMES)
+
+    def __contains__(self, key):
+        return key in _SLOT_FIELDS
+
+    def keys(self):
+        return list(FIELDNAMES)
+
+    def values(self):
+        """The CSV values in column order (faster than the Mapping default)."""
+        return [str(self.id), self.transaction_name, self.transaction_category, self.date_str,
+                self.income_expense, self.cents / 100, self.essential]
+
+    def __eq__(self, other):
+        if type(other) is Transaction:
+            return all(getattr(self, slot) == getattr(other, slot) for slot in Transaction.__slots__)
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None  # mutable
+
+    def __repr__(self):
+        return f"Transaction({dict(self)!r})"
+
+    def __reduce__(self):
+        return (Transaction, tuple(getattr(self, slot) for slot in Transaction.__slots__))
+
+    def copy(self):
+        return Transaction(*(getattr(self, slot) for slot in Transaction.__slots__))
+
+    # Derived values
+
+    @property
+    def amount(self):
+        """The amount as Money."""
+        return Money(self.cents)
+
+    @amount.setter
+    def amount(self, value):
+        self.cents = to_cents(value)
+
+    @property
+    def date_str(self):
+        """The date as it is written in the ledger."""
+        if self.date_text is not None:
+            return self.date_text
+        return '' if self.date is None else iso_date(self.date)
+
+    @property
+    def month(self):
+        """'YYYY-MM' month of the transaction (from the stripped text if the date is not valid)."""
+        try:
+            return _MONTHS[self.date]
+        except KeyError:
+            pass
+        return month_of(self.date) if self.date is not None else self.date_str.strip()[:7]
+
+
+_SLOT_FIELDS = frozenset(FIELDNAMES)
+
+
+def from_values(values):
+    """
+    Build a Transaction from one value per column, in FIELDNAMES order.
+
+    This is the fast path for CSV records and database rows: the id and
+    amount may already be numbers, everything else is text.
+
+    Raises:
+        ValueError: If the amount is not a number
+    """
+    row_id, name, category, date_text, kind, amount, essential = values
+    try:
+        ordinal, kept = _DATES[date_text]
+    except KeyError:
+        ordinal, kept = _date_fields(date_text)
+    if type(amount) is str:
+        try:
+            cents = round(float(amount) * 100)  # to_cents, inlined for the load loop
+        except OverflowError:
+            raise ValueError(f"amount out of range: {amount!r}") from None
+    else:
+        cents = to_cents(amount)
+    return Transaction(parse_id(row_id), _intern(name), _intern(category), ordinal, _intern(kind),
+                       cents, _intern(essential), kept)
+
+
+def as_transaction(row):
+    """Return row as a Transaction, converting a dictionary if needed."""
+    return row if type(row) is Transaction else Transaction.from_row(row)
+
+
+def as_transactions(rows):
+    """
+    Return rows as an iterable of Transactions, converting dictionaries if needed.
+
+    A list or tuple that holds only Transactions is returned as it is, so
+    loops over it run without a per-row check.
+    """
+    if type(rows) in (list, tuple) and set(map(type, rows)) <= {Transaction}:
+        return rows
+    return (row if type(row) is Transaction else Transaction.from_row(row) for row in rows)
+
+
+class RowTable(dict):
+    """
+    Transactions in storage order, keyed by id.
+
+    A hand-edited ledger can hold several rows with the same id, or with a
+    blank one, and all of them have to survive a rewrite. The first row
+    with an id is stored under the id, so table[row_id] finds the same row
+    a scan of the file would; later ones are stored under (id, n) keys,
+    which no id equals. Like the original list code, remove() drops every
+    row with an id and put() replaces the first one.
+    """
+
+    def __init__(self, rows=()):
+        super().__init__()
+        self._extra = {}  # id -> keys of the rows after the first with that id
+        self._serial = 0
+        for row in rows:
+            self.add(row)
+
+    def add(self, row):
+        """Append row, even if another row already has its id."""
+        if row.id in self:
+            self._serial += 1
+            key = (row.id, self._serial)
+            self._extra.setdefault(row.id, []).append(key)
+            self[key] = row
+        else:
+            self[row.id] = row
+
+    def put(self, row):
+        """Replace the first row with row's id in place, or append row."""
+        if row.id in self:
+            self[row.id] = row
+        else:
+            self.add(row)
+
+    def remove(self, row_id):
+        """
+        Remove every row with row_id.
+
+        Returns:
+            list: The removed rows, in storage order
+        """
+        removed = []
+        row = self.pop(row_id, None)
+        if row is not None:
+            removed.append(row)
+        for key in self._extra.pop(row_id, ()):
+            removed.append(self.pop(key))
+        return removed
+
+    def rekey(self, old_id, row):
+        """
+        File row, the first row with old_id, under its new (unused) id.
+
+        The row keeps its place, and the next row with old_id, if any,
+        becomes the first.
+        """
+        extra = self._extra.pop(old_id, None)
+        promoted = extra.pop(0) if extra else None
+        if extra:
+            self._extra[old_id] = extra
+        items = [(row.id if key == old_id else old_id if key is promoted else key, value)
+                 for key, value in self.items()]
+        self.clear()
+        self.update(items)
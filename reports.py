@@ -1,113 +1,622 @@
 import csv
+import heapq
+import os
 from collections import defaultdict
-import matplotlib.pyplot as plt
-from datetime import datetime
-import pandas as pd
-import seaborn as sns
+from itertools import chain, repeat
+from money import Money
+from records import as_transactions
+from storage import CsvBackend, JournaledCsvBackend, has_journal
+
+# matplotlib, pandas, NumPy (charts, ledger) and the process pool are imported
+# inside the methods that use them, so text-only reports start fast.
+
+
+def _pushdown(transactions, name, *args):
+    """
+    Let a data source compute an aggregate itself, if it knows how.
+
+    Sources such as storage.SqliteBackend (or a filtered view from its
+    where()) implement total_income(), category_summary(), ... natively.
+    Plain lists of transactions do not, and get None back so the caller
+    falls through to the Python implementation.
+    """
+    method = getattr(transactions, name, None)
+    if callable(method):
+        return method(*args)
+    return None
+
+
+def _csv_backend(filename, **kwargs):
+    """
+    Return a backend that reads filename as TransactionManager sees it.
+
+    Edits still in the file's journal (see storage.JournaledCsvBackend) are
+    replayed over it; the files themselves are left as they are.
+    """
+    return (JournaledCsvBackend if has_journal(filename) else CsvBackend)(filename, **kwargs)
+
+
+def _monthly_money(months):
+    """Wrap the int cents of a monthly summary in Money."""
+    return {month: {"income": Money(v["income"]), "expense": Money(v["expense"])} for month, v in months.items()}
+
+
+def _money_text(value, nested=False):
+    """Render a value for a CSV cell, with Money as e.g. 350.00, also inside dictionaries."""
+    if isinstance(value, Money):
+        return str(value)
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{key!r}: {_money_text(item, True)}" for key, item in value.items()) + "}"
+    return repr(value) if nested else value
+
+
+def summarize_file(filename, n=5, chunk_size=10000):
+    """
+    Stream one ledger file through Reports.compute_all.
+
+    Kept at module level so a process pool can send it to worker processes.
+    """
+    reports = Reports()
+    return reports.compute_all(reports.iter_transactions_from_csv(filename, chunk_size), n)
+
+
+def merge_summaries(summaries, n=5):
+    """
+    Combine compute_all results from several ledgers into one.
+
+    Args:
+        summaries (iterable): Dictionaries returned by compute_all.
+        n (int): Number of top expenses to keep overall.
+
+    Returns:
+        dict: A compute_all style summary covering every input.
+    """
+    merged = {
+        "total_income": Money(),
+        "total_expenses": Money(),
+        "monthly_summary": defaultdict(lambda: {"income": Money(), "expense": Money()}),
+        "category_summary": defaultdict(Money),
+    }
+    tops = []
+    for summary in summaries:
+        merged["total_income"] += summary["total_income"]
+        merged["total_expenses"] += summary["total_expenses"]
+        for month, values in summary["monthly_summary"].items():
+            merged["monthly_summary"][month]["income"] += values["income"]
+            merged["monthly_summary"][month]["expense"] += values["expense"]
+        for category, total in summary["category_summary"].items():
+            merged["category_summary"][category] += total
+        tops.append(summary["top_expenses"])
+
+    merged["balance"] = merged["total_income"] - merged["total_expenses"]
+    merged["monthly_summary"] = dict(sorted(merged["monthly_summary"].items()))
+    merged["category_summary"] = dict(merged["category_summary"])
+    merged["top_expenses"] = heapq.nlargest(n, as_transactions(chain.from_iterable(tops)),
+                                            key=lambda t: t.cents)
+    return merged
+
+
+# Charts that Reports.render_charts can draw: name -> (draw method, figure size)
+CHARTS = {
+    "expense_pie": ("draw_expense_pie", (6, 6)),
+    "cumulative_balance": ("draw_cumulative_balance", (10, 5)),
+    "stacked_expense_categories": ("draw_stacked_expense_categories", (10, 6)),
+}
+
+
+def render_ledger_charts(filename, out_dir, formats=("png",), charts=None):
+    """
+    Load one ledger file and render its charts to out_dir.
+
+    Kept at module level so a process pool can send it to worker processes.
+    """
+    reports = Reports()
+    return reports.render_charts(reports.load_transactions_from_csv(filename), out_dir, formats, charts)
+
+
+class RunningSummary:
+    """
+    Report totals kept up to date incrementally instead of recomputed.
+
+    Register it with TransactionManager.add_listener() and every add, update
+    or delete is applied as a delta: O(1) for the totals, monthly and
+    category sums, and O(log N) for the top expenses heap. Rows are
+    records.Transaction objects, as TransactionManager passes them. It implements the
+    same aggregate hooks as the other data sources, so it can be passed to
+    any Reports summary method. Amounts are kept in int cents, so the totals
+    stay exact however many changes are applied:
+
+        summary = RunningSummary()
+        tm.add_listener(summary)
+        Reports().get_category_summary(summary)
+    """
+
+    def __init__(self):
+        self.on_reload([])
+
+    def on_reload(self, rows):
+        """Start over from a full list of transactions."""
+        self._income = 0
+        self._expenses = 0
+        self._categories = {}       # category -> [total cents, row count]
+        self._months = {}           # month -> {"income": x, "expense": y, "count": n}, in cents
+        self._expense_rows = {}     # id(row) -> (row, version) for live expenses
+        self._heap = []             # (-cents, version, id(row)), may hold stale entries
+        self._version = 0
+        for row in rows:
+            self.on_add(row)
+
+    def on_add(self, row):
+        cents = row.cents
+        kind = row.income_expense
+
+        category = row.transaction_category.strip()
+        entry = self._categories.setdefault(category, [0, 0])
+        entry[0] += cents
+        entry[1] += 1
+
+        if kind not in ("income", "expense"):
+            return
+        month = self._months.setdefault(row.month, {"income": 0, "expense": 0, "count": 0})
+        month[kind] += cents
+        month["count"] += 1
+
+        if kind == "income":
+            self._income += cents
+        else:
+            self._expenses += cents
+            self._version += 1
+            self._expense_rows[id(row)] = (row, self._version)
+            # The version breaks ties, so rows of equal amounts keep the
+            # order they were added in and their ids are never compared
+            heapq.heappush(self._heap, (-cents, self._version, id(row)))
+            if len(self._heap) > 2 * len(self._expense_rows) + 16:
+                self._compact_heap()
+
+    def on_delete(self, row):
+        cents = row.cents
+        kind = row.income_expense
+
+        category = row.transaction_category.strip()
+        entry = self._categories[category]
+        entry[0] -= cents
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self._categories[category]
+
+        if kind not in ("income", "expense"):
+            return
+        key = row.month
+        month = self._months[key]
+        month[kind] -= cents
+        month["count"] -= 1
+        if month["count"] == 0:
+            del self._months[key]
+
+        if kind == "income":
+            self._income -= cents
+        else:
+            self._expenses -= cents
+            self._expense_rows.pop(id(row), None)  # its heap entry is now stale
+
+    def on_update(self, old_row, new_row):
+        self.on_delete(old_row)
+        self._expense_rows.pop(id(new_row), None)  # old_row is a copy; new_row is the tracked row
+        self.on_add(new_row)
+
+    def _is_live(self, entry):
+        live = self._expense_rows.get(entry[2])
+        return live is not None and live[1] == entry[1]
+
+    def _compact_heap(self):
+        self._heap = [entry for entry in self._heap if self._is_live(entry)]
+        heapq.heapify(self._heap)
+
+    def total_income(self):
+        return Money(self._income)
+
+    def total_expenses(self):
+        return Money(self._expenses)
+
+    def balance(self):
+        return Money(self._income - self._expenses)
+
+    def monthly_summary(self):
+        return {month: {"income": Money(v["income"]), "expense": Money(v["expense"])}
+                for month, v in self._months.items()}
+
+    def category_summary(self):
+        return {category: Money(entry[0]) for category, entry in self._categories.items()}
+
+    def top_expenses(self, n=5):
+        popped = []
+        top = []
+        while self._heap and len(top) < n:
+            entry = heapq.heappop(self._heap)
+            if self._is_live(entry):
+                popped.append(entry)
+                top.append(self._expense_rows[entry[2]][0].copy())
+        for entry in popped:
+            heapq.heappush(self._heap, entry)
+        return top
 
 
 class Reports:
     
     def load_transactions_from_csv(self, filename='transactions.csv'):
         """
-        Load transactions from a CSV file and return a list of dictionaries.
-        Each row becomes a dictionary with string values.
+        Load transactions from a CSV file and return a list of
+        records.Transaction objects. Rows with an unreadable amount are skipped.
+        """
+        rows, _ = _csv_backend(filename, snapshot_min_bytes=None).load()
+        return rows
+
+    def scan_csv(self, filename='transactions.csv'):
+        """
+        Read only the columns the summaries need, straight from the file.
+
+        The file is memory-mapped and scanned without building a dictionary
+        per row (see scanner.py). Pass the result to any summary method or
+        compute_all; the results are identical to those for
+        load_transactions_from_csv(). Files the scanner cannot handle, and
+        files with unfolded journal entries, are loaded that way instead.
+
+        Args:
+            filename (str): CSV file to read.
+
+        Returns:
+            CsvScanner or list: A source for the summary methods.
         """
-        with open(filename, newline="") as f:
-            reader = csv.DictReader(f)
-            return list(reader)
+        from scanner import scan_csv
+
+        scanned = None if has_journal(filename) else scan_csv(filename)
+        return scanned if scanned is not None else self.load_transactions_from_csv(filename)
+
+    def load_ledger(self, filename='transactions.csv'):
+        """
+        Load a CSV file as a ledger.ColumnarLedger for fast summaries.
+
+        A fresh binary snapshot of the file (see snapshot.py) is mapped into
+        memory instead of parsing the CSV. Otherwise the CSV is parsed and
+        the snapshot is rebuilt in the background for next time. A file
+        with unfolded journal entries is loaded with them replayed, without
+        the snapshot, which only ever covers the CSV file.
+
+        Args:
+            filename (str): CSV file to read.
+
+        Returns:
+            ColumnarLedger: Every transaction with a readable amount.
+        """
+        from ledger import ColumnarLedger
+        from snapshot import Snapshot
+
+        if has_journal(filename):
+            return ColumnarLedger.from_transactions(self.load_transactions_from_csv(filename))
+        snapshot = Snapshot(filename)
+        ledger = snapshot.load_ledger()
+        if ledger is None:
+            rows, _ = CsvBackend(filename, snapshot_min_bytes=None).load()
+            ledger = ColumnarLedger.from_transactions(rows)
+            snapshot.rebuild_in_background()
+        return ledger
+
+    def iter_transaction_chunks(self, filename='transactions.csv', chunk_size=10000):
+        """
+        Stream transactions from a CSV file in chunks.
+
+        Only one chunk is held in memory at a time, except for a file with
+        unfolded journal entries, which has to be loaded whole to replay
+        them (fold the journal first, see JournaledCsvBackend.compact). Rows
+        with an unreadable amount are skipped.
+
+        Args:
+            filename (str): CSV file to read.
+            chunk_size (int): Maximum number of rows per chunk.
+
+        Yields:
+            list: records.Transaction objects.
+        """
+        return _csv_backend(filename).iter_chunks(chunk_size)
+
+    def iter_transactions_from_csv(self, filename='transactions.csv', chunk_size=10000):
+        """
+        Stream transactions from a CSV file one row at a time.
+
+        The result can be passed to any summary method (or compute_all) to
+        summarize a ledger too big to load, in constant memory.
+
+        Returns:
+            iterator: records.Transaction objects.
+        """
+        return chain.from_iterable(self.iter_transaction_chunks(filename, chunk_size))
 
     def calculate_total_income(self, transactions):
         """
         Calculate the total income from a list of transactions.
 
         Args:
-            transactions (list): List of transaction dictionaries.
+            transactions (list): List of Transactions (or transaction
+                dictionaries), or a source that computes the aggregate
+                itself (e.g. an SqliteBackend).
 
         Returns:
-            float: Total income amount.
+            Money: Total income amount.
         """
-        return sum(float(t["amount"]) for t in transactions if t["income_expense"] == "income")
+        pushed = _pushdown(transactions, "total_income")
+        if pushed is not None:
+            return pushed
+        return Money(sum(t.cents for t in as_transactions(transactions) if t.income_expense == "income"))
 
     def calculate_total_expenses(self, transactions):
         """
         Calculate the total expenses from a list of transactions.
 
         Args:
-            transactions (list): List of transaction dictionaries.
+            transactions (list): List of Transactions (or transaction
+                dictionaries), or a source that computes the aggregate
+                itself (e.g. an SqliteBackend).
 
         Returns:
-            float: Total expense amount.
+            Money: Total expense amount.
         """
-        return sum(float(t["amount"]) for t in transactions if t["income_expense"] == "expense")
+        pushed = _pushdown(transactions, "total_expenses")
+        if pushed is not None:
+            return pushed
+        return Money(sum(t.cents for t in as_transactions(transactions) if t.income_expense == "expense"))
 
     def calculate_balance(self, transactions):
         """
         Calculate the current balance based on income and expenses.
 
         Args:
-            transactions (list): List of transaction dictionaries.
+            transactions (list): List of Transactions (or transaction
+                dictionaries), or a source that computes the aggregate
+                itself (e.g. an SqliteBackend).
 
         Returns:
-            float: Net balance (income - expenses).
+            Money: Net balance (income - expenses).
         """
-        return self.calculate_total_income(transactions) - self.calculate_total_expenses(transactions)
+        pushed = _pushdown(transactions, "balance")
+        if pushed is not None:
+            return pushed
+        income = 0
+        expenses = 0
+        for t in as_transactions(transactions):
+            if t.income_expense == "income":
+                income += t.cents
+            elif t.income_expense == "expense":
+                expenses += t.cents
+        return Money(income - expenses)
 
     def get_monthly_summary(self, transactions):
         """
         Summarize income and expenses for each month.
 
         Args:
-            transactions (list): List of transaction dictionaries.
+            transactions (list): List of Transactions (or transaction
+                dictionaries), or a source that computes the aggregate
+                itself (e.g. an SqliteBackend).
 
         Returns:
-            dict: Dictionary with month keys and income/expense totals.
+            dict: Dictionary with month keys and income/expense totals
+                (Money).
         """
+        pushed = _pushdown(transactions, "monthly_summary")
+        if pushed is not None:
+            return pushed
         summary = defaultdict(lambda: {"income": 0, "expense": 0})
-        for t in transactions:
-            # Handle the space in the date column name
-            date = t["date"].strip()  # Remove any extra whitespace
-            month = date[:7]
-            if t["income_expense"] == "income":
-                summary[month]["income"] += float(t["amount"])
-            elif t["income_expense"] == "expense":
-                summary[month]["expense"] += float(t["amount"])
-        return dict(summary)
+        for t in as_transactions(transactions):
+            if t.income_expense == "income":
+                summary[t.month]["income"] += t.cents
+            elif t.income_expense == "expense":
+                summary[t.month]["expense"] += t.cents
+        return _monthly_money(summary)
 
     def get_category_summary(self, transactions):
         """
         Summarize total transaction amounts by transaction category.
 
         Args:
-            transactions (list): List of transaction dictionaries.
+            transactions (list): List of Transactions (or transaction
+                dictionaries), or a source that computes the aggregate
+                itself (e.g. an SqliteBackend).
 
         Returns:
-            dict: Dictionary of transaction categories with summed amounts.
+            dict: Dictionary of transaction categories with summed amounts
+                (Money).
         """
-        summary = defaultdict(float)
-        for t in transactions:
-            category = t["transaction_category"].strip()
-            summary[category] += float(t["amount"])
-        return dict(summary)
+        pushed = _pushdown(transactions, "category_summary")
+        if pushed is not None:
+            return pushed
+        summary = defaultdict(int)
+        for t in as_transactions(transactions):
+            summary[t.transaction_category.strip()] += t.cents
+        return {category: Money(cents) for category, cents in summary.items()}
 
     def get_top_expenses(self, transactions, n=5):
         """
         Retrieve the top N largest expense transactions.
 
         Args:
-            transactions (list): List of transaction dictionaries.
+            transactions (list): List of Transactions (or transaction
+                dictionaries), or a source that computes the aggregate
+                itself (e.g. an SqliteBackend).
             n (int): Number of top expenses to return.
 
         Returns:
-            list: Top N expense transaction dictionaries.
+            list: Top N expense Transactions.
+        """
+        pushed = _pushdown(transactions, "top_expenses", n)
+        if pushed is not None:
+            return pushed
+        expenses = (t for t in as_transactions(transactions) if t.income_expense == "expense")
+        return heapq.nlargest(n, expenses, key=lambda t: t.cents)
+
+    def compute_all(self, transactions, n=5):
+        """
+        Compute every console report figure in a single pass over the data.
+
+        Totals, monthly and category summaries are accumulated together, and
+        the top N expenses are kept in a bounded heap instead of sorting all
+        expenses. Amounts are added as int cents and only the results are
+        wrapped in Money. Works on any iterable, including a one-shot iterator.
+
+        Args:
+            transactions (iterable): Transactions (or transaction dictionaries),
+                or a source that computes the aggregates itself (e.g. an
+                SqliteBackend).
+            n (int): Number of top expenses to keep.
+
+        Returns:
+            dict: Keys 'total_income', 'total_expenses', 'balance',
+                'monthly_summary', 'category_summary' and 'top_expenses',
+                with the same values the individual methods return.
+        """
+        if callable(getattr(transactions, "total_income", None)):
+            return {
+                "total_income": transactions.total_income(),
+                "total_expenses": transactions.total_expenses(),
+                "balance": transactions.balance(),
+                "monthly_summary": transactions.monthly_summary(),
+                "category_summary": transactions.category_summary(),
+                "top_expenses": transactions.top_expenses(n),
+            }
+
+        total_income = 0
+        total_expenses = 0
+        monthly = defaultdict(lambda: {"income": 0, "expense": 0})
+        categories = defaultdict(int)
+        top = []  # min-heap of (cents, -position, row), at most n long
+
+        for position, t in enumerate(as_transactions(transactions)):
+            cents = t.cents
+            kind = t.income_expense
+            categories[t.transaction_category.strip()] += cents
+            if kind == "income":
+                total_income += cents
+                monthly[t.month]["income"] += cents
+            elif kind == "expense":
+                total_expenses += cents
+                monthly[t.month]["expense"] += cents
+                if n > 0:
+                    entry = (cents, -position, t)
+                    if len(top) < n:
+                        heapq.heappush(top, entry)
+                    elif entry[:2] > top[0][:2]:
+                        heapq.heapreplace(top, entry)
+
+        top.sort(key=lambda entry: entry[:2], reverse=True)
+        return {
+            "total_income": Money(total_income),
+            "total_expenses": Money(total_expenses),
+            "balance": Money(total_income - total_expenses),
+            "monthly_summary": _monthly_money(monthly),
+            "category_summary": {category: Money(cents) for category, cents in categories.items()},
+            "top_expenses": [entry[2] for entry in top],
+        }
+
+    def summarize_files(self, filenames, n=5, max_workers=None):
+        """
+        Summarize several ledger files in parallel and merge the results.
+
+        Each file is streamed and summarized in its own worker process, so
+        throughput grows with the number of CPU cores.
+
+        Args:
+            filenames (list): Ledger CSV files, e.g. one per account or year.
+            n (int): Number of top expenses to keep.
+            max_workers (int): Process count (default: one per CPU).
+
+        Returns:
+            dict: A compute_all style summary covering every file.
+        """
+        filenames = list(filenames)
+        if len(filenames) == 1:
+            return summarize_file(filenames[0], n)
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            partials = list(pool.map(summarize_file, filenames, repeat(n)))
+        return merge_summaries(partials, n)
+
+    def render_charts(self, transactions, out_dir, formats=("png",), charts=None):
+        """
+        Render charts straight to image files, without a display.
+
+        Each chart gets its own Figure on the Agg canvas instead of going
+        through pyplot, so nothing is shown, no global state is touched and
+        the method is safe to call from servers and worker processes.
+
+        Args:
+            transactions (list): List of Transactions (or transaction dictionaries).
+            out_dir (str): Directory for the images (created if missing).
+            formats (tuple): File formats to write, e.g. ("png", "svg").
+            charts (list): Names from CHARTS to render (default: all).
+
+        Returns:
+            list: Paths of the files written. Charts with no data are skipped.
+        """
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        transactions = list(transactions)
+        os.makedirs(out_dir, exist_ok=True)
+        paths = []
+        for name in charts or CHARTS:
+            method, figsize = CHARTS[name]
+            fig = Figure(figsize=figsize)
+            FigureCanvasAgg(fig)
+            if not getattr(self, method)(fig.add_subplot(), transactions):
+                continue
+            fig.tight_layout()
+            for fmt in formats:
+                path = os.path.join(out_dir, f"{name}.{fmt}")
+                fig.savefig(path, format=fmt)
+                paths.append(path)
+        return paths
+
+    def export_chart_packs(self, filenames, out_dir, formats=("png",), max_workers=None):
         """
-        expenses = [t for t in transactions if t["income_expense"] == "expense"]
-        return sorted(expenses, key=lambda t: float(t["amount"]), reverse=True)[:n]
+        Render the charts of several ledger files in parallel processes.
+
+        Every ledger gets a subdirectory of out_dir named after the file. A
+        single ledger is split up by chart instead, so its charts are drawn
+        side by side.
+
+        Args:
+            filenames (list): Ledger CSV files.
+            out_dir (str): Directory for the chart packs.
+            formats (tuple): File formats to write, e.g. ("png", "svg").
+            max_workers (int): Process count (default: one per CPU).
+
+        Returns:
+            dict: Ledger file name -> list of paths written.
+        """
+        filenames = list(filenames)
+        jobs = []
+        for filename in filenames:
+            pack_dir = os.path.join(out_dir, os.path.splitext(os.path.basename(filename))[0])
+            if len(filenames) == 1:
+                jobs.extend((filename, pack_dir, [name]) for name in CHARTS)
+            else:
+                jobs.append((filename, pack_dir, None))
+
+        from concurrent.futures import ProcessPoolExecutor
+        packs = {filename: [] for filename in filenames}
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(render_ledger_charts, filename, pack_dir, tuple(formats), charts)
+                       for filename, pack_dir, charts in jobs]
+            for (filename, _, _), future in zip(jobs, futures):
+                packs[filename].extend(future.result())
+        return packs
 
     def export_summary_to_csv(self, summary_dict, filename="summary_report.csv"):
         """
         Export a summary dictionary to a CSV file.
 
+        Money values are written with exactly two decimals (e.g. 350.00),
+        also inside nested dictionaries such as a monthly summary.
+
         Args:
             summary_dict (dict): Summary data to write.
             filename (str): Name of the output CSV file.
@@ -116,86 +625,137 @@ class Reports:
             writer = csv.writer(f)
             writer.writerow(["Key", "Value"])
             for key, value in summary_dict.items():
-                writer.writerow([key, value])
+                writer.writerow([key, _money_text(value)])
 
     def plot_expense_pie(self, transactions):
         """
         Generate and display a pie chart of expenses by category.
 
         Args:
-            transactions (list): List of transaction dictionaries.
+            transactions (list): List of Transactions (or transaction dictionaries).
         """
-        category_totals = defaultdict(float)
-        for t in transactions:
-            if t["income_expense"] == "expense":
-                category_totals[t["transaction_name"]] += float(t["amount"])
+        import matplotlib.pyplot as plt
 
-        if not category_totals:
+        fig = plt.figure(figsize=(6, 6))
+        if not self.draw_expense_pie(fig.gca(), transactions):
+            plt.close(fig)
             print("No expenses to plot.")
             return
+        plt.show()
+
+    def draw_expense_pie(self, ax, transactions):
+        """
+        Draw the expense pie chart on an Axes.
+
+        Returns:
+            bool: False if there were no expenses to draw.
+        """
+        category_totals = defaultdict(int)
+        for t in as_transactions(transactions):
+            if t.income_expense == "expense":
+                category_totals[t.transaction_name] += t.cents
+
+        if not category_totals:
+            return False
 
         labels = list(category_totals.keys())
-        sizes = list(category_totals.values())
+        sizes = [cents / 100 for cents in category_totals.values()]
 
-        plt.figure(figsize=(6, 6))
-        plt.pie(sizes, labels=labels, autopct="%1.1f%%", startangle=90)
-        plt.title("Expenses by Category")
-        plt.axis("equal")
-        plt.show()
+        ax.pie(sizes, labels=labels, autopct="%1.1f%%", startangle=90)
+        ax.set_title("Expenses by Category")
+        ax.axis("equal")
+        return True
 
     def plot_cumulative_balance(self, transactions):
         """
         Generate and display a line chart of cumulative balance over time.
 
         Args:
-            transactions (list): List of transaction dictionaries.
+            transactions (list): List of Transactions (or transaction
+                dictionaries), or a ColumnarLedger.
         """
-        transactions_sorted = sorted(transactions, key=lambda x: x["date"])
-        balance = 0
-        dates = []
-        balances = []
+        import matplotlib.pyplot as plt
 
-        for t in transactions_sorted:
-            if t["income_expense"] == "income":
-                balance += float(t["amount"])
-            elif t["income_expense"] == "expense":
-                balance -= float(t["amount"])
-            dates.append(datetime.strptime(t["date"], "%Y-%m-%d"))
-            balances.append(balance)
-
-        plt.figure(figsize=(10, 5))
-        plt.plot(dates, balances, marker="o")
-        plt.title("Cumulative Balance Over Time")
-        plt.xlabel("Date")
-        plt.ylabel("Balance")
-        plt.grid(True)
+        fig = plt.figure(figsize=(10, 5))
+        self.draw_cumulative_balance(fig.gca(), transactions)
         plt.tight_layout()
         plt.show()
 
+    def draw_cumulative_balance(self, ax, transactions):
+        """
+        Draw the cumulative balance line chart on an Axes.
+
+        Returns:
+            bool: False if there were no dated transactions to draw.
+        """
+        import matplotlib.dates as mdates
+        from charts import DecimatedSeries, money_axis
+        from ledger import cumulative_balance_series
+
+        dates, balances = cumulative_balance_series(transactions)
+        if len(dates) == 0:
+            return False
+
+        # Long histories are reduced to about two points per pixel column
+        series = DecimatedSeries(mdates.date2num(dates), balances)
+        series.plot(ax, marker="o")
+        locator = mdates.AutoDateLocator()
+        ax.xaxis.set_major_locator(locator)
+        ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        ax.set_title("Cumulative Balance Over Time")
+        ax.set_xlabel("Date")
+        ax.set_ylabel("Balance")
+        money_axis(ax.yaxis)
+        ax.grid(True)
+        return True
+
     def plot_stacked_expense_categories(self, transactions):
         """
         Generate and display a stacked bar chart of monthly expenses by category.
 
         Args:
-            transactions (list): List of transaction dictionaries.
+            transactions (list): List of Transactions (or transaction dictionaries).
         """
-        expenses = [t for t in transactions if t["income_expense"] == "expense"]
-        data = defaultdict(lambda: defaultdict(float))
-
-        for t in expenses:
-            month = t["date"][:7]
-            data[month][t["transaction_name"]] += float(t["amount"])
+        import matplotlib.pyplot as plt
 
-        df = pd.DataFrame(data).T.fillna(0).sort_index()
-
-        df.plot(kind="bar", stacked=True, figsize=(10, 6))
-        plt.title("Monthly Expenses by Category")
-        plt.xlabel("Month")
-        plt.ylabel("Amount")
-        plt.xticks(rotation=45)
+        fig = plt.figure(figsize=(10, 6))
+        if not self.draw_stacked_expense_categories(fig.gca(), transactions):
+            plt.close(fig)
+            print("No expenses to plot.")
+            return
         plt.tight_layout()
-        plt.legend(title="Category")
         plt.show()
 
+    def draw_stacked_expense_categories(self, ax, transactions):
+        """
+        Draw the stacked monthly expense bar chart on an Axes.
+
+        Returns:
+            bool: False if there were no expenses to draw.
+        """
+        import pandas as pd
+        from charts import money_axis
+
+        expenses = [t for t in as_transactions(transactions) if t.income_expense == "expense"]
+        data = defaultdict(lambda: defaultdict(int))
+
+        for t in expenses:
+            month = t.date_str[:7]
+            data[month][t.transaction_name] += t.cents
+
+        if not data:
+            return False
+
+        df = (pd.DataFrame(data).T.fillna(0) / 100).sort_index()
+
+        df.plot(kind="bar", stacked=True, ax=ax)
+        ax.set_title("Monthly Expenses by Category")
+        ax.set_xlabel("Month")
+        ax.set_ylabel("Amount")
+        money_axis(ax.yaxis)
+        ax.tick_params(axis="x", labelrotation=45)
+        ax.legend(title="Category")
+        return True
+
 
 
@@ -0,0 +1,245 @@
+"""
+Report aggregates read straight from a memory-mapped CSV file.
+
+Totals and summaries only need four columns: amount, income_expense,
+transaction_category and date. CsvScanner maps the file and uses NumPy to
+find the field boundaries and cut those columns out of the raw bytes,
+without building a dictionary or a string per row. Only distinct category,
+type and date values become Python strings.
+
+A scanner provides the aggregate methods Reports looks for, so it can be
+passed anywhere a transaction list is accepted:
+
+    scanner = scan_csv("transactions.csv")  # None if the file can't be scanned
+    Reports().get_category_summary(scanner)
+
+Amounts are converted to int64 cents the way the row-by-row loader converts
+them (money.to_cents), and summed exactly, so the results are exactly what
+the summary methods return for Reports().load_transactions_from_csv().
+"""
+
+import csv
+import mmap
+import os
+
+import numpy as np
+
+from ledger import exact_sum, float_weights, group_sums, monthly_sums, top_indices
+from money import Money
+from records import Transaction
+
+# Longest amount, type, category or date field the scanner handles
+_MAX_FIELD_BYTES = 256
+
+# _KEEP_BYTES[k] keeps the first k bytes of a little-endian uint64
+_KEEP_BYTES = np.array([(1 << (8 * k)) - 1 for k in range(9)], dtype=np.uint64)
+
+_COMMA, _NEWLINE, _CR, _QUOTE = (ord(c) for c in ',\n\r"')
+
+
+def _unquoted(buf, positions):
+    """Drop delimiter positions that sit inside a quoted field."""
+    quotes = np.flatnonzero(buf == _QUOTE)
+    if len(quotes) == 0:
+        return positions
+    # A position is quoted when an odd number of quotes come before it
+    return positions[np.searchsorted(quotes, positions) % 2 == 0]
+
+
+def _gather(buf, starts, ends):
+    """
+    Copy byte ranges into a fixed-width bytes array, one item per range.
+
+    Bytes are read eight at a time through an unaligned uint64 view of the
+    buffer, then the bytes past each range's end are masked to NUL (which
+    'S' dtypes ignore).
+
+    Returns:
+        ndarray: dtype 'S<multiple of 8>', or None if a range is too long.
+    """
+    widths = ends - starts
+    width = int(widths.max()) if len(widths) else 1
+    if width > _MAX_FIELD_BYTES:
+        return None
+    words = max(-(-width // 8), 1)
+    out = np.zeros((len(starts), words), dtype="<u8")
+    last_word = len(buf) - 8  # last offset a whole word can be read from
+    if last_word >= 0:
+        view = np.ndarray((last_word + 1,), dtype="<u8", buffer=buf, strides=(1,))
+        for k in range(words):
+            word = view[np.minimum(starts + 8 * k, last_word)]
+            word &= _KEEP_BYTES[np.clip(widths - 8 * k, 0, 8)]
+            out[:, k] = word
+    # Fields within the last few bytes of the file cannot be read as whole words
+    for i in np.flatnonzero(starts + 8 * words > len(buf)):
+        field = bytes(buf[starts[i]:ends[i]]).ljust(8 * words, b"\0")
+        out[i] = np.frombuffer(field, dtype="<u8")
+    return out.view(f"S{8 * words}").ravel()
+
+
+def _encode(values, label):
+    """
+    Turn fixed-width byte values into codes and decoded labels.
+
+    Labels are decoded with csv rules (quotes removed) and normalized with
+    label(); values that normalize to the same label share a code. Labels
+    are in first-seen order, like a dictionary filled row by row.
+
+    Returns:
+        tuple: (int64 code array, list of labels)
+    """
+    # Sorting short integer keys is much faster than sorting byte strings,
+    # so factorize on a hash of the bytes and check for collisions
+    words = values.view("<u8").reshape(len(values), values.itemsize // 8)
+    hashes = np.zeros(len(values), dtype=np.uint64)
+    for k in range(words.shape[1]):
+        hashes *= np.uint64(1099511628211)
+        hashes ^= words[:, k]
+    _, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+    uniques = values[first]
+    if np.any(uniques[inverse.ravel()] != values):
+        uniques, first, inverse = np.unique(values, return_index=True, return_inverse=True)
+    table = {}
+    mapping = np.empty(len(uniques), dtype=np.int64)
+    for u in np.argsort(first, kind="stable"):
+        raw = uniques[u].decode("utf-8")
+        text = next(csv.reader([raw]))[0] if raw.startswith('"') else raw
+        mapping[u] = table.setdefault(label(text), len(table))
+    return mapping[inverse.ravel()], list(table)
+
+
+class CsvScanner:
+    """
+    Column data cut from a CSV file, with the report aggregates.
+
+    Build one with scan_csv().
+
+    Attributes:
+        cents (ndarray): int64 amount per row, in cents
+        kind, category, month (ndarray): codes into kind_labels,
+            category_labels and month_labels
+    """
+
+    def __init__(self, filename, header, row_starts, row_ends, cents,
+                 kind, kind_labels, category, category_labels, month, month_labels):
+        self.filename = filename
+        self.header = header
+        self.row_starts = row_starts
+        self.row_ends = row_ends
+        self.cents = cents
+        self._weights = float_weights(cents)
+        self.kind = kind
+        self.kind_labels = kind_labels
+        self.category = category
+        self.category_labels = category_labels
+        self.month = month
+        self.month_labels = month_labels
+
+    def __len__(self):
+        return len(self.cents)
+
+    def _kind_mask(self, income_expense):
+        if income_expense not in self.kind_labels:
+            return np.zeros(len(self.cents), dtype=bool)
+        return self.kind == self.kind_labels.index(income_expense)
+
+    def total_income(self):
+        return exact_sum(self.cents[self._kind_mask("income")])
+
+    def total_expenses(self):
+        return exact_sum(self.cents[self._kind_mask("expense")])
+
+    def balance(self):
+        return self.total_income() - self.total_expenses()
+
+    def monthly_summary(self):
+        return monthly_sums(self.month, self.month_labels, self.cents, self._weights,
+                            self._kind_mask("income"), self._kind_mask("expense"))
+
+    def category_summary(self):
+        totals = group_sums(self.category, self.cents, len(self.category_labels), self._weights)
+        return {label: Money(total) for label, total in zip(self.category_labels, totals)}
+
+    def top_expenses(self, n=5):
+        """Return the n largest expenses as records.Transaction objects, ties in file order."""
+        rows = []
+        with open(self.filename, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            for i in top_indices(self.cents, self._kind_mask("expense"), n):
+                line = buf[self.row_starts[i]:self.row_ends[i]].decode("utf-8")
+                rows.append(Transaction.from_row(next(csv.DictReader([line], fieldnames=self.header))))
+        return rows
+
+
+def scan_csv(filename):
+    """
+    Scan a transactions CSV file for the report aggregates.
+
+    Args:
+        filename (str): CSV file with a header row.
+
+    Returns:
+        CsvScanner: or None if the file is empty or something the scanner
+        does not handle (ragged rows, an unreadable amount, very long or
+        quoted amount fields). Use the row-by-row loader for those.
+    """
+    if os.path.getsize(filename) == 0:
+        return None
+    with open(filename, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        buf = np.frombuffer(mm, dtype=np.uint8)
+        try:
+            return _scan(filename, buf)
+        finally:
+            del buf  # release the buffer so the map can close
+
+
+def _scan(filename, buf):
+    newlines = _unquoted(buf, np.flatnonzero(buf == _NEWLINE))
+    if len(newlines) == 0 or newlines[-1] != len(buf) - 1:
+        newlines = np.append(newlines, len(buf))  # last line without a newline
+
+    header_end = int(newlines[0])
+    header = next(csv.reader([bytes(buf[:header_end]).decode("utf-8").rstrip("\r")]), [])
+    try:
+        columns = [header.index(name) for name in ("amount", "income_expense", "transaction_category", "date")]
+    except ValueError:
+        return None
+
+    starts = newlines[:-1] + 1
+    ends = newlines[1:].copy()
+    has_cr = (ends > starts) & (buf[np.maximum(ends - 1, 0)] == _CR)
+    ends -= has_cr
+
+    blank = ends == starts  # csv.DictReader skips these
+    starts, ends = starts[~blank], ends[~blank]
+    commas = _unquoted(buf, np.flatnonzero(buf == _COMMA))
+    commas = commas[commas > header_end]
+    if len(commas) != len(starts) * (len(header) - 1):
+        return None
+    commas = commas.reshape(len(starts), len(header) - 1)
+    # Commas and lines are both in file order, so every line has exactly
+    # its share of commas when each line's first and last fall inside it
+    if len(starts) and not (np.all(commas[:, 0] > starts) and np.all(commas[:, -1] < ends)):
+        return None
+
+    fields = []
+    for column in columns:
+        field_starts = starts if column == 0 else commas[:, column - 1] + 1
+        field_ends = ends if column == len(header) - 1 else commas[:, column]
+        values = _gather(buf, field_starts, field_ends)
+        if values is None:
+            return None
+        fields.append(values)
+
+    try:
+        # Rounded half to even like money.to_cents, on the same float values
+        scaled = np.rint(fields[0].astype(np.float64) * 100)
+    except ValueError:
+        return None  # the row-by-row loader skips such rows
+    if len(scaled) and not np.abs(scaled).max() < 2.0 ** 63:
+        return None  # not finite, or too large for int64 cents
+    cents = scaled.astype(np.int64)
+    kind, kind_labels = _encode(fields[1], str)
+    category, category_labels = _encode(fields[2], str.strip)
+    month, month_labels = _encode(fields[3], lambda d: d.strip()[:7])
+    return CsvScanner(filename, header, starts, ends, cents, kind, kind_labels,
+                      category, category_labels, month, month_labels)
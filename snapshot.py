@@ -0,0 +1,316 @@
+"""
+Binary snapshot of a transactions CSV file, for fast cold loads.
+
+Parsing a large CSV with csv.DictReader and float() on every row is slow.
+A Snapshot keeps the same data in a directory next to the file
+(transactions.csv.snapshot/): one .npy array of integer codes per text
+column, a string table per column, and the amounts in int64 cents. Loading
+maps the arrays into memory instead of parsing anything.
+
+The snapshot records the CSV's mtime, size and content hash. It is used only
+while it still matches the file; otherwise callers read the CSV as before and
+call rebuild_in_background() so the next load is fast again.
+
+    snap = Snapshot("transactions.csv")
+    loaded = snap.load()          # (rows, max_id), or None when stale
+    if loaded is None:
+        snap.rebuild_in_background()
+"""
+
+import csv
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from ledger import ColumnarLedger
+from money import Money, to_cents
+from records import FIELDNAMES, Transaction, from_values
+
+# Separates the strings of one column in its string table file
+_SEPARATOR = "\0"
+
+# Transaction slots filled from a CSV column, where they are not just the column
+_COLUMN_SLOTS = {"date": ("date", "date_text")}
+
+
+def file_hash(path):
+    """Return the BLAKE2b hex digest of a file's contents."""
+    digest = hashlib.blake2b()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SnapshotRows:
+    """
+    Read-only sequence of records.Transaction objects backed by snapshot columns.
+
+    Each Transaction is only built when it is asked for, so a ColumnarLedger
+    loaded from a snapshot does not pay for rows nobody looks at.
+    """
+
+    def __init__(self, cents, columns):
+        self._cents = cents
+        self._columns = columns  # name -> (codes, labels)
+
+    def __len__(self):
+        return len(self._cents)
+
+    def __getitem__(self, i):
+        values = []
+        for name in FIELDNAMES:
+            if name == "amount":
+                values.append(Money(int(self._cents[i])))
+            else:
+                codes, labels = self._columns[name]
+                values.append(labels[codes[i]])
+        return from_values(values)
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def tolist(self):
+        """
+        Build every row at once (much faster than indexing one by one).
+
+        Labels are converted to Transaction slot values once per distinct
+        value and then spread over the rows.
+        """
+        slots = {"cents": self._cents.tolist()}
+        probe = Transaction(0, "", "", None, "", 0)
+        for name in FIELDNAMES:
+            if name == "amount":
+                continue
+            codes, labels = self._columns[name]
+            per_label = {slot: [] for slot in _COLUMN_SLOTS.get(name, (name,))}
+            for label in labels:
+                probe[name] = label  # converts it like a CSV value
+                for slot, values in per_label.items():
+                    values.append(getattr(probe, slot))
+            for slot, values in per_label.items():
+                slots[slot] = np.array(values, dtype=object)[codes].tolist()
+        return list(map(Transaction, *(slots[name] for name in Transaction.__slots__)))
+
+
+class Snapshot:
+    """
+    The binary snapshot belonging to one CSV file.
+
+    Args:
+        csv_file (str): The CSV file the snapshot mirrors.
+        path (str): Snapshot directory (default: csv_file + '.snapshot').
+    """
+
+    def __init__(self, csv_file, path=None):
+        self.csv_file = csv_file
+        self.path = path if path is not None else csv_file + ".snapshot"
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _meta_file(self):
+        return os.path.join(self.path, "meta.json")
+
+    def _file(self, generation, column, suffix):
+        return os.path.join(self.path, f"{generation}.{column}.{suffix}")
+
+    def _read_meta(self):
+        try:
+            with open(self._meta_file()) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, meta):
+        tmp = self._meta_file() + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._meta_file())
+
+    def _csv_state(self):
+        try:
+            st = os.stat(self.csv_file)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def is_fresh(self, meta=None):
+        """
+        Return True if the snapshot matches the CSV file.
+
+        A matching mtime and size is enough. If only the mtime moved (the file
+        was touched or rewritten with the same content), the content hash
+        decides, and a match updates the recorded mtime.
+        """
+        meta = meta if meta is not None else self._read_meta()
+        state = self._csv_state()
+        if meta is None or state is None:
+            return False
+        if [meta["mtime_ns"], meta["size"]] == list(state):
+            return True
+        if meta["size"] != state[1] or meta["hash"] != file_hash(self.csv_file):
+            return False
+        meta["mtime_ns"] = state[0]
+        try:
+            self._write_meta(meta)
+        except OSError:
+            pass  # still fresh; we just check the hash again next time
+        return True
+
+    def _open(self):
+        """Map the columns of a fresh snapshot, or return None."""
+        meta = self._read_meta()
+        if not self.is_fresh(meta):
+            return None
+        generation = meta["generation"]
+        try:
+            cents = np.load(self._file(generation, "cents", "npy"), mmap_mode="r")
+            columns = {}
+            for name in FIELDNAMES:
+                if name == "amount":
+                    continue
+                codes = np.load(self._file(generation, name, "npy"), mmap_mode="r")
+                with open(self._file(generation, name, "str"), encoding="utf-8") as f:
+                    labels = f.read().split(_SEPARATOR) if meta["labels"][name] else []
+                columns[name] = (codes, labels)
+        except (OSError, ValueError, KeyError):
+            return None
+        return meta, cents, columns
+
+    def load(self):
+        """
+        Read the transactions from the snapshot.
+
+        Returns:
+            tuple: (list of Transactions, highest id seen) exactly as
+            storage.CsvBackend.load would return them, or None if the
+            snapshot is missing or stale.
+        """
+        opened = self._open()
+        if opened is None:
+            return None
+        meta, cents, columns = opened
+        return SnapshotRows(cents, columns).tolist(), meta["max_id"]
+
+    def load_ledger(self):
+        """
+        Read the transactions as a ColumnarLedger without building any rows.
+
+        Returns:
+            ColumnarLedger: or None if the snapshot is missing or stale.
+        """
+        opened = self._open()
+        if opened is None:
+            return None
+        _, cents, columns = opened
+        return ColumnarLedger.from_encoded(SnapshotRows(cents, columns), cents, columns)
+
+    def build(self):
+        """
+        Parse the CSV file and write a new snapshot of it.
+
+        Rows with an unreadable amount are left out, like CsvBackend.load
+        does. Nothing is written if the file has other columns than
+        FIELDNAMES, has ragged rows or contains NUL characters, or if it
+        changes while it is being read.
+
+        Returns:
+            bool: True if a snapshot was written.
+        """
+        state = self._csv_state()
+        if state is None:
+            return False
+        with open(self.csv_file, "rb") as f:
+            data = f.read()
+        text = data.decode("utf-8")
+        if _SEPARATOR in text:
+            return False
+
+        reader = csv.reader(io.StringIO(text, newline=""))
+        if next(reader, None) != FIELDNAMES:
+            return False
+        amount_index = FIELDNAMES.index("amount")
+        tables = [{} for _ in FIELDNAMES]
+        codes = [[] for _ in FIELDNAMES]
+        cents = []
+        max_id = 0
+        for record in reader:
+            if not record:
+                continue  # csv.DictReader skips blank lines too
+            if len(record) != len(FIELDNAMES):
+                return False
+            try:
+                max_id = max(max_id, int(record[0]))
+            except ValueError:
+                pass
+            try:
+                cents.append(to_cents(record[amount_index]))
+            except ValueError:
+                continue
+            for i, value in enumerate(record):
+                codes[i].append(tables[i].setdefault(value, len(tables[i])))
+
+        if self._csv_state() != state:
+            return False  # changed while we read it; the next load retries
+
+        os.makedirs(self.path, exist_ok=True)
+        generation = f"{time.time_ns():x}"
+        np.save(self._file(generation, "cents", "npy"), np.array(cents, dtype=np.int64))
+        for i, name in enumerate(FIELDNAMES):
+            if i == amount_index:
+                continue
+            np.save(self._file(generation, name, "npy"), np.array(codes[i], dtype=np.int32))
+            with open(self._file(generation, name, "str"), "w", encoding="utf-8") as f:
+                f.write(_SEPARATOR.join(tables[i]))
+
+        self._write_meta({
+            "generation": generation,
+            "mtime_ns": state[0],
+            "size": state[1],
+            "hash": hashlib.blake2b(data).hexdigest(),
+            "max_id": max_id,
+            "labels": {name: len(tables[i]) for i, name in enumerate(FIELDNAMES)},
+        })
+
+        # Older generations may still be mapped by readers; on POSIX removing
+        # them is safe, elsewhere they are left for the next build
+        for entry in os.listdir(self.path):
+            if entry != "meta.json" and not entry.startswith(generation + "."):
+                try:
+                    os.remove(os.path.join(self.path, entry))
+                except OSError:
+                    pass
+        return True
+
+    def rebuild_in_background(self):
+        """
+        Start build() on a thread unless one is already running.
+
+        The thread is not a daemon, so a short report run still finishes
+        writing the snapshot before the process exits.
+
+        Returns:
+            threading.Thread: The running build.
+        """
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._safe_build)
+                self._thread.start()
+            return self._thread
+
+    def _safe_build(self):
+        try:
+            self.build()
+        except (OSError, UnicodeDecodeError, csv.Error, OverflowError):
+            pass  # the CSV stays the source of truth; we try again next load
+
+    def wait(self, timeout=None):
+        """Wait for a background rebuild, if one is running."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
@@ -0,0 +1,817 @@
+"""
+Storage backends for TransactionManager.
+
+A backend knows how to read every transaction, append new ones, and write a
+set of changes back. TransactionManager keeps the rows in memory and only
+talks to the backend through this small interface, so the CSV file can be
+swapped for an SQLite database without touching the GUI or reports.
+
+Usage:
+    tm = TransactionManager()                                   # CSV (default)
+    tm = TransactionManager(journal=True)                       # CSV + edit journal
+    tm = TransactionManager(backend=SqliteBackend("budget.db"))  # SQLite
+"""
+
+import csv
+import io
+import json
+import os
+import sqlite3
+import stat
+import threading
+from itertools import islice
+
+from money import Money
+from records import FIELDNAMES, RowTable, Transaction, as_transactions, from_values, parse_id
+
+# CSV files at least this big are loaded through a binary snapshot (see
+# snapshot.py); smaller ones parse faster than NumPy imports
+SNAPSHOT_MIN_BYTES = 1024 * 1024
+
+# SQL expression for a row's amount in integer cents, so sums in SQL are
+# exact. ROUND() rounds halves away from zero where money.to_cents rounds
+# them to even, which only matters for amounts with fractions of a cent.
+_SQL_CENTS = "CAST(ROUND(amount * 100) AS INTEGER)"
+
+# A JournaledCsvBackend folds its journal into the CSV file in the background
+# once the journal reaches this size
+JOURNAL_COMPACT_BYTES = 1024 * 1024
+
+
+def _fsync_directory(path):
+    """Make a rename inside directory path durable (a no-op where directories can't be opened)."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def has_journal(csv_file):
+    """Return True if csv_file has journal entries not yet folded into it."""
+    return os.path.exists(csv_file + '.journal') or os.path.exists(csv_file + '.compacting')
+
+
+def _read_csv(file):
+    """
+    Yield the data records of a CSV file as FIELDNAMES-ordered value lists.
+
+    Blank lines are skipped and columns missing from the file or a short
+    record read as '', so files with other column orders load too.
+    """
+    reader = csv.reader(file)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = None if header == FIELDNAMES else [
+        header.index(field) if field in header else None for field in FIELDNAMES
+    ]
+    width = len(FIELDNAMES)
+    for record in reader:
+        if not record:
+            continue
+        if columns is None and len(record) == width:
+            yield record
+        else:
+            yield [record[i] if i is not None and i < len(record) else ''
+                   for i in (columns or range(width))]
+
+
+def _parse_csv(file):
+    """
+    Yield (id, Transaction) for every record of a CSV file.
+
+    The Transaction is None when the amount is not a number; the id is
+    still reported so the next id can be chosen above it.
+    """
+    for values in _read_csv(file):
+        try:
+            row = from_values(values)
+        except ValueError:
+            yield parse_id(values[0]), None
+        else:
+            yield row.id, row
+
+
+def _replay_journal(path, table):
+    """
+    Apply the entries of a journal file to a records.RowTable.
+
+    Puts replace the first row with their id in place or append it; deletes
+    remove every row with the id, as TransactionManager does. Reading stops
+    at a line that is incomplete or unreadable (a torn write).
+
+    Returns:
+        int: The highest id put by the journal (0 if none)
+    """
+    max_id = 0
+    try:
+        file = open(path, encoding='utf-8', newline='')
+    except FileNotFoundError:
+        return max_id
+    with file:
+        for line in file:
+            if not line.endswith('\n'):
+                break
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            for row_id in entry.get('delete', ()):
+                table.remove(parse_id(row_id))
+            for row in entry.get('put', ()):
+                row = Transaction.from_row(row)
+                table.put(row)
+                if type(row.id) is int:
+                    max_id = max(max_id, row.id)
+    return max_id
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class StorageBackend:
+    """
+    Interface every storage backend implements.
+
+    Rows are loaded as records.Transaction objects. Rows passed in may be
+    Transactions or dictionaries keyed by FIELDNAMES; IDs passed to commit()
+    are the Transactions' ids (ints for numeric ids).
+    """
+
+    def state(self):
+        """
+        Return a token that changes whenever the stored data changes.
+
+        TransactionManager compares it with the value seen after its own last
+        read or write to decide whether it has to reload. None means no data
+        has been stored yet.
+        """
+        raise NotImplementedError
+
+    def load(self):
+        """
+        Read every stored transaction.
+
+        Returns:
+            tuple: (list of Transactions in storage order, highest id seen)
+        """
+        raise NotImplementedError
+
+    def iter_chunks(self, chunk_size=10000):
+        """
+        Yield stored transactions as lists of at most chunk_size rows.
+
+        Backends that can read incrementally override this so callers can
+        process a ledger without holding all of it in memory.
+        """
+        rows, _ = self.load()
+        for start in range(0, len(rows), chunk_size):
+            yield rows[start:start + chunk_size]
+
+    def write_all(self, rows):
+        """Replace everything in storage with the given rows."""
+        raise NotImplementedError
+
+    def commit(self, rows, added, updated, deleted):
+        """
+        Persist a set of changes.
+
+        Args:
+            rows (iterable): Every current row, in order
+            added (list): Rows that are new since the last commit
+            updated (set): IDs of existing rows whose fields changed
+            deleted (set): IDs of rows that were removed
+        """
+        raise NotImplementedError
+
+
+class CsvBackend(StorageBackend):
+    """
+    Stores transactions in a CSV file with a header row.
+
+    Args:
+        csv_file (str): Path of the CSV file
+        fieldnames (list): Column names, in file order
+        snapshot_min_bytes (int): Load files of at least this size from a
+            binary snapshot.Snapshot when it is fresh, rebuilding it in the
+            background when it is not. None never uses a snapshot.
+    """
+
+    def __init__(self, csv_file="transactions.csv", fieldnames=FIELDNAMES,
+                 snapshot_min_bytes=SNAPSHOT_MIN_BYTES):
+        self.csv_file = csv_file
+        self.fieldnames = list(fieldnames)
+        self.snapshot_min_bytes = snapshot_min_bytes
+        self._snapshot = None
+
+    def state(self):
+        """Return (mtime, size) of the CSV file, or None if it does not exist."""
+        try:
+            st = os.stat(self.csv_file)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def snapshot(self):
+        """Return the snapshot.Snapshot to load this file through, or None."""
+        state = CsvBackend.state(self)  # the CSV file itself, also in subclasses
+        if (self.snapshot_min_bytes is None or state is None or state[1] < self.snapshot_min_bytes
+                or self.fieldnames != FIELDNAMES):
+            return None
+        if self._snapshot is None:
+            from snapshot import Snapshot  # needs NumPy, so only for big files
+            self._snapshot = Snapshot(self.csv_file)
+        return self._snapshot
+
+    def load(self):
+        snapshot = self.snapshot()
+        if snapshot is not None:
+            loaded = snapshot.load()
+            if loaded is not None:
+                return loaded
+
+        rows = []
+        max_id = 0
+        if os.path.exists(self.csv_file):
+            with open(self.csv_file, mode='r', newline='') as file:
+                for row_id, row in _parse_csv(file):
+                    if type(row_id) is int and row_id > max_id:
+                        max_id = row_id
+                    if row is not None:  # skip rows with a bad amount
+                        rows.append(row)
+        if snapshot is not None:
+            snapshot.rebuild_in_background()
+        return rows, max_id
+
+    def iter_chunks(self, chunk_size=10000):
+        if not os.path.exists(self.csv_file):
+            return
+        with open(self.csv_file, mode='r', newline='') as file:
+            chunk = []
+            for _, row in _parse_csv(file):
+                if row is None:
+                    continue  # skip bad rows
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+    def _format_rows(self, rows):
+        """
+        Format rows as CSV lines, exactly as csv.DictWriter would.
+
+        Most fields need no quoting, so a row is joined directly and only
+        rows containing quotes, line breaks, extra commas or None values go
+        through the csv module.
+
+        Returns:
+            list: One CRLF-terminated line per row
+        """
+        fieldnames = self.fieldnames
+        separators = len(fieldnames) - 1
+        in_order = fieldnames == FIELDNAMES
+        lines = []
+        fallback = None
+        for row in rows:
+            if in_order and type(row) is Transaction:
+                values = row.values()
+            else:
+                values = [row.get(field, '') for field in fieldnames]
+            line = ','.join(map(str, values))
+            if (line.count(',') != separators or '"' in line or '\n' in line or '\r' in line
+                    or None in values):
+                if fallback is None:
+                    buffer = io.StringIO()
+                    fallback = (buffer, csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction='ignore'))
+                buffer, writer = fallback
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerow(row)
+                lines.append(buffer.getvalue())
+            else:
+                lines.append(line + '\r\n')
+        return lines
+
+    def append(self, rows):
+        """
+        Append rows to the end of the CSV file in a single write.
+
+        The header is written first if the file is new or empty, and a
+        missing trailing newline (e.g. from an interrupted write or a hand
+        edit) is repaired so the new row never gets glued onto the last one.
+        The data is fsynced before returning.
+        """
+        lines = []
+        state = CsvBackend.state(self)
+        if state is None or state[1] == 0:
+            lines.append(','.join(self.fieldnames) + '\r\n')
+        else:
+            with open(self.csv_file, mode='rb') as file:
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) not in (b'\n', b'\r'):
+                    lines.append('\r\n')
+        lines.extend(self._format_rows(rows))
+
+        with open(self.csv_file, mode='a', newline='') as file:
+            file.writelines(lines)
+            file.flush()
+            os.fsync(file.fileno())
+
+    def write_all(self, rows):
+        """
+        Replace the CSV file with the given rows, atomically.
+
+        The rows are written to a temporary file next to the ledger, fsynced
+        and renamed over it, so a crash leaves either the old file or the new
+        one, never a truncated mix.
+        """
+        self._replace_with(self._write_temp(rows, self.csv_file + '.tmp'))
+
+    def _write_temp(self, rows, tmp_path):
+        """Write a complete ledger to tmp_path, fsynced and with the ledger's permissions."""
+        lines = [','.join(self.fieldnames) + '\r\n']
+        lines.extend(self._format_rows(rows))
+        try:
+            with open(tmp_path, mode='w', newline='') as file:
+                file.writelines(lines)
+                file.flush()
+                os.fsync(file.fileno())
+            try:
+                os.chmod(tmp_path, stat.S_IMODE(os.stat(self.csv_file).st_mode))
+            except FileNotFoundError:
+                pass  # a new ledger keeps the default permissions
+        except BaseException:
+            _remove_quietly(tmp_path)
+            raise
+        return tmp_path
+
+    def _replace_with(self, tmp_path):
+        """Rename a file written by _write_temp over the ledger."""
+        try:
+            os.replace(tmp_path, self.csv_file)
+        except BaseException:
+            _remove_quietly(tmp_path)
+            raise
+        _fsync_directory(os.path.dirname(os.path.abspath(self.csv_file)))
+
+    def commit(self, rows, added, updated, deleted):
+        # A CSV file can only be appended to cheaply; anything else is a rewrite
+        if updated or deleted:
+            self.write_all(rows)
+        elif added:
+            self.append(added)
+
+
+class JournaledCsvBackend(CsvBackend):
+    """
+    A CsvBackend that records changes in a write-ahead journal.
+
+    Rewriting a large CSV file to change one row is slow. Here each commit
+    appends one JSON line to csv_file + '.journal' instead, with the rows
+    it adds or changes ("put") and the IDs it removes ("delete"), so an
+    edit costs the same on any ledger size. Loading replays the journal
+    over the CSV file. Replaying is idempotent, and a torn last line from a
+    crash is ignored.
+
+    Compaction folds the journal back into a plain CSV file that any tool
+    can read. It starts in the background once the journal grows past
+    compact_bytes, or can be run with compact(). The journal is first
+    renamed to csv_file + '.compacting' so commits continue into a fresh
+    journal while the new CSV file is written.
+
+    Args:
+        csv_file (str): Path of the CSV file
+        fieldnames (list): Column names, in file order
+        snapshot_min_bytes (int): See CsvBackend
+        compact_bytes (int): Journal size that triggers a background
+            compaction (None: only compact when asked to)
+    """
+
+    def __init__(self, csv_file="transactions.csv", fieldnames=FIELDNAMES,
+                 snapshot_min_bytes=SNAPSHOT_MIN_BYTES, compact_bytes=JOURNAL_COMPACT_BYTES):
+        super().__init__(csv_file, fieldnames, snapshot_min_bytes)
+        self.journal_file = csv_file + '.journal'
+        self.compacting_file = csv_file + '.compacting'
+        self.compact_bytes = compact_bytes
+        self._lock = threading.RLock()          # journal appends, loads and file swaps
+        self._compact_lock = threading.Lock()   # one compaction at a time
+        self._compact_thread = None
+        self._generation = 0                    # bumped by every full rewrite
+        self._alias = {}
+
+    def _file_states(self):
+        states = []
+        for path in (self.csv_file, self.compacting_file, self.journal_file):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                states.append(None)
+            else:
+                states.append((st.st_mtime_ns, st.st_size))
+        return tuple(states)
+
+    def state(self):
+        """
+        Return the state of the CSV file and its journals.
+
+        Compaction changes the files but not their content, so after one of
+        our own compactions the state from before it is reported and the
+        manager does not reload.
+        """
+        with self._lock:
+            states = self._file_states()
+            if states[0] is None and states[2] is None:
+                return None
+            return self._alias.get(states, states)
+
+    def _files_rearranged(self, before):
+        """Record that the files now hold the same data as at state before."""
+        self._alias = {self._file_states(): before}
+
+    def load(self):
+        with self._lock:
+            rows, max_id = super().load()
+            table = RowTable(rows)
+            for path in (self.compacting_file, self.journal_file):
+                max_id = max(max_id, _replay_journal(path, table))
+        return list(table.values()), max_id
+
+    def iter_chunks(self, chunk_size=10000):
+        return StorageBackend.iter_chunks(self, chunk_size)
+
+    def write_all(self, rows):
+        with self._lock:
+            super().write_all(rows)
+            # The new file holds everything, so the journals are obsolete
+            for path in (self.compacting_file, self.journal_file):
+                _remove_quietly(path)
+            self._generation += 1
+            self._alias = {}
+
+    def commit(self, rows, added, updated, deleted):
+        # Row lookups by id; TransactionManager passes its RowTable's values view
+        mapping = getattr(rows, 'mapping', None)
+        if mapping is None:
+            mapping = RowTable(as_transactions(rows))
+        updated = [parse_id(row_id) for row_id in updated]
+        deleted = [parse_id(row_id) for row_id in deleted]
+
+        new_ids = []
+        for row in added:  # rows added and deleted again are no longer in mapping
+            row_id = parse_id(row['id'])
+            if row_id in mapping and row_id not in new_ids:
+                new_ids.append(row_id)
+        # New rows are at the end of the ledger, unless an ID was changed:
+        # the re-keyed row keeps its place, which a journal append can't
+        # express, so rewrite the file then
+        if new_ids and list(islice(reversed(mapping), len(new_ids)))[::-1] != new_ids:
+            self.write_all(mapping.values())
+            return
+
+        entry = {}
+        removed = [str(row_id) for row_id in deleted if row_id not in mapping]
+        if removed:
+            entry['delete'] = removed
+        puts = [row_id for row_id in updated if row_id in mapping and row_id not in new_ids] + new_ids
+        if puts:
+            entry['put'] = [{field: mapping[row_id].get(field, '') for field in self.fieldnames}
+                            for row_id in puts]
+        if not entry:
+            return
+
+        with self._lock:
+            if self.state() is None:
+                # No ledger yet: start one so other tools see the header
+                super().write_all([])
+            with open(self.journal_file, mode='a', encoding='utf-8', newline='') as file:
+                file.write(json.dumps(entry) + '\n')
+                file.flush()
+                os.fsync(file.fileno())
+                size = file.tell()
+        if self.compact_bytes is not None and size >= self.compact_bytes:
+            self.compact_in_background()
+
+    def compact(self):
+        """
+        Fold the journal into the CSV file.
+
+        Returns:
+            bool: True if the CSV file was rewritten.
+        """
+        with self._compact_lock:
+            with self._lock:
+                generation = self._generation
+                if not os.path.exists(self.compacting_file):
+                    if not os.path.exists(self.journal_file):
+                        return False
+                    # An interrupted compaction leaves .compacting behind;
+                    # it is finished first and the journal waits its turn
+                    before = self.state()
+                    os.replace(self.journal_file, self.compacting_file)
+                    self._files_rearranged(before)
+
+            # The slow part runs without the lock, so commits continue
+            rows, _ = CsvBackend.load(self)
+            table = RowTable(rows)
+            _replay_journal(self.compacting_file, table)
+            tmp_path = self._write_temp(table.values(), self.csv_file + '.compact.tmp')
+
+            with self._lock:
+                if self._generation != generation:
+                    _remove_quietly(tmp_path)  # rewritten meanwhile; ours is stale
+                    return False
+                before = self.state()
+                self._replace_with(tmp_path)
+                _remove_quietly(self.compacting_file)
+                self._files_rearranged(before)
+
+        snapshot = self.snapshot()
+        if snapshot is not None:
+            snapshot.rebuild_in_background()
+        return True
+
+    def compact_in_background(self):
+        """
+        Start compact() on a thread unless one is already running.
+
+        Returns:
+            threading.Thread: The running compaction.
+        """
+        with self._lock:
+            if self._compact_thread is None or not self._compact_thread.is_alive():
+                self._compact_thread = threading.Thread(target=self.compact)
+                self._compact_thread.start()
+            return self._compact_thread
+
+    def wait(self, timeout=None):
+        """Wait for a background compaction, if one is running."""
+        thread = self._compact_thread
+        if thread is not None:
+            thread.join(timeout)
+
+
+class SqliteBackend(StorageBackend):
+    """
+    Stores transactions in an SQLite database using the stdlib sqlite3 module.
+
+    The database runs in WAL mode so readers are not blocked by a writer, and
+    the columns reports filter on are indexed. Besides the storage interface
+    it exposes the report aggregates (total_income, category_summary, ...)
+    so Reports can push them down into SQL; see where() for filtered views.
+    """
+
+    def __init__(self, db_file="transactions.db"):
+        self.db_file = db_file
+        self.fieldnames = list(FIELDNAMES)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS transactions ("
+                " id INTEGER PRIMARY KEY,"
+                " transaction_name TEXT NOT NULL DEFAULT '',"
+                " transaction_category TEXT NOT NULL DEFAULT '',"
+                " date TEXT NOT NULL DEFAULT '',"
+                " income_expense TEXT NOT NULL DEFAULT '',"
+                " amount REAL NOT NULL DEFAULT 0,"
+                " essential TEXT NOT NULL DEFAULT '')"
+            )
+            for column in ('date', 'transaction_category', 'income_expense'):
+                self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_transactions_{column} ON transactions ({column})"
+                )
+
+    def close(self):
+        self._conn.close()
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _row_values(self, row):
+        values = [row.get(field, '') for field in self.fieldnames]
+        values[0] = int(values[0])
+        values[5] = float(values[5])
+        return values
+
+    def _to_transaction(self, values):
+        return from_values(values)
+
+    def state(self):
+        # data_version changes when another connection commits; our own
+        # commits are tracked by the manager itself
+        return self._query("PRAGMA data_version")[0][0]
+
+    def load(self):
+        columns = ", ".join(self.fieldnames)
+        rows = [self._to_transaction(v) for v in self._query(f"SELECT {columns} FROM transactions ORDER BY id")]
+        max_id = self._query("SELECT COALESCE(MAX(id), 0) FROM transactions")[0][0]
+        return rows, max_id
+
+    def iter_chunks(self, chunk_size=10000):
+        columns = ", ".join(self.fieldnames)
+        with self._lock:
+            cursor = self._conn.execute(f"SELECT {columns} FROM transactions ORDER BY id")
+        while True:
+            with self._lock:
+                batch = cursor.fetchmany(chunk_size)
+            if not batch:
+                break
+            yield [self._to_transaction(v) for v in batch]
+
+    def write_all(self, rows):
+        placeholders = ", ".join("?" for _ in self.fieldnames)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM transactions")
+            self._conn.executemany(
+                f"INSERT INTO transactions VALUES ({placeholders})",
+                (self._row_values(row) for row in rows),
+            )
+
+    def commit(self, rows, added, updated, deleted):
+        placeholders = ", ".join("?" for _ in self.fieldnames)
+        assignments = ", ".join(f"{field} = ?" for field in self.fieldnames[1:])
+        mapping = getattr(rows, 'mapping', None)
+        if mapping is None:
+            mapping = RowTable(as_transactions(rows))
+        # Rows added and deleted again are no longer in mapping; a re-keyed
+        # row is written as it is now, whichever ids it held in between
+        new_ids = [i for i in dict.fromkeys(parse_id(row['id']) for row in added) if i in mapping]
+        updated = [parse_id(row_id) for row_id in updated]
+        with self._lock, self._conn:
+            # Deletes go first: an id deleted and then given to another row
+            # in the same commit must end up holding that row
+            self._conn.executemany(
+                "DELETE FROM transactions WHERE id = ?",
+                ((int(i),) for i in deleted),
+            )
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO transactions VALUES ({placeholders})",
+                (self._row_values(mapping[i]) for i in new_ids),
+            )
+            self._conn.executemany(
+                f"UPDATE transactions SET {assignments} WHERE id = ?",
+                (self._row_values(mapping[i])[1:] + [int(i)] for i in updated if i in mapping),
+            )
+
+    def where(self, start_date=None, end_date=None, category=None):
+        """
+        Return a filtered view whose aggregates are computed in SQL.
+
+        Args:
+            start_date (str): Earliest date to include (YYYY-MM-DD)
+            end_date (str): Latest date to include (YYYY-MM-DD)
+            category (str): Only include this transaction category
+
+        Returns:
+            SqliteQuery: View accepted by every Reports summary method
+        """
+        return SqliteQuery(self, start_date, end_date, category)
+
+    # Unfiltered aggregates, so the backend itself can be passed to Reports
+    def total_income(self):
+        return self.where().total_income()
+
+    def total_expenses(self):
+        return self.where().total_expenses()
+
+    def balance(self):
+        return self.where().balance()
+
+    def monthly_summary(self):
+        return self.where().monthly_summary()
+
+    def category_summary(self):
+        return self.where().category_summary()
+
+    def top_expenses(self, n=5):
+        return self.where().top_expenses(n)
+
+
+class SqliteQuery:
+    """A filtered view over an SqliteBackend; every aggregate runs as one SQL query."""
+
+    def __init__(self, backend, start_date=None, end_date=None, category=None):
+        self.backend = backend
+        clauses = []
+        self.params = []
+        if start_date is not None:
+            clauses.append("date >= ?")
+            self.params.append(start_date)
+        if end_date is not None:
+            clauses.append("date <= ?")
+            self.params.append(end_date)
+        if category is not None:
+            clauses.append("transaction_category = ?")
+            self.params.append(category)
+        self.where_sql = " AND ".join(clauses) or "1"
+
+    def _query(self, sql, extra=()):
+        return self.backend._query(sql, tuple(self.params) + tuple(extra))
+
+    def __iter__(self):
+        columns = ", ".join(self.backend.fieldnames)
+        rows = self._query(f"SELECT {columns} FROM transactions WHERE {self.where_sql} ORDER BY id")
+        return (self.backend._to_transaction(v) for v in rows)
+
+    def _total(self, income_expense):
+        return Money(self._query(
+            f"SELECT COALESCE(SUM({_SQL_CENTS}), 0) FROM transactions"
+            f" WHERE {self.where_sql} AND income_expense = ?",
+            (income_expense,),
+        )[0][0])
+
+    def total_income(self):
+        return self._total('income')
+
+    def total_expenses(self):
+        return self._total('expense')
+
+    def balance(self):
+        income, expenses = self._query(
+            f"SELECT COALESCE(SUM(CASE WHEN income_expense = 'income' THEN {_SQL_CENTS} END), 0),"
+            f" COALESCE(SUM(CASE WHEN income_expense = 'expense' THEN {_SQL_CENTS} END), 0)"
+            f" FROM transactions WHERE {self.where_sql}"
+        )[0]
+        return Money(income - expenses)
+
+    def monthly_summary(self):
+        rows = self._query(
+            "SELECT substr(trim(date), 1, 7) AS month,"
+            f" COALESCE(SUM(CASE WHEN income_expense = 'income' THEN {_SQL_CENTS} END), 0),"
+            f" COALESCE(SUM(CASE WHEN income_expense = 'expense' THEN {_SQL_CENTS} END), 0)"
+            f" FROM transactions WHERE {self.where_sql} AND income_expense IN ('income', 'expense')"
+            " GROUP BY month ORDER BY MIN(id)"
+        )
+        return {month: {"income": Money(income), "expense": Money(expense)} for month, income, expense in rows}
+
+    def category_summary(self):
+        rows = self._query(
+            f"SELECT trim(transaction_category) AS category, SUM({_SQL_CENTS})"
+            f" FROM transactions WHERE {self.where_sql} GROUP BY category ORDER BY MIN(id)"
+        )
+        return {category: Money(cents) for category, cents in rows}
+
+    def top_expenses(self, n=5):
+        columns = ", ".join(self.backend.fieldnames)
+        rows = self._query(
+            f"SELECT {columns} FROM transactions WHERE {self.where_sql} AND income_expense = 'expense'"
+            f" ORDER BY {_SQL_CENTS} DESC, id LIMIT ?",
+            (max(n, 0),),  # a negative LIMIT means no limit in SQLite
+        )
+        return [self.backend._to_transaction(v) for v in rows]
+
+
+def migrate_csv_to_sqlite(csv_file="transactions.csv", db_file="transactions.db"):
+    """
+    Copy every transaction from a CSV file into an SQLite database.
+
+    Existing rows in the database are replaced. Edits still in the CSV
+    file's journal are replayed, so the database gets the ledger as
+    TransactionManager sees it.
+
+    Returns:
+        int: Number of transactions migrated
+
+    Raises:
+        ValueError: If an id is blank, not an integer or used more than
+            once; the database needs unique integer ids, so such rows
+            have to be fixed in the CSV file first. Nothing is written.
+    """
+    rows, _ = (JournaledCsvBackend if has_journal(csv_file) else CsvBackend)(csv_file).load()
+    seen = set()
+    invalid = {}
+    repeated = {}
+    for row in rows:
+        if type(row.id) is not int:
+            invalid[row.id] = None
+        elif row.id in seen:
+            repeated[row.id] = None
+        seen.add(row.id)
+    if invalid or repeated:
+        problems = []
+        if invalid:
+            problems.append("ids that are blank or not integers: " + ", ".join(map(repr, invalid)))
+        if repeated:
+            problems.append("ids used more than once: " + ", ".join(map(str, repeated)))
+        raise ValueError(f"cannot migrate {csv_file}, it has " + "; ".join(problems))
+    backend = SqliteBackend(db_file)
+    try:
+        backend.write_all(rows)
+    finally:
+        backend.close()
+    return len(rows)
@@ -0,0 +1,63 @@
+import unittest
+import json
+import os
+import tempfile
+import benchmarks
+from transactions import TransactionManager
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_sizes(self):
+        self.assertEqual(benchmarks.parse_size("10k"), 10000)
+        self.assertEqual(benchmarks.parse_size("1M"), 1000000)
+        self.assertEqual(benchmarks.parse_size("2500"), 2500)
+        self.assertEqual(benchmarks.size_label(100000), "100k")
+        self.assertEqual(benchmarks.size_label(2500), "2500")
+
+    def test_generated_ledger_is_valid(self):
+        """Test a generated ledger loads fully and every row passes validation"""
+
+        path = os.path.join(self.tmp_dir.name, "ledger.csv")
+        benchmarks.generate_ledger(path, 500)
+        tm = TransactionManager(path)
+        rows = tm.load_transactions()
+        self.assertEqual(len(rows), 500)
+        for row in rows:
+            tm._validate_row(row)
+        self.assertEqual({row["income_expense"] for row in rows}, {"income", "expense"})
+        dates = [row["date"] for row in rows]
+        self.assertEqual(dates, sorted(dates))
+
+    def test_case_without_output_is_skipped(self):
+        """Test a case that exits before printing its timings is left out instead of crashing"""
+
+        self.assertIsNone(benchmarks._run_case("exit()"))
+        self.assertEqual(benchmarks._run_case("import json\nprint(json.dumps({'a': 1.5}))"), {"a": 1.5})
+
+    def test_suite_and_compare(self):
+        """Test a small suite run times every case and compare flags a slowdown"""
+
+        results = benchmarks.suite_benchmark(["300"], repeat=1, ops=2, charts=False)
+        timings = results["300"]
+        for case in ("load", "add_transaction", "update_transaction", "delete_transaction",
+                     "compute_all", "get_top_expenses", "scan_csv"):
+            self.assertIn(case, timings)
+
+        base = os.path.join(self.tmp_dir.name, "base.json")
+        with open(base, "w") as f:
+            json.dump({"results": {"1k": {"load": 10.0, "compute_all": 5.0, "balance": 0.1}}}, f)
+        rows = benchmarks.compare_results(benchmarks.load_results(base),
+                                          {"1k/load": 20.0, "1k/compute_all": 2.0, "1k/balance": 0.5})
+        self.assertEqual({row[0]: row[4] for row in rows},
+                         {"1k/load": "regression", "1k/compute_all": "improvement", "1k/balance": "ok"})
+
+
+if __name__ == '__main__':
+    unittest.main()
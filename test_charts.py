@@ -0,0 +1,41 @@
+import unittest
+import numpy as np
+from charts import DecimatedSeries, decimate_lttb, decimate_minmax
+
+
+class TestDecimation(unittest.TestCase):
+
+    def setUp(self):
+        self.x = np.arange(10000, dtype=float)
+        self.y = np.sin(self.x / 300.0)
+        self.y[4321] = 5.0  # a spike that must survive
+
+    def test_lttb_keeps_endpoints_and_size(self):
+        x, y = decimate_lttb(self.x, self.y, 500)
+        self.assertEqual(len(x), 500)
+        self.assertEqual((x[0], x[-1]), (0.0, 9999.0))
+        self.assertTrue(np.all(np.diff(x) > 0))
+        self.assertIn(5.0, y)
+
+    def test_minmax_keeps_extremes(self):
+        x, y = decimate_minmax(self.x, self.y, 100)
+        self.assertLessEqual(len(x), 200)
+        self.assertEqual(y.max(), self.y.max())
+        self.assertEqual(y.min(), self.y.min())
+
+    def test_short_series_untouched(self):
+        x, y = decimate_lttb(self.x[:10], self.y[:10], 500)
+        self.assertEqual(len(x), 10)
+
+    def test_points_are_cached_per_zoom_level(self):
+        series = DecimatedSeries(self.x, self.y)
+        full = series.points(300)
+        self.assertLessEqual(len(full[0]), 600)
+        self.assertIs(series.points(300), full)
+
+        zoomed_x, _ = series.points(300, xlim=(1000, 1100))
+        self.assertEqual((zoomed_x[0], zoomed_x[-1]), (999.0, 1101.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
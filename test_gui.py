@@ -87,6 +87,39 @@ def test_update_charts(gui_instance):
     assert gui_instance.chart_data['labels'] == labels
     assert gui_instance.chart_data['sizes'] == sizes
 
+def test_load_and_display_data_runs_on_worker(gui_instance):
+    """
+    Test if data loading is handed to the worker and rapid requests are coalesced.
+
+    Args:
+        gui_instance (MainGui): The MainGui instance provided by the fixture.
+    """
+    gui_instance.load_and_display_data()
+    first = gui_instance._load_future
+    gui_instance.load_and_display_data()
+    second = gui_instance._load_future
+    assert first is not second
+    assert isinstance(second.result(timeout=5), dict)
+    assert first.cancelled() or first.done()
+
+def test_render_scheduler_skips_unchanged_charts(gui_instance):
+    """
+    Test if a render pass only redraws charts whose data or size changed.
+
+    Args:
+        gui_instance (MainGui): The MainGui instance provided by the fixture.
+    """
+    scheduler = gui_instance.render_scheduler
+    scheduler.render()
+    before = dict(scheduler.rendered)
+    scheduler.render()
+    assert scheduler.rendered == before
+
+    scheduler.mark_dirty('bar')
+    scheduler.render()
+    assert scheduler.rendered['bar'][1] == before['bar'][1] + 1
+    assert scheduler.rendered['pie'] == before['pie']
+
 if __name__ == "__main__":
     pytest.main()
 
@@ -0,0 +1,79 @@
+import unittest
+import os
+import tempfile
+from index import TransactionIndex, epoch_day
+from records import Transaction
+from reports import Reports
+from transactions import TransactionManager
+
+rows_sample = [
+    {"transaction_name": "Groceries", "transaction_category": "Food", "date": "2025-01-01", "income_expense": "expense", "amount": 100.0, "essential": "yes"},
+    {"transaction_name": "Salary", "transaction_category": "Income", "date": "2025-01-02", "income_expense": "income", "amount": 200.0, "essential": "no"},
+    {"transaction_name": "Bus fare", "transaction_category": "Transportation", "date": "2025-01-15", "income_expense": "expense", "amount": 50.0, "essential": "yes"},
+    {"transaction_name": "Salary", "transaction_category": "Income", "date": "2025-02-01", "income_expense": "income", "amount": 150.0, "essential": "no"},
+    {"transaction_name": "Snacks", "transaction_category": " Food ", "date": "2025-02-03", "income_expense": "expense", "amount": 50.0, "essential": "no"},
+]
+
+
+class TestTransactionIndex(unittest.TestCase):
+
+    def setUp(self):
+        """Create a TransactionManager with sample rows in a temp directory"""
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tm = TransactionManager(csv_file=os.path.join(self.tmp_dir.name, "ledger.csv"))
+        self.tm.add_transactions(rows_sample)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def ids(self, *args, **kwargs):
+        return [t["id"] for t in self.tm.where(*args, **kwargs)]
+
+    def test_epoch_day(self):
+        self.assertEqual(epoch_day("1970-01-02"), 1)
+        self.assertEqual(epoch_day(" 1969-12-31 "), -1)
+        self.assertIsNone(epoch_day("not a date"))
+
+    def test_range_and_category_queries(self):
+        """Test inclusive date bounds, stripped categories and both filters together"""
+
+        self.assertEqual(self.ids("2025-01-02", "2025-02-01"), ["2", "3", "4"])
+        self.assertEqual(self.ids(start_date="2025-01-15"), ["3", "4", "5"])
+        self.assertEqual(self.ids(category="Food"), ["1", "5"])
+        self.assertEqual(self.ids("2025-02-01", category="Food"), ["5"])
+        self.assertEqual(self.ids(category="Rent"), [])
+        self.assertEqual(len(self.tm.where()), 5)
+        with self.assertRaises(ValueError):
+            self.tm.where(start_date="January")
+
+    def test_index_follows_mutations(self):
+        """Test adds, updates, id changes and deletes are reflected without a rebuild"""
+
+        self.tm.where(category="Food")  # build the index
+        self.tm.add_transaction("Lunch", "Food", "2025-01-20", "expense", 12.0, "no")
+        self.tm.update_transaction(1, {"date": "2025-03-01"})
+        self.tm.update_transaction(3, {"transaction_category": "Food"})
+        self.tm.update_transaction(5, {"id": "50"})
+        self.tm.delete_transaction(2)
+        self.assertEqual(self.ids(category="Food"), ["1", "3", "50", "6"])
+        self.assertEqual(self.ids("2025-01-01", "2025-01-31"), ["3", "6"])
+        self.assertEqual(self.ids(end_date="2025-12-31", category="Income"), ["4"])
+
+    def test_rows_without_valid_date(self):
+        """Test undated rows only match queries without date bounds"""
+
+        index = TransactionIndex([Transaction.from_row(dict(rows_sample[0], id="1")),
+                                  Transaction.from_row(dict(rows_sample[4], id="2", date=""))])
+        self.assertEqual([t["id"] for t in index.query(category="Food")], ["1", "2"])
+        self.assertEqual([t["id"] for t in index.query("2000-01-01", category="Food")], ["1"])
+
+    def test_filtered_summary(self):
+        """Test a filtered result feeds Reports like a full list"""
+
+        january = self.tm.where("2025-01-01", "2025-01-31")
+        self.assertEqual(Reports().calculate_balance(january), 50.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import instrument
+import main
+from reports import Reports
+from transactions import TransactionManager
+
+
+class TestInstrument(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tm = TransactionManager(csv_file=os.path.join(self.tmp_dir.name, "ledger.csv"))
+
+    def tearDown(self):
+        instrument.disable()
+        self.tmp_dir.cleanup()
+
+    def test_disabled_wraps_nothing(self):
+        """Test methods stay untouched and main never imports instrument without the flags"""
+
+        original = TransactionManager.__dict__["add_transaction"]
+        instrument.attach()
+        self.assertIs(TransactionManager.__dict__["add_transaction"], original)
+
+        env = {k: v for k, v in os.environ.items() if k not in ("BUDGET_INSTRUMENT", "BUDGET_PROFILE")}
+        code = "import sys, main; print(main.setup_instrumentation(), 'instrument' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True, env=env)
+        self.assertEqual(result.stdout.split(), ["False", "False"])
+
+    def test_stages_are_recorded(self):
+        """Test calls, errors and the rolling histogram of instrumented methods"""
+
+        original = TransactionManager.__dict__["add_transaction"]
+        recorder = instrument.enable(stats_file=None, window=2)
+        for i in range(3):
+            self.tm.add_transaction("Coffee", "Food", "2025-01-01", "expense", 4.5, "no")
+        with self.assertRaises(ValueError):
+            self.tm.add_transactions([{"transaction_name": "Bad"}])
+        Reports().calculate_balance(self.tm.load_transactions())
+
+        stages = recorder.to_dict()
+        self.assertEqual(stages["TransactionManager.add_transaction"]["calls"], 3)
+        self.assertEqual(stages["TransactionManager.add_transactions"]["errors"], 1)
+        self.assertEqual(stages["Reports.calculate_balance"]["calls"], 1)
+        window = stages["TransactionManager.add_transaction"]["window"]
+        self.assertEqual(window["calls"], 2)
+        self.assertEqual(sum(window["histogram"].values()), 2)
+
+        instrument.disable()
+        self.assertIs(TransactionManager.__dict__["add_transaction"], original)
+
+    def test_configure_from_environment(self):
+        """Test BUDGET_INSTRUMENT turns recording on and the stats dump as JSON"""
+
+        stats_file = os.path.join(self.tmp_dir.name, "stats.json")
+        self.assertFalse(instrument.configure(environ={}))
+        self.assertTrue(instrument.configure(environ={"BUDGET_INSTRUMENT": stats_file}))
+        self.tm.load_transactions()
+        instrument.recorder.dump(stats_file)
+        with open(stats_file) as f:
+            stages = json.load(f)["stages"]
+        self.assertEqual(stages["TransactionManager.load_transactions"]["calls"], 1)
+
+    def test_instrument_flag_takes_no_value(self):
+        """Test --instrument is a plain flag, so a mode after it is still the mode"""
+
+        args = main.parse_args(["--instrument", "reports", "--no-charts"])
+        self.assertEqual((args.instrument, args.instrument_file, args.mode), (True, None, "reports"))
+        args = main.parse_args(["--instrument-file", "stats.json", "migrate"])
+        self.assertEqual((args.instrument, args.instrument_file, args.mode), (False, "stats.json", "migrate"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+import numpy as np
+from ledger import ColumnarLedger, CumulativeBalance, cumulative_balance_series
+from reports import Reports
+
+transactions_sample = [
+    {"id": "1", "transaction_name": "Groceries", "transaction_category": "Food", "date": "2025-01-01",
+     "income_expense": "expense", "amount": "100.0", "essential": "yes"},
+    {"id": "2", "transaction_name": "Salary", "transaction_category": "Income", "date": "2025-01-02",
+     "income_expense": "income", "amount": "200.0", "essential": "no"},
+    {"id": "3", "transaction_name": "Bus fare", "transaction_category": "Transportation", "date": "2025-01-15",
+     "income_expense": "expense", "amount": "50.0", "essential": "yes"},
+    {"id": "4", "transaction_name": "Salary", "transaction_category": "Income", "date": "2025-02-01",
+     "income_expense": "income", "amount": "150.0", "essential": "no"},
+    {"id": "5", "transaction_name": "Snacks", "transaction_category": "Food ", "date": "2025-02-03",
+     "income_expense": "expense", "amount": "50.0", "essential": "no"},
+]
+
+
+class TestColumnarLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.reports = Reports()
+        self.ledger = ColumnarLedger.from_transactions(transactions_sample)
+
+    def test_totals(self):
+        self.assertEqual(self.reports.calculate_total_income(self.ledger), 350.0)
+        self.assertEqual(self.reports.calculate_total_expenses(self.ledger), 200.0)
+        self.assertEqual(self.reports.calculate_balance(self.ledger), 150.0)
+
+    def test_summaries_match_dict_path(self):
+        self.assertEqual(self.reports.get_monthly_summary(self.ledger),
+                         self.reports.get_monthly_summary(transactions_sample))
+        self.assertEqual(self.reports.get_category_summary(self.ledger),
+                         self.reports.get_category_summary(transactions_sample))
+
+    def test_month_order_ignores_other_row_types(self):
+        transfer = dict(transactions_sample[3], date="2025-02-10", income_expense="transfer")
+        rows = [transfer] + transactions_sample
+        summary = self.reports.get_monthly_summary(ColumnarLedger.from_transactions(rows))
+        self.assertEqual(list(summary), ["2025-01", "2025-02"])
+        self.assertEqual(summary, self.reports.get_monthly_summary(rows))
+
+    def test_top_expenses_keeps_row_order_on_ties(self):
+        top = self.reports.get_top_expenses(self.ledger, n=2)
+        self.assertEqual([t["id"] for t in top], ["1", "3"])
+        self.assertEqual(top, self.reports.get_top_expenses(transactions_sample, n=2))
+
+    def test_top_expenses_with_no_rows_requested(self):
+        self.assertEqual(self.reports.get_top_expenses(self.ledger, n=0), [])
+        self.assertEqual(self.reports.compute_all(self.ledger, n=0)["top_expenses"], [])
+
+    def test_empty_ledger(self):
+        ledger = ColumnarLedger.from_transactions([])
+        self.assertEqual(self.reports.calculate_balance(ledger), 0.0)
+        self.assertEqual(self.reports.get_monthly_summary(ledger), {})
+        self.assertEqual(self.reports.get_top_expenses(ledger), [])
+
+
+
+class TestCumulativeBalance(unittest.TestCase):
+
+    def test_series_is_sorted_running_total(self):
+        rows = list(reversed(transactions_sample))
+        dates, balances = cumulative_balance_series(rows)
+        self.assertEqual(str(dates[0]), "2025-01-01")
+        self.assertEqual(balances.tolist(), [-100.0, 100.0, 50.0, 200.0, 150.0])
+
+    def test_monthly_resampling_keeps_closing_balance(self):
+        dates, balances = cumulative_balance_series(transactions_sample, freq="M")
+        self.assertEqual([str(d) for d in dates], ["2025-01-01", "2025-02-01"])
+        self.assertEqual(balances.tolist(), [50.0, 150.0])
+        with self.assertRaises(ValueError):
+            cumulative_balance_series(transactions_sample, freq="Y")
+
+    def test_append_matches_full_computation(self):
+        history = CumulativeBalance(transactions_sample[:2])
+        history.append(transactions_sample[2:])
+        expected = cumulative_balance_series(transactions_sample)
+        np.testing.assert_array_equal(history.series()[1], expected[1])
+
+        backdated = CumulativeBalance(transactions_sample[2:])
+        backdated.append(transactions_sample[:2])
+        np.testing.assert_array_equal(backdated.series()[0], expected[0])
+        np.testing.assert_array_equal(backdated.series()[1], expected[1])
+
+    def test_listener_updates_and_deletes(self):
+        history = CumulativeBalance(transactions_sample)
+        history.on_update(transactions_sample[0], dict(transactions_sample[0], amount="10.0"))
+        history.on_delete(transactions_sample[4])
+        self.assertEqual(history.series()[1].tolist(), [-10.0, 190.0, 140.0, 290.0])
+
+    def test_listener_update_that_changes_id(self):
+        updated = dict(transactions_sample[0], id="9", amount="10.0")
+        history = CumulativeBalance(transactions_sample)
+        history.on_update(transactions_sample[0], updated)
+        expected = cumulative_balance_series(transactions_sample[1:] + [updated])
+        self.assertEqual(len(history), 5)
+        np.testing.assert_array_equal(history.series()[1], expected[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
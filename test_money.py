@@ -0,0 +1,71 @@
+import unittest
+import json
+import pickle
+from money import Money, format_money, to_cents
+
+
+class TestToCents(unittest.TestCase):
+
+    def test_parses_text_and_numbers(self):
+        """Test amounts in currency units become int cents"""
+
+        self.assertEqual([to_cents("100.5"), to_cents(" 0.1 "), to_cents(12), to_cents(19.99), to_cents(Money(7))],
+                         [10050, 10, 1200, 1999, 7])
+        self.assertEqual(to_cents("-3.455"), -346)  # half a cent rounds to even (of the float)
+
+    def test_rejects_non_numbers(self):
+        """Test text, NaN and infinity are refused with ValueError"""
+
+        for value in ("abc", "", "nan", "inf", "1e400"):
+            with self.assertRaises(ValueError):
+                to_cents(value)
+
+
+class TestMoney(unittest.TestCase):
+
+    def test_sums_are_exact(self):
+        """Test a million additions of 0.10 drift as floats but not as Money"""
+
+        self.assertNotEqual(sum([0.1] * 1000000), 100000.0)
+        self.assertEqual(sum([Money(10)] * 1000000), Money(10000000))
+        self.assertEqual(Money(10) + Money(20), Money(30))
+
+    def test_mixing_with_numbers(self):
+        """Test ints stay exact, floats give floats and comparisons are in units"""
+
+        self.assertEqual(Money(1050) + 2, Money(1250))
+        self.assertEqual(2 - Money(50), Money(150))
+        self.assertIsInstance(Money(1050) + 0.5, float)
+        self.assertEqual(Money(1050), 10.5)
+        self.assertEqual(hash(Money(1050)), hash(10.5))
+        self.assertLess(Money(-1), 0)
+        self.assertGreater(Money(101), Money(100))
+        self.assertNotEqual(Money(100), "1.00")
+
+    def test_numeric_protocol(self):
+        """Test multiplying, rounding and int() work as they do on the float of the amount"""
+
+        self.assertEqual([Money(500) * 2, 3 * Money(-25)], [Money(1000), Money(-75)])
+        self.assertIsInstance(Money(1050) * 1.5, float)
+        self.assertEqual([round(Money(1050)), round(Money(1150)), round(Money(-1051))], [10, 12, -11])
+        self.assertEqual([round(Money(1075), 1), round(Money(1234), 2), round(Money(123456), -2)],
+                         [Money(1080), Money(1234), Money(120000)])
+        self.assertIsInstance(round(Money(1075), 1), Money)
+        self.assertEqual([int(Money(1099)), int(Money(-1099))], [10, -10])
+        with self.assertRaises(TypeError):
+            Money(1) * Money(1)
+
+    def test_text(self):
+        """Test Money renders with two decimals and formats for display"""
+
+        self.assertEqual([str(Money(35000)), str(Money(-5)), repr(Money(1))], ["350.00", "-0.05", "Money(1)"])
+        self.assertEqual(eval(repr(Money(-1050))), Money(-1050))
+        self.assertEqual(f"{Money(1234):.1f}", "12.3")
+        self.assertEqual(format_money(Money(123456789)), "$1,234,567.89")
+        self.assertEqual(format_money(-0.25), "-$0.25")
+        self.assertEqual(pickle.loads(pickle.dumps(Money(42))), Money(42))
+        self.assertEqual(json.dumps({"total": Money(1050)}, default=float), '{"total": 10.5}')
+
+
+if __name__ == '__main__':
+    unittest.main()
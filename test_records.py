@@ -0,0 +1,82 @@
+import unittest
+import os
+import pickle
+import tempfile
+from datetime import date
+from money import Money
+from records import Transaction, as_transactions
+from storage import CsvBackend
+
+row_sample = {"id": "7", "transaction_name": "Groceries", "transaction_category": " Food ", "date": "2025-01-31",
+              "income_expense": "expense", "amount": "100.5", "essential": "yes"}
+
+
+class TestTransaction(unittest.TestCase):
+
+    def test_typed_slots(self):
+        """Test a converted row holds an int id, a date ordinal and the amount in cents"""
+
+        t = Transaction.from_row(row_sample)
+        self.assertEqual((t.id, t.date, t.cents), (7, date(2025, 1, 31).toordinal(), 10050))
+        self.assertEqual(t.amount, Money(10050))
+        self.assertEqual(t.month, "2025-01")
+        self.assertIs(t.transaction_category, Transaction.from_row(dict(row_sample)).transaction_category)
+        self.assertFalse(hasattr(t, "__dict__"))
+
+    def test_dictionary_compatibility(self):
+        """Test a Transaction reads and writes like a CSV row dictionary"""
+
+        t = Transaction.from_row(row_sample)
+        self.assertEqual(t["id"], "7")
+        self.assertEqual(t.get("essential"), "yes")
+        self.assertIsNone(t.get("description"))
+        self.assertEqual(dict(t), dict(row_sample, amount=100.5))
+        self.assertEqual(t, dict(row_sample, amount=100.5))
+
+        copy = t.copy()
+        copy["amount"] = "3"
+        copy["date"] = "2025-02-01"
+        self.assertEqual((copy.amount, copy.month, t.amount), (3.0, "2025-02", 100.5))
+        with self.assertRaises(KeyError):
+            t["description"] = "x"
+
+    def test_unusual_values_round_trip(self):
+        """Test odd ids and dates keep their exact text"""
+
+        t = Transaction.from_row(dict(row_sample, id="07", date=" 2025-02-03 "))
+        self.assertEqual((t.id, t["date"], t.month), ("07", " 2025-02-03 ", "2025-02"))
+        blank = Transaction.from_row(dict(row_sample, date=""))
+        self.assertEqual((blank.date, blank["date"], blank.month), (None, "", ""))
+        self.assertEqual(pickle.loads(pickle.dumps(t)), t)
+
+    def test_as_transactions(self):
+        """Test dictionaries are converted and Transactions passed through"""
+
+        t = Transaction.from_row(row_sample)
+        rows = [t]
+        self.assertIs(as_transactions(rows), rows)
+        converted = list(as_transactions([row_sample, t]))
+        self.assertEqual(converted, [t, t])
+        self.assertIs(converted[1], t)
+
+    def test_csv_round_trip(self):
+        """Test loading and rewriting a ledger keeps its bytes"""
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "ledger.csv")
+            text = ("id,transaction_name,transaction_category,date,income_expense,amount,essential\r\n"
+                    "1,Groceries, Food ,2025-01-01,expense,100.0,yes\r\n"
+                    "2,\"Bus, fare\",Transportation,2025-02-03 ,expense,50.5,no\r\n")
+            with open(path, "w", newline="") as f:
+                f.write(text)
+            backend = CsvBackend(path, snapshot_min_bytes=None)
+            rows, max_id = backend.load()
+            self.assertEqual(max_id, 2)
+            self.assertTrue(all(type(t) is Transaction for t in rows))
+            backend.write_all(rows)
+            with open(path, newline="") as f:
+                self.assertEqual(f.read(), text)
+
+
+if __name__ == '__main__':
+    unittest.main()
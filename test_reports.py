@@ -1,6 +1,13 @@
 import unittest
+import os
+import subprocess
+import sys
+import tempfile
 from collections import defaultdict
 from datetime import datetime
+from money import Money
+from reports import Reports, RunningSummary, merge_summaries
+from transactions import TransactionManager
 
 transactions_sample = [
     {"id": 1, "date": "2025-01-01", "amount": 100.0, "category": "Food", "description": "Groceries", "type": "expense"},
@@ -64,5 +71,220 @@ class TestReportsFunctions(unittest.TestCase):
         self.assertEqual(top_exp[0]["amount"], 100.0)
         self.assertEqual(top_exp[0]["category"], "Food")
 
+csv_rows_sample = [
+    {"id": "1", "transaction_name": "Groceries", "transaction_category": "Food", "date": "2025-01-01", "income_expense": "expense", "amount": "100.0", "essential": "yes"},
+    {"id": "2", "transaction_name": "Salary", "transaction_category": "Income", "date": "2025-01-02", "income_expense": "income", "amount": "200.0", "essential": "no"},
+    {"id": "3", "transaction_name": "Bus fare", "transaction_category": "Transportation", "date": "2025-01-15", "income_expense": "expense", "amount": "50.0", "essential": "yes"},
+    {"id": "4", "transaction_name": "Salary", "transaction_category": "Income", "date": "2025-02-01", "income_expense": "income", "amount": "150.0", "essential": "no"},
+    {"id": "5", "transaction_name": "Snacks", "transaction_category": "Food", "date": "2025-02-03", "income_expense": "expense", "amount": "50.0", "essential": "no"},
+]
+
+class TestComputeAll(unittest.TestCase):
+
+    def setUp(self):
+        self.reports = Reports()
+
+    def test_matches_individual_methods(self):
+        summary = self.reports.compute_all(csv_rows_sample, n=2)
+        self.assertEqual(summary["total_income"], self.reports.calculate_total_income(csv_rows_sample))
+        self.assertEqual(summary["total_expenses"], self.reports.calculate_total_expenses(csv_rows_sample))
+        self.assertEqual(summary["balance"], self.reports.calculate_balance(csv_rows_sample))
+        self.assertEqual(summary["monthly_summary"], self.reports.get_monthly_summary(csv_rows_sample))
+        self.assertEqual(summary["category_summary"], self.reports.get_category_summary(csv_rows_sample))
+        self.assertEqual(summary["top_expenses"], self.reports.get_top_expenses(csv_rows_sample, n=2))
+
+    def test_single_pass_over_iterator(self):
+        summary = self.reports.compute_all(iter(csv_rows_sample))
+        self.assertEqual(summary["balance"], 150.0)
+        self.assertEqual([t["id"] for t in summary["top_expenses"]], ["1", "3", "5"])
+
+    def test_totals_are_exact_money(self):
+        rows = [dict(csv_rows_sample[1], id=str(i), amount="0.1") for i in range(100000)]
+        summary = self.reports.compute_all(rows)
+        self.assertEqual(summary["total_income"], Money(1000000))
+        self.assertEqual(summary["monthly_summary"]["2025-01"]["income"], Money(1000000))
+        self.assertIsInstance(self.reports.calculate_balance(rows), Money)
+
+    def test_export_formats_money(self):
+        summary = self.reports.compute_all(csv_rows_sample)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "summary.csv")
+            self.reports.export_summary_to_csv({"total_income": summary["total_income"],
+                                                "monthly_summary": summary["monthly_summary"]}, path)
+            with open(path, newline="") as f:
+                lines = f.read().splitlines()
+        self.assertEqual(lines[1], "total_income,350.00")
+        self.assertIn("{'2025-01': {'income': 200.00, 'expense': 150.00}", lines[2])
+
+class TestStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.reports = Reports()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp_dir.name, "ledger.csv")
+        with open(self.csv_path, "w", newline="") as f:
+            f.write(",".join(csv_rows_sample[0]) + "\n")
+            for t in csv_rows_sample:
+                f.write(",".join(t.values()) + "\n")
+            f.write("6,Broken,Other,2025-02-04,expense,not-a-number,no\n")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_chunks_are_bounded_and_typed(self):
+        chunks = list(self.reports.iter_transaction_chunks(self.csv_path, chunk_size=2))
+        self.assertEqual([len(c) for c in chunks], [2, 2, 1])
+        self.assertEqual(chunks[0][0]["amount"], 100.0)
+
+    def test_summaries_accept_iterators(self):
+        stream = lambda: self.reports.iter_transactions_from_csv(self.csv_path, chunk_size=2)
+        self.assertEqual(self.reports.calculate_balance(stream()), 150.0)
+        self.assertEqual(self.reports.get_monthly_summary(stream()), self.reports.get_monthly_summary(csv_rows_sample))
+        self.assertEqual(self.reports.get_category_summary(stream()), self.reports.get_category_summary(csv_rows_sample))
+        top = self.reports.get_top_expenses(stream(), n=2)
+        self.assertEqual([t["id"] for t in top], ["1", "3"])
+
+    def test_readers_replay_unfolded_journal(self):
+        """Test every direct file reader sees edits still in the journal"""
+
+        tm = TransactionManager(csv_file=self.csv_path, journal=True)
+        tm.delete_transaction(1)
+        tm.add_transaction("Rent", "Other", "2025-02-05", "expense", 900.0, "yes")
+        expected = self.reports.compute_all(tm.load_transactions())
+        for source in (self.reports.load_transactions_from_csv(self.csv_path),
+                       self.reports.scan_csv(self.csv_path),
+                       self.reports.load_ledger(self.csv_path),
+                       self.reports.iter_transactions_from_csv(self.csv_path)):
+            self.assertEqual(self.reports.compute_all(source), expected)
+
+class TestMultiFileReports(unittest.TestCase):
+
+    def setUp(self):
+        self.reports = Reports()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.paths = []
+        for i, rows in enumerate([csv_rows_sample[:2], csv_rows_sample[2:]]):
+            path = os.path.join(self.tmp_dir.name, f"ledger{i}.csv")
+            TransactionManager(csv_file=path).add_transactions(rows)
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_merge_matches_single_ledger(self):
+        parts = [self.reports.compute_all(csv_rows_sample[:2]), self.reports.compute_all(csv_rows_sample[2:])]
+        merged = merge_summaries(parts, n=2)
+        whole = self.reports.compute_all(csv_rows_sample, n=2)
+        self.assertEqual(merged["balance"], whole["balance"])
+        self.assertEqual(merged["monthly_summary"], whole["monthly_summary"])
+        self.assertEqual(merged["category_summary"], whole["category_summary"])
+        self.assertEqual(merged["top_expenses"], whole["top_expenses"])
+
+    def test_summarize_files_in_process_pool(self):
+        summary = self.reports.summarize_files(self.paths, max_workers=2)
+        self.assertEqual(summary["total_income"], 350.0)
+        self.assertEqual(summary["total_expenses"], 200.0)
+        self.assertEqual([t["transaction_name"] for t in summary["top_expenses"]][:2], ["Groceries", "Bus fare"])
+
+class TestChartExport(unittest.TestCase):
+
+    def setUp(self):
+        self.reports = Reports()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_render_charts_writes_files_without_pyplot(self):
+        import matplotlib.pyplot as plt
+        paths = self.reports.render_charts(csv_rows_sample, self.tmp_dir.name, formats=("png", "svg"))
+        self.assertEqual(len(paths), 6)
+        for path in paths:
+            self.assertGreater(os.path.getsize(path), 0)
+        self.assertEqual(plt.get_fignums(), [])
+
+    def test_charts_without_data_are_skipped(self):
+        income_only = [t for t in csv_rows_sample if t["income_expense"] == "income"]
+        paths = self.reports.render_charts(income_only, self.tmp_dir.name)
+        self.assertEqual([os.path.basename(p) for p in paths], ["cumulative_balance.png"])
+
+    def test_export_chart_packs_in_process_pool(self):
+        ledgers = []
+        for i, rows in enumerate([csv_rows_sample[:3], csv_rows_sample[3:]]):
+            path = os.path.join(self.tmp_dir.name, f"ledger{i}.csv")
+            TransactionManager(csv_file=path).add_transactions(rows)
+            ledgers.append(path)
+        out_dir = os.path.join(self.tmp_dir.name, "charts")
+        packs = self.reports.export_chart_packs(ledgers, out_dir, max_workers=2)
+        self.assertEqual(len(packs[ledgers[0]]), 3)
+        self.assertTrue(all(p.startswith(os.path.join(out_dir, "ledger1")) for p in packs[ledgers[1]]))
+
+        single = self.reports.export_chart_packs(ledgers[:1], out_dir, max_workers=2)
+        self.assertEqual(sorted(single[ledgers[0]]), sorted(packs[ledgers[0]]))
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_text_reports_do_not_load_plotting_libraries(self):
+        code = (
+            "import sys, main, reports\n"
+            "heavy = ['matplotlib', 'pandas', 'seaborn', 'numpy', 'tkinter']\n"
+            "print(','.join(m for m in heavy if m in sys.modules))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+        self.assertEqual(result.stdout.strip(), "")
+
+class TestRunningSummary(unittest.TestCase):
+
+    def setUp(self):
+        self.reports = Reports()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tm = TransactionManager(csv_file=os.path.join(self.tmp_dir.name, "ledger.csv"))
+        self.tm.add_transactions(csv_rows_sample)
+        self.summary = RunningSummary()
+        self.tm.add_listener(self.summary)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def assertMatchesFullScan(self):
+        rows = self.tm.load_transactions()
+        expected = self.reports.compute_all(rows, n=3)
+        actual = self.reports.compute_all(self.summary, n=3)
+        self.assertEqual(actual, expected)
+
+    def test_initial_state(self):
+        self.assertMatchesFullScan()
+
+    def test_deltas_on_mutation(self):
+        self.tm.add_transaction("Rent", "Other", "2025-03-01", "expense", 900.0, "yes")
+        self.tm.update_transaction(1, {"amount": 25.0, "transaction_category": "Other"})
+        self.tm.delete_transaction(3)
+        self.assertMatchesFullScan()
+        self.assertEqual([t["id"] for t in self.summary.top_expenses(2)], ["6", "5"])
+
+    def test_ties_between_text_and_numeric_ids(self):
+        """Test equal amounts under text and int ids rank in order, and top rows are copies"""
+
+        csv_path = os.path.join(self.tmp_dir.name, "text_ids.csv")
+        with open(csv_path, "w", newline="") as f:
+            f.write("id,transaction_name,transaction_category,date,income_expense,amount,essential\n"
+                    "abc,Cake,Food,2025-05-01,expense,5.0,no\n")
+        tm = TransactionManager(csv_file=csv_path)
+        summary = RunningSummary()
+        tm.add_listener(summary)
+        tm.add_transaction("Tea", "Food", "2025-05-02", "expense", 5.0, "no")
+        self.assertEqual([t["transaction_name"] for t in summary.top_expenses(2)], ["Cake", "Tea"])
+
+        summary.top_expenses(1)[0]["amount"] = 99.0
+        self.assertEqual([t["amount"] for t in tm.load_transactions()], [5.0, 5.0])
+        self.assertEqual(len(TransactionManager(csv_file=csv_path).load_transactions()), 2)
+
+    def test_empty_groups_disappear(self):
+        self.tm.delete_transaction(4)
+        self.assertEqual(self.summary.monthly_summary()["2025-02"]["income"], 0.0)
+        self.tm.delete_transaction(5)
+        self.assertNotIn("2025-02", self.summary.monthly_summary())
+
 if __name__ == '__main__':
     unittest.main()
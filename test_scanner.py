@@ -0,0 +1,81 @@
+import unittest
+import os
+import tempfile
+from money import Money
+from reports import Reports
+from scanner import scan_csv
+
+HEADER = "id,transaction_name,transaction_category,date,income_expense,amount,essential\r\n"
+
+CSV_TEXT = HEADER + (
+    "1,Groceries, Food ,2025-01-01,expense,100.0,yes\r\n"
+    "2,Salary,Income,2025-01-02,income,200,no\r\n"
+    "\r\n"
+    "3,\"Bus, fare\",\"Transport, local\",2025-01-15,expense,50.5,yes\r\n"
+    "4,Refund,Food,2025-02-03 ,transfer,7.25,no\r\n"
+    "5,\"Snacks \"\"to go\"\"\",Food,2025-02-03,expense,50.5,no\r\n"
+    "6,Bonus,Income,2025-03-01,income,0.1,\"no\""
+)
+
+
+class TestCsvScanner(unittest.TestCase):
+
+    def setUp(self):
+        """Write a ledger with quoting, blank lines and no final newline to a temp directory"""
+
+        self.reports = Reports()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "transactions.csv")
+        self.write(CSV_TEXT)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, text):
+        with open(self.path, "w", newline="") as f:
+            f.write(text)
+
+    def test_matches_dictionary_path(self):
+        """Test every summary equals the one computed from loaded dictionaries"""
+
+        rows = self.reports.load_transactions_from_csv(self.path)
+        scanner = scan_csv(self.path)
+        self.assertIsNotNone(scanner)
+        expected = self.reports.compute_all(rows, n=3)
+        self.assertEqual(self.reports.compute_all(scanner, n=3), expected)
+        self.assertEqual(list(scanner.monthly_summary()), list(expected["monthly_summary"]))
+        self.assertEqual(list(scanner.category_summary()), list(expected["category_summary"]))
+        self.assertEqual(self.reports.get_top_expenses(scanner, 2), self.reports.get_top_expenses(rows, 2))
+        self.assertEqual(self.reports.calculate_balance(scanner), self.reports.calculate_balance(rows))
+
+    def test_sums_are_exact(self):
+        """Test totals are exact in cents, even where float sums would round, like the Python loop"""
+
+        amounts = ["0.1", "0.2", "0.3", "1e16", "1", "-1e16"] * 50
+        self.write(HEADER + "".join(f"{i},x,Food,2025-01-01,income,{a},no\r\n" for i, a in enumerate(amounts)))
+        rows = self.reports.load_transactions_from_csv(self.path)
+        self.assertEqual(self.reports.calculate_total_income(scan_csv(self.path)), Money(8000))
+        self.assertEqual(self.reports.calculate_total_income(rows), Money(8000))
+
+    def test_unsupported_files_fall_back(self):
+        """Test ragged rows and bad amounts make scan_csv give up and Reports load rows instead"""
+
+        self.write(HEADER + "1,Coffee,Food,2025-01-01,expense,3.5\r\n")
+        self.assertIsNone(scan_csv(self.path))
+        self.assertIsInstance(self.reports.scan_csv(self.path), list)
+
+        self.write(HEADER + "1,Coffee,Food,2025-01-01,expense,abc,no\r\n")
+        self.assertIsNone(scan_csv(self.path))
+
+    def test_header_only(self):
+        """Test an empty ledger scans to empty summaries"""
+
+        self.write(HEADER)
+        summary = self.reports.compute_all(scan_csv(self.path))
+        self.assertEqual(summary["total_income"], 0)
+        self.assertEqual(summary["monthly_summary"], {})
+        self.assertEqual(summary["top_expenses"], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
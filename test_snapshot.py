@@ -0,0 +1,103 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from ledger import ColumnarLedger, cumulative_balance_series
+from reports import Reports
+from snapshot import Snapshot
+from storage import CsvBackend
+
+CSV_TEXT = (
+    "id,transaction_name,transaction_category,date,income_expense,amount,essential\r\n"
+    "1,Groceries, Food ,2025-01-01,expense,100.0,yes\r\n"
+    "2,Salary,Income,2025-01-02,income,200,no\r\n"
+    "3,Broken,Food,2025-01-03,expense,abc,no\r\n"
+    "\r\n"
+    "4,\"Bus, fare\",Transportation,2025-01-15,expense,50.5,yes\r\n"
+    "9,Snacks,Food,2025-02-03 ,expense,50.0,no\r\n"
+)
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        """Write a small ledger, including a bad amount and a blank line, to a temp directory"""
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp_dir.name, "transactions.csv")
+        with open(self.csv_path, "w", newline="") as f:
+            f.write(CSV_TEXT)
+        self.snapshot = Snapshot(self.csv_path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def csv_load(self):
+        return CsvBackend(self.csv_path, snapshot_min_bytes=None).load()
+
+    def test_load_matches_csv_parse(self):
+        """Test rows and max id from the snapshot equal a CSV parse"""
+
+        self.assertIsNone(self.snapshot.load())
+        self.assertTrue(self.snapshot.build())
+        self.assertEqual(self.snapshot.load(), self.csv_load())
+
+    def test_stale_after_change_but_not_after_touch(self):
+        """Test an edit invalidates the snapshot while an unchanged rewrite does not"""
+
+        self.snapshot.build()
+        st = os.stat(self.csv_path)
+        os.utime(self.csv_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+        self.assertTrue(self.snapshot.is_fresh())
+
+        with open(self.csv_path, "a", newline="") as f:
+            f.write("10,Rent,Other,2025-03-01,expense,900,yes\r\n")
+        self.assertIsNone(self.snapshot.load())
+
+    def test_ledger_matches_columnar_ledger(self):
+        """Test summaries of the mapped ledger equal those of a ledger built from rows"""
+
+        self.snapshot.build()
+        mapped = self.snapshot.load_ledger()
+        built = ColumnarLedger.from_transactions(self.csv_load()[0])
+        reports = Reports()
+        self.assertEqual(reports.compute_all(mapped, n=2), reports.compute_all(built, n=2))
+        self.assertEqual(list(mapped), list(built))
+
+    def test_ledger_reads_malformed_dates_like_rows(self):
+        """Test dates only NumPy would accept are left out of the mapped ledger too"""
+
+        with open(self.csv_path, "a", newline="") as f:
+            f.write("10,Rent,Other,2025-01,expense,900,yes\r\n"
+                    "11,Gift,Income,20250105,income,40,no\r\n"
+                    "12,Fee,Other,,expense,1,no\r\n")
+        self.snapshot.build()
+        mapped = self.snapshot.load_ledger()
+        built = ColumnarLedger.from_transactions(self.csv_load()[0])
+        np.testing.assert_array_equal(mapped.day, built.day)
+        for expected, actual in zip(cumulative_balance_series(built), cumulative_balance_series(mapped)):
+            np.testing.assert_array_equal(actual, expected)
+
+    def test_foreign_header_is_not_snapshotted(self):
+        """Test a CSV with different columns is left to the CSV reader"""
+
+        with open(self.csv_path, "w", newline="") as f:
+            f.write("id,name,amount\r\n1,Coffee,3.5\r\n")
+        self.assertFalse(self.snapshot.build())
+        self.assertFalse(self.snapshot.is_fresh())
+
+    def test_backend_rebuilds_in_background(self):
+        """Test CsvBackend falls back to the CSV and leaves a fresh snapshot behind"""
+
+        backend = CsvBackend(self.csv_path, snapshot_min_bytes=0)
+        first = backend.load()
+        backend.snapshot().wait(timeout=10)
+        self.assertTrue(backend.snapshot().is_fresh())
+        self.assertEqual(backend.load(), first)
+
+        small = CsvBackend(self.csv_path)
+        self.assertIsNone(small.snapshot())
+
+
+if __name__ == '__main__':
+    unittest.main()
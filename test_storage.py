@@ -0,0 +1,264 @@
+import unittest
+import csv
+import io
+import os
+import tempfile
+from unittest import mock
+from reports import Reports
+from storage import CsvBackend, JournaledCsvBackend, SqliteBackend, migrate_csv_to_sqlite
+from transactions import TransactionManager
+
+
+class TestSqliteBackend(unittest.TestCase):
+
+    def setUp(self):
+        """Create a TransactionManager backed by an SQLite database in a temp directory"""
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "ledger.db")
+        self.backend = SqliteBackend(self.db_path)
+        self.tm = TransactionManager(backend=self.backend)
+        self.tm.add_transactions([
+            {"transaction_name": "Groceries", "transaction_category": "Food", "date": "2025-01-01",
+             "income_expense": "expense", "amount": 100.0, "essential": "yes"},
+            {"transaction_name": "Salary", "transaction_category": "Income", "date": "2025-01-02",
+             "income_expense": "income", "amount": 200.0, "essential": "no"},
+            {"transaction_name": "Bus fare", "transaction_category": "Transportation", "date": "2025-01-15",
+             "income_expense": "expense", "amount": 50.0, "essential": "yes"},
+            {"transaction_name": "Salary", "transaction_category": "Income", "date": "2025-02-01",
+             "income_expense": "income", "amount": 150.0, "essential": "no"},
+        ])
+
+    def tearDown(self):
+        self.backend.close()
+        self.tmp_dir.cleanup()
+
+    def test_wal_mode(self):
+        """Test the database is opened in WAL mode"""
+
+        self.assertEqual(self.backend._query("PRAGMA journal_mode")[0][0], "wal")
+
+    def test_mutations_persist(self):
+        """Test update and delete reach the database"""
+
+        self.tm.update_transaction(1, {"amount": 120.0})
+        self.tm.delete_transaction(3)
+        other = SqliteBackend(self.db_path)
+        rows = TransactionManager(backend=other).load_transactions()
+        other.close()
+        self.assertEqual([t["id"] for t in rows], ["1", "2", "4"])
+        self.assertEqual(rows[0]["amount"], 120.0)
+
+    def test_deleted_id_reused_in_same_commit(self):
+        """Test an id deleted and given to another row in one flush holds that row"""
+
+        with self.tm.batch():
+            self.tm.delete_transaction(2)
+            self.tm.update_transaction(1, {"id": 2})
+        self.tm.commit_window = 60
+        self.tm.delete_transaction(3)
+        self.tm.update_transaction(4, {"id": 3})
+        self.tm.add_transaction("Snack", "Food", "2025-02-02", "expense", 3.0, "no")
+        self.tm.delete_transaction(5)
+        self.tm.flush()
+        rows, _ = self.backend.load()
+        self.assertEqual([(t["id"], t["transaction_name"]) for t in rows], [("2", "Groceries"), ("3", "Salary")])
+
+    def test_reports_push_down_to_sql(self):
+        """Test Reports gives the same answers from SQL as from the row list"""
+
+        reports = Reports()
+        rows = self.tm.load_transactions()
+        self.assertEqual(reports.calculate_total_income(self.backend), reports.calculate_total_income(rows))
+        self.assertEqual(reports.calculate_balance(self.backend), 200.0)
+        self.assertEqual(reports.get_monthly_summary(self.backend), reports.get_monthly_summary(rows))
+        self.assertEqual(reports.get_category_summary(self.backend), reports.get_category_summary(rows))
+        self.assertEqual(reports.get_top_expenses(self.backend, n=1), reports.get_top_expenses(rows, n=1))
+
+    def test_top_expenses_n_not_positive(self):
+        """Test top_expenses(n) with n <= 0 is empty rather than every row"""
+
+        self.assertEqual([self.backend.top_expenses(n) for n in (0, -1)], [[], []])
+        self.assertEqual(len(self.backend.where(category="Food").top_expenses(5)), 1)
+
+    def test_filtered_view(self):
+        """Test where() filters by date range and category"""
+
+        reports = Reports()
+        january = self.backend.where(start_date="2025-01-01", end_date="2025-01-31")
+        self.assertEqual(reports.calculate_total_income(january), 200.0)
+        food = self.backend.where(category="Food")
+        self.assertEqual(reports.get_category_summary(food), {"Food": 100.0})
+
+
+class TestCsvBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp_dir.name, "ledger.csv")
+        self.backend = CsvBackend(self.csv_path)
+        self.rows = [
+            {"id": "1", "transaction_name": "Bus, fare", "transaction_category": "Transportation",
+             "date": "2025-01-15", "income_expense": "expense", "amount": 50.5, "essential": "yes"},
+            {"id": "2", "transaction_name": 'The "big" shop', "transaction_category": " Food ",
+             "date": "2025-01-16", "income_expense": "expense", "amount": 0.1 + 0.2, "essential": None},
+            {"id": "3", "transaction_name": "Salary", "transaction_category": "Income",
+             "date": "2025-01-31", "income_expense": "income", "amount": 1000.0, "essential": "no"},
+        ]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_rows_are_written_like_dictwriter(self):
+        """Test the preformatted lines match csv.DictWriter output exactly"""
+
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=self.backend.fieldnames)
+        writer.writeheader()
+        writer.writerows(self.rows)
+        self.backend.write_all(self.rows)
+        with open(self.csv_path, newline="") as f:
+            self.assertEqual(f.read(), buffer.getvalue())
+
+        self.backend.append(self.rows[:1])
+        self.assertEqual(self.backend.load()[0][-1]["transaction_name"], "Bus, fare")
+
+    def test_failed_rewrite_keeps_old_file(self):
+        """Test a crash before the rename leaves the ledger intact and no temp file behind"""
+
+        self.backend.write_all(self.rows)
+        with open(self.csv_path, newline="") as f:
+            before = f.read()
+        with mock.patch("storage.os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.backend.write_all(self.rows[:1])
+        with open(self.csv_path, newline="") as f:
+            self.assertEqual(f.read(), before)
+        self.assertEqual(os.listdir(self.tmp_dir.name), ["ledger.csv"])
+
+
+class TestJournaledCsvBackend(unittest.TestCase):
+
+    def setUp(self):
+        """Create a journaled store with three rows in a temp directory"""
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp_dir.name, "ledger.csv")
+        self.tm = TransactionManager(csv_file=self.csv_path, journal=True)
+        for name in ("Coffee", "Bus", "Rent"):
+            self.tm.add_transaction(name, "Other", "2025-05-01", "expense", 10.0, "no")
+
+    def tearDown(self):
+        self.tm.backend.wait()
+        self.tmp_dir.cleanup()
+
+    def read_csv(self):
+        with open(self.csv_path, newline="") as f:
+            return f.read()
+
+    def plain_rows(self):
+        return TransactionManager(backend=CsvBackend(self.csv_path)).load_transactions()
+
+    def test_edits_are_journaled_and_replayed(self):
+        """Test edits leave the CSV untouched, are replayed by readers and folded by compact()"""
+
+        base = self.read_csv()
+        self.tm.update_transaction(2, {"amount": 12.5, "transaction_name": 'Bus, "express"'})
+        self.tm.delete_transaction(1)
+        self.tm.add_transaction("Lunch", "Food", "2025-05-02", "expense", 8.0, "no")
+        self.assertEqual(self.read_csv(), base)
+
+        expected = self.tm.load_transactions()
+        self.assertEqual([t["id"] for t in expected], ["2", "3", "4"])
+        self.assertEqual(TransactionManager(csv_file=self.csv_path).load_transactions(), expected)
+
+        self.assertTrue(self.tm.backend.compact())
+        self.assertEqual(os.listdir(self.tmp_dir.name), ["ledger.csv"])
+        self.assertEqual(self.plain_rows(), expected)
+
+    def test_torn_journal_line_is_ignored(self):
+        """Test a partial last entry from a crash does not break loading"""
+
+        self.tm.delete_transaction(3)
+        with open(self.tm.backend.journal_file, "a") as f:
+            f.write('{"delete": ["1"]')
+        rows = TransactionManager(csv_file=self.csv_path).load_transactions()
+        self.assertEqual([t["id"] for t in rows], ["1", "2"])
+
+    def test_size_threshold_compacts_in_background(self):
+        """Test a full journal is folded in the background without a reload"""
+
+        self.tm.backend.compact_bytes = 1
+        reloads = []
+        listener = mock.Mock(on_reload=reloads.append)
+        self.tm.add_listener(listener)
+        self.tm.update_transaction(1, {"amount": 99.0})
+        self.tm.backend.wait(timeout=10)
+        self.assertFalse(os.path.exists(self.tm.backend.journal_file))
+        self.assertEqual(self.plain_rows()[0]["amount"], 99.0)
+        self.tm.load_transactions()
+        self.assertEqual(len(reloads), 1)  # only the one from add_listener
+
+    def test_id_change_keeps_order(self):
+        """Test a re-keyed row keeps its place in the file"""
+
+        self.tm.update_transaction(2, {"id": "20"})
+        self.assertEqual([t["id"] for t in self.plain_rows()], ["1", "20", "3"])
+        self.assertEqual([t["id"] for t in TransactionManager(csv_file=self.csv_path).load_transactions()],
+                         ["1", "20", "3"])
+
+
+class TestMigration(unittest.TestCase):
+
+    def test_migrate_csv_to_sqlite(self):
+        """Test every CSV row ends up in the database"""
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = os.path.join(tmp_dir, "ledger.csv")
+            db_path = os.path.join(tmp_dir, "ledger.db")
+            tm = TransactionManager(csv_file=csv_path)
+            tm.add_transaction("Coffee", "Food", "2025-05-01", "expense", 3.5, "no")
+            tm.add_transaction("Salary", "Income", "2025-05-02", "income", 1000.0, "no")
+
+            self.assertEqual(migrate_csv_to_sqlite(csv_path, db_path), 2)
+            backend = SqliteBackend(db_path)
+            rows, max_id = backend.load()
+            backend.close()
+            self.assertEqual(rows, CsvBackend(csv_path).load()[0])
+            self.assertEqual(max_id, 2)
+
+    def test_migration_replays_journal(self):
+        """Test edits still in the journal are migrated"""
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = os.path.join(tmp_dir, "ledger.csv")
+            db_path = os.path.join(tmp_dir, "ledger.db")
+            tm = TransactionManager(csv_file=csv_path, journal=True)
+            tm.add_transaction("Coffee", "Food", "2025-05-01", "expense", 3.5, "no")
+            tm.add_transaction("Salary", "Income", "2025-05-02", "income", 1000.0, "no")
+            tm.delete_transaction(1)
+
+            self.assertEqual(migrate_csv_to_sqlite(csv_path, db_path), 1)
+            backend = SqliteBackend(db_path)
+            rows, _ = backend.load()
+            backend.close()
+            self.assertEqual(rows, tm.load_transactions())
+
+    def test_migration_refuses_ids_sqlite_cannot_hold(self):
+        """Test blank, non-integer and repeated ids raise ValueError before anything is written"""
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = os.path.join(tmp_dir, "ledger.csv")
+            db_path = os.path.join(tmp_dir, "ledger.db")
+            with open(csv_path, "w", newline="") as f:
+                f.write("id,transaction_name,transaction_category,date,income_expense,amount,essential\n"
+                        ",Tea,Food,2025-05-01,expense,2.0,no\n"
+                        "5,Rent,Housing,2025-05-01,expense,500.0,yes\n"
+                        "5,Bonus,Income,2025-05-03,income,50.0,no\n")
+            with self.assertRaisesRegex(ValueError, r"not integers: ''; ids used more than once: 5"):
+                migrate_csv_to_sqlite(csv_path, db_path)
+            self.assertFalse(os.path.exists(db_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,8 @@
 import unittest
 import os
+import tempfile
+from datetime import date
+from unittest import mock
 from transactions import TransactionManager
 
 class TestTransactionManager(unittest.TestCase):
@@ -76,6 +79,256 @@ class TestTransactionManager(unittest.TestCase):
 
             self.tm.update_transaction(999, "None", "2025-05-05", "income", 0.0, "no")
 
+
+class TestAppendOnlyWrites(unittest.TestCase):
+
+    def setUp(self):
+        """Create a TransactionManager backed by a file in a temp directory"""
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp_dir.name, "ledger.csv")
+        self.tm = TransactionManager(csv_file=self.csv_path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_add_to_new_file_writes_header(self):
+        """Test the first add creates the file with the usual header"""
+
+        self.tm.add_transaction("Coffee", "Food", "2025-05-01", "expense", 3.5, "no")
+        with open(self.csv_path, newline='') as f:
+            content = f.read()
+        self.assertEqual(content, ",".join(self.tm.fieldnames) + "\r\n1,Coffee,Food,2025-05-01,expense,3.5,no\r\n")
+
+    def test_add_appends_without_rewriting(self):
+        """Test existing rows are left byte-for-byte untouched"""
+
+        self.tm.add_transaction("Coffee", "Food", "2025-05-01", "expense", 3.5, "no")
+        with open(self.csv_path, 'rb') as f:
+            before = f.read()
+        self.tm.add_transaction("Salary", "Income", "2025-05-02", "income", 1000.0, "no")
+        with open(self.csv_path, 'rb') as f:
+            after = f.read()
+        self.assertTrue(after.startswith(before))
+        self.assertEqual([t["id"] for t in self.tm.load_transactions()], ["1", "2"])
+
+    def test_external_edit_rescans_ids(self):
+        """Test a row appended by another program is not given a duplicate ID"""
+
+        self.tm.add_transaction("Coffee", "Food", "2025-05-01", "expense", 3.5, "no")
+        with open(self.csv_path, 'a', newline='') as f:
+            f.write("7,Rent,Other,2025-05-02,expense,900.0,yes")  # no trailing newline
+        self.tm.add_transaction("Bus", "Transportation", "2025-05-03", "expense", 2.0, "yes")
+        ids = [t["id"] for t in self.tm.load_transactions()]
+        self.assertEqual(ids, ["1", "7", "8"])
+
+
+class TestResidentStore(unittest.TestCase):
+
+    def setUp(self):
+        """Create a store with two rows in a temp directory"""
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp_dir.name, "ledger.csv")
+        self.tm = TransactionManager(csv_file=self.csv_path)
+        self.tm.add_transaction("Coffee", "Food", "2025-05-01", "expense", 3.5, "no")
+        self.tm.add_transaction("Salary", "Income", "2025-05-02", "income", 1000.0, "no")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_update_and_delete_write_through(self):
+        """Test mutations are visible to a fresh manager reading the file"""
+
+        self.tm.update_transaction(1, {"amount": 4.25, "essential": "yes"})
+        self.tm.delete_transaction(2)
+        rows = TransactionManager(csv_file=self.csv_path).load_transactions()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["amount"], 4.25)
+        self.assertEqual(rows[0]["essential"], "yes")
+
+    def test_update_rejects_bad_new_id(self):
+        """Test a taken or non-integer new id raises and leaves the store and file untouched"""
+
+        for new_id in ("2", "abc"):
+            with self.assertRaises(ValueError):
+                self.tm.update_transaction(1, {"id": new_id, "amount": 9.0})
+        for tm in (self.tm, TransactionManager(csv_file=self.csv_path)):
+            rows = tm.load_transactions()
+            self.assertEqual([(t["id"], t["amount"]) for t in rows], [("1", 3.5), ("2", 1000.0)])
+
+        self.tm.update_transaction(1, {"id": "5"})
+        rows = TransactionManager(csv_file=self.csv_path).load_transactions()
+        self.assertEqual(sorted(t["id"] for t in rows), ["2", "5"])
+
+    def test_blank_and_repeated_ids_are_kept(self):
+        """Test rows sharing an id survive loading and rewrites, and delete removes all of them"""
+
+        for journal in (False, True):
+            with open(self.csv_path, "w", newline="") as file:
+                file.write("id,transaction_name,transaction_category,date,income_expense,amount,essential\n"
+                           ",Tea,Food,2025-05-01,expense,2.0,no\n"
+                           "5,Rent,Housing,2025-05-01,expense,500.0,yes\n"
+                           ",Cake,Food,2025-05-02,expense,4.0,no\n"
+                           "5,Bonus,Income,2025-05-03,income,50.0,no\n")
+            tm = TransactionManager(csv_file=self.csv_path, journal=journal)
+            self.assertEqual([t["transaction_name"] for t in tm.load_transactions()], ["Tea", "Rent", "Cake", "Bonus"])
+            self.assertEqual(len(tm.where(category="Food")), 2)
+
+            tm.update_transaction(5, {"amount": 600.0})
+            tm.update_transaction("", {"essential": "yes"})
+            rows = TransactionManager(csv_file=self.csv_path).load_transactions()
+            self.assertEqual([(t["transaction_name"], t["amount"], t["essential"]) for t in rows],
+                             [("Tea", 2.0, "yes"), ("Rent", 600.0, "yes"), ("Cake", 4.0, "no"), ("Bonus", 50.0, "no")])
+
+            tm.delete_transaction(5)
+            rows = TransactionManager(csv_file=self.csv_path).load_transactions()
+            self.assertEqual([t["transaction_name"] for t in rows], ["Tea", "Cake"])
+            self.assertEqual([t["transaction_name"] for t in tm.where()], ["Tea", "Cake"])
+
+    def test_returned_rows_are_copies(self):
+        """Test callers cannot corrupt the resident store"""
+
+        self.tm.load_transactions()[0]["transaction_name"] = "Changed"
+        self.assertEqual(self.tm.load_transactions()[0]["transaction_name"], "Coffee")
+
+    def test_reload_after_external_edit(self):
+        """Test an edit made by another process is picked up"""
+
+        other = TransactionManager(csv_file=self.csv_path)
+        other.delete_transaction(1)
+        rows = self.tm.load_transactions()
+        self.assertEqual([t["id"] for t in rows], ["2"])
+
+    def test_deferred_flush(self):
+        """Test autoflush=False keeps changes in memory until flush()"""
+
+        tm = TransactionManager(csv_file=self.csv_path, autoflush=False)
+        tm.add_transaction("Bus", "Transportation", "2025-05-03", "expense", 2.0, "yes")
+        tm.delete_transaction(1)
+        self.assertEqual(len(TransactionManager(csv_file=self.csv_path).load_transactions()), 2)
+        tm.flush()
+        rows = TransactionManager(csv_file=self.csv_path).load_transactions()
+        self.assertEqual([t["id"] for t in rows], ["2", "3"])
+
+
+class TestBulkImport(unittest.TestCase):
+
+    def setUp(self):
+        """Create an empty store in a temp directory"""
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp_dir.name, "ledger.csv")
+        self.tm = TransactionManager(csv_file=self.csv_path)
+        self.row = {"transaction_name": "Coffee", "transaction_category": "Food", "date": "2025-05-01",
+                    "income_expense": "expense", "amount": "3.50", "essential": "no"}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_add_transactions_assigns_sequential_ids(self):
+        """Test a batch is stored with consecutive IDs"""
+
+        self.tm.add_transaction("Salary", "Income", "2025-05-02", "income", 1000.0, "no")
+        ids = self.tm.add_transactions([self.row] * 3)
+        self.assertEqual(ids, ["2", "3", "4"])
+        rows = TransactionManager(csv_file=self.csv_path).load_transactions()
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[-1]["amount"], 3.5)
+
+    def test_add_transactions_is_all_or_nothing(self):
+        """Test one invalid row rejects the whole batch"""
+
+        bad = dict(self.row, income_expense="refund")
+        with self.assertRaises(ValueError):
+            self.tm.add_transactions([self.row, bad])
+        self.assertEqual(self.tm.load_transactions(), [])
+
+        for bad in (dict(self.row, amount=None), dict(self.row, date=date(2025, 5, 1))):
+            with self.assertRaisesRegex(ValueError, "^row 1: "):
+                self.tm.add_transactions([self.row, bad])
+        self.assertEqual(self.tm.load_transactions(), [])
+
+    def test_batch_defers_write_until_exit(self):
+        """Test the batch context writes once on exit"""
+
+        with self.tm.batch():
+            self.tm.add_transaction("Bus", "Transportation", "2025-05-03", "expense", 2.0, "yes")
+            self.tm.add_transactions([self.row])
+            self.assertFalse(os.path.exists(self.csv_path))
+        self.assertEqual(len(TransactionManager(csv_file=self.csv_path).load_transactions()), 2)
+
+    def test_batch_rolls_back_on_error(self):
+        """Test an exception inside the batch discards its changes"""
+
+        with self.assertRaises(RuntimeError):
+            with self.tm.batch():
+                self.tm.add_transactions([self.row])
+                raise RuntimeError("abort import")
+        self.assertEqual(self.tm.load_transactions(), [])
+
+
+class TestGroupCommit(unittest.TestCase):
+
+    def setUp(self):
+        """Create a store with a long commit window in a temp directory"""
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp_dir.name, "ledger.csv")
+        self.tm = TransactionManager(csv_file=self.csv_path, commit_window=60)
+
+    def tearDown(self):
+        self.tm.flush()
+        self.tmp_dir.cleanup()
+
+    def stored_ids(self):
+        return [t["id"] for t in TransactionManager(csv_file=self.csv_path).load_transactions()]
+
+    def test_burst_is_written_once(self):
+        """Test changes inside the window reach disk together on flush"""
+
+        self.tm.add_transaction("Coffee", "Food", "2025-05-01", "expense", 3.5, "no")
+        self.tm.add_transaction("Bus", "Transportation", "2025-05-02", "expense", 2.0, "yes")
+        self.tm.delete_transaction(1)
+        self.assertEqual(self.stored_ids(), [])
+        self.assertEqual([t["id"] for t in self.tm.load_transactions()], ["2"])
+        self.tm.flush()
+        self.assertEqual(self.stored_ids(), ["2"])
+
+    def test_window_elapses(self):
+        """Test the timer writes pending changes without an explicit flush"""
+
+        self.tm.commit_window = 0.05
+        self.tm.add_transaction("Coffee", "Food", "2025-05-01", "expense", 3.5, "no")
+        timer = self.tm._commit_timer
+        timer.join(timeout=5)
+        self.assertEqual(self.stored_ids(), ["1"])
+        self.assertIsNone(self.tm._commit_timer)
+
+    def test_failed_timer_write_is_raised(self):
+        """Test an error from the timer's write is raised by the next mutation, with nothing lost"""
+
+        self.tm.commit_window = 0.05
+        with mock.patch.object(self.tm.backend, "commit", side_effect=OSError("disk full")):
+            self.tm.add_transaction("Coffee", "Food", "2025-05-01", "expense", 3.5, "no")
+            self.tm._commit_timer.join(timeout=5)
+        self.assertEqual(self.stored_ids(), [])
+        with self.assertRaisesRegex(OSError, "disk full"):
+            self.tm.add_transaction("Bus", "Transportation", "2025-05-02", "expense", 2.0, "yes")
+        self.assertEqual(self.stored_ids(), ["1", "2"])
+        self.tm.flush()  # reported once
+
+    def test_batch_keeps_earlier_changes(self):
+        """Test a failed batch does not discard changes made before it"""
+
+        self.tm.add_transaction("Coffee", "Food", "2025-05-01", "expense", 3.5, "no")
+        with self.assertRaises(RuntimeError):
+            with self.tm.batch():
+                self.tm.add_transaction("Bus", "Transportation", "2025-05-02", "expense", 2.0, "yes")
+                raise RuntimeError("abort")
+        self.assertEqual(self.stored_ids(), ["1"])
+        self.assertEqual([t["id"] for t in self.tm.load_transactions()], ["1"])
+
 if __name__ == "__main__":
 
     unittest.main()
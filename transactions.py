@@ -1,72 +1,366 @@
-import csv
-import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from index import TransactionIndex
+from money import to_cents
+from records import RowTable, Transaction, parse_id
+from storage import FIELDNAMES, CsvBackend, JournaledCsvBackend, has_journal
+
+def _locked(method):
+    """Run a TransactionManager method while holding the manager's lock."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 class TransactionManager:
 
-    def __init__(self, csv_file="transactions.csv"):
+    def __init__(self, csv_file="transactions.csv", autoflush=True, backend=None, commit_window=0,
+                 journal=False):
+        """
+        Args:
+            csv_file (str): Path of the CSV file backing the store
+            autoflush (bool): Write every mutation through to disk right away.
+                When False, changes are kept in memory until flush() is called.
+            backend (StorageBackend): Where transactions are stored. Defaults
+                to a CsvBackend for csv_file.
+            commit_window (float): With autoflush, wait this many seconds
+                after a change before writing it, so a burst of changes is
+                saved in one durable write. 0 writes every change right away.
+            journal (bool): Record changes in a journal next to the CSV file
+                instead of rewriting it (see storage.JournaledCsvBackend).
+                Used automatically when csv_file already has a journal.
+        """
 
         self.csv_file = csv_file
-        self.fieldnames = ['id', 'transaction_name', 'transaction_category', 'date', 'income_expense', 'amount', 'essential']
+        self.fieldnames = list(FIELDNAMES)
+        if backend is None:
+            journaled = journal or has_journal(csv_file)
+            backend = (JournaledCsvBackend if journaled else CsvBackend)(csv_file, self.fieldnames)
+        self.backend = backend
+        self.autoflush = autoflush
+        self.commit_window = commit_window
+
+        # Resident copy of the stored rows (records.Transaction objects) in
+        # storage order, a RowTable keyed by Transaction.id (int for numeric
+        # ids) that also keeps rows whose id repeats or is blank.
+        # It is valid only while the backend still reports _file_state.
+        self._rows = RowTable()
+        self._next_id = 1
+        self._file_state = None
+        self._loaded = False
+
+        # Changes not yet written to the backend
+        self._pending_appends = []
+        self._pending_updates = set()
+        self._pending_deletes = set()
+
+        # Group commit: a timer flushes the changes made within commit_window.
+        # The lock keeps that flush from racing the caller's mutations. An
+        # error from that flush is kept for the next flush() to raise.
+        self._commit_timer = None
+        self._commit_error = None
+        self._lock = threading.RLock()
+
+        # Date and category indexes for where(); kept current like any listener
+        self.index = TransactionIndex()
+
+        # Objects told about every change, see add_listener()
+        self._listeners = [self.index]
+
+    @_locked
+    def add_listener(self, listener):
+        """
+        Keep an object (e.g. a reports.RunningSummary) in sync with the store.
+
+        The listener must provide on_reload(rows), on_add(row),
+        on_update(old_row, new_row) and on_delete(row). It is called with the
+        current rows right away and then with a delta for every mutation, so
+        it never has to rescan the whole ledger.
+
+        The rows passed are the store's own objects; in on_update, old_row is
+        a copy from before the change and new_row the updated object. IDs
+        may repeat in a hand-edited file, so listeners that need to find a
+        row again track it by identity rather than by id.
+        """
+        self._ensure_loaded()
+        self._listeners.append(listener)
+        listener.on_reload(list(self._rows.values()))
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+
+    def _notify(self, event, *rows):
+        for listener in self._listeners:
+            getattr(listener, event)(*rows)
+
+    def _has_pending(self):
+        return bool(self._pending_appends or self._pending_updates or self._pending_deletes)
+
+    def _discard_pending(self):
+        self._pending_appends = []
+        self._pending_updates = set()
+        self._pending_deletes = set()
 
+    @_locked
+    def _ensure_loaded(self):
+        """
+        Make sure the in-memory rows reflect what is stored.
+
+        Storage is only re-read when the backend's state (mtime and size for
+        a CSV file) differs from what we recorded after our own last read or
+        write. Unflushed local changes always win over outside edits.
+        """
+        if self._has_pending():
+            return
+        state = self.backend.state()
+        if self._loaded and state == self._file_state:
+            return
+
+        rows, max_id = self.backend.load()
+        self._rows = RowTable(rows)
+        self._next_id = max_id + 1
+        self._file_state = state
+        self._loaded = True
+        if self._listeners:
+            self._notify('on_reload', list(self._rows.values()))
+
+    def refresh(self):
+        """Reload from storage if it was changed by someone else."""
+        self._ensure_loaded()
+
+    def _changed(self):
+        """Write pending changes through to disk unless flushing is deferred."""
+        if not self.autoflush:
+            return
+        if self.commit_window <= 0 or self._commit_error is not None:
+            self.flush()
+        elif self._commit_timer is None:
+            # Not a daemon thread, so changes still pending at exit get written
+            self._commit_timer = threading.Timer(self.commit_window, self._commit_window_elapsed)
+            self._commit_timer.start()
+
+    @_locked
+    def _commit_window_elapsed(self):
+        self._commit_timer = None
+        if self.autoflush:  # inside batch() the batch flushes when it ends
+            try:
+                self.flush()
+            except Exception as e:
+                # Nobody waits on the timer thread; the changes stay pending
+                self._commit_error = e
+
+    @_locked
+    def flush(self):
+        """
+        Write all pending in-memory changes to the backend.
+
+        Raises:
+            Exception: The error of a write the commit window timer tried
+                since the last flush. Its changes are written again first,
+                so they are saved if the storage has recovered. After a
+                failed timer write, the next mutation flushes right away,
+                so it raises the error too.
+        """
+        if self._commit_timer is not None:
+            self._commit_timer.cancel()
+            self._commit_timer = None
+        error, self._commit_error = self._commit_error, None
+        if self._has_pending():
+            self.backend.commit(self._rows.values(), self._pending_appends,
+                                self._pending_updates, self._pending_deletes)
+            self._file_state = self.backend.state()
+        self._discard_pending()
+        if error is not None:
+            raise error
+
+    @contextmanager
+    def batch(self):
+        """
+        Defer all writes until the block exits, then flush them in one pass.
+
+        If the block raises, the unflushed changes are discarded and the store
+        is reloaded from disk on next access.
+
+            with tm.batch():
+                for row in rows:
+                    tm.add_transaction(**row)
+        """
+        if self._commit_timer is not None:
+            self.flush()  # changes from before the batch must not be discarded with it
+        autoflush = self.autoflush
+        self.autoflush = False
+        try:
+            yield self
+        except BaseException:
+            self._discard_pending()
+            self._loaded = False
+            self._ensure_loaded()
+            raise
+        else:
+            if autoflush:
+                self.flush()
+        finally:
+            self.autoflush = autoflush
+
+    @_locked
     def load_transactions(self):
-        """Load all transactions from the CSV file."""
+        """
+        Load all transactions, re-reading the CSV file only if it changed.
 
-        transactions = []
-        if os.path.exists(self.csv_file):
+        Returns:
+            list: Copies of the records.Transaction objects, in storage order
+        """
+
+        self._ensure_loaded()
+        return [t.copy() for t in self._rows.values()]
+
+    @_locked
+    def where(self, start_date=None, end_date=None, category=None):
+        """
+        Return the transactions in a date range and/or category.
+
+        Uses the date and category indexes, so only the matching rows are
+        touched. The result can be passed to any Reports summary method.
+
+        Args:
+            start_date (str): Earliest date to include (YYYY-MM-DD)
+            end_date (str): Latest date to include (YYYY-MM-DD)
+            category (str): Only include this transaction category
+
+        Returns:
+            list: Copies of the matching Transactions, in storage order
+
+        Raises:
+            ValueError: If a bound is not a valid date
+        """
+        self._ensure_loaded()
+        return [t.copy() for t in self.index.query(start_date, end_date, category)]
 
-            with open(self.csv_file, mode='r', newline='') as file:
+    def iter_transactions(self, chunk_size=10000):
+        """
+        Yield transactions in chunks straight from storage, without caching them.
 
-                reader = csv.DictReader(file)
-                for row in reader:
-                    try:
-                        # Convert amount to float
-                        row['amount'] = float(row['amount'])
-                        transactions.append(row)
-                    except (ValueError, KeyError) as e:
-                        continue  # skip bad rows
-        return transactions
+        Unflushed changes are flushed first so the stream sees them.
 
+        Args:
+            chunk_size (int): Maximum number of rows per yielded list
+
+        Yields:
+            list: records.Transaction objects
+        """
+        self.flush()
+        yield from self.backend.iter_chunks(chunk_size)
+
+    @_locked
     def save_transactions(self, data):
         """Save a list of transaction dictionaries to the CSV file."""
-        with open(self.csv_file, mode='w', newline='') as file:
-            writer = csv.DictWriter(file, fieldnames=self.fieldnames)
-            writer.writeheader()
-            for row in data:
-                writer.writerow(row)
+        self.backend.write_all(data)
+
+        # Re-read on next access so the cache matches exactly what was written
+        self._discard_pending()
+        self._loaded = False
 
+    @_locked
     def add_transaction(self, name, transaction_category, date, income_expense, amount, essential):
-        """Add a new transaction to the CSV file."""
-
-        transactions = self.load_transactions()
-        
-        # Generate new ID
-        new_id = 1
-        if transactions:
-            new_id = max(int(t['id']) for t in transactions) + 1
-            
-        new_transaction = {
-            'id': str(new_id),
+        """Add a new transaction, appending it to the CSV file."""
+
+        self._ensure_loaded()
+        new_id = self._next_id
+        self._next_id += 1
+
+        row = Transaction.from_row({
+            'id': new_id,
             'transaction_name': name,
             'transaction_category': transaction_category,
             'date': date,
             'income_expense': income_expense,
-            'amount': str(amount),
+            'amount': amount,
             'essential': essential
-        }
-        transactions.append(new_transaction)
-        self.save_transactions(transactions)
+        })
+        self._pending_appends.append(row)
+        self._rows.add(row)
+        self._notify('on_add', row)
+        self._changed()
+
+    def _validate_row(self, row):
+        """
+        Check a transaction dictionary and return it as a Transaction without an id.
+
+        Raises:
+            ValueError: If a field is missing or has an invalid value
+            TypeError: If the date or amount is of a type that cannot hold one
+        """
+        cleaned = {}
+        for field in self.fieldnames[1:]:
+            if field not in row:
+                raise ValueError(f"missing field '{field}'")
+            cleaned[field] = row[field]
+
+        if cleaned['income_expense'] not in ('income', 'expense'):
+            raise ValueError(f"income_expense must be 'income' or 'expense', got {cleaned['income_expense']!r}")
+        datetime.strptime(cleaned['date'], '%Y-%m-%d')
+        return Transaction.from_row(cleaned)
+
+    @_locked
+    def add_transactions(self, rows):
+        """
+        Add many transactions and persist them with a single write.
+
+        Every row is validated before anything is stored, so either all rows
+        are added or none are.
+
+        Args:
+            rows (iterable): Transaction dictionaries keyed like the CSV
+                columns (any 'id' is ignored; IDs are assigned in sequence)
+
+        Returns:
+            list: The IDs (str) given to the new transactions, in order
+
+        Raises:
+            ValueError: If any row is invalid
+        """
+        cleaned = []
+        for i, row in enumerate(rows):
+            try:
+                cleaned.append(self._validate_row(row))
+            except (ValueError, TypeError) as e:
+                raise ValueError(f"row {i}: {e}") from None
+
+        self._ensure_loaded()
+        new_ids = []
+        for row in cleaned:
+            row.id = self._next_id
+            self._next_id += 1
+            self._rows.add(row)
+            self._pending_appends.append(row)
+            new_ids.append(row['id'])
+            self._notify('on_add', row)
+
+        if new_ids:
+            self._changed()
+        return new_ids
 
     def get_transactions(self):
         """Return all transactions."""
 
         return self.load_transactions()
 
+    @_locked
     def delete_transaction(self, transaction_id):
-        """Delete a transaction by ID."""
-        transactions = self.load_transactions()
-        updated = [t for t in transactions if t['id'] != str(transaction_id)]
-        self.save_transactions(updated)
+        """Delete a transaction by ID (every row with that ID, if it repeats)."""
+        self._ensure_loaded()
+        key = parse_id(transaction_id)
+        removed = self._rows.remove(key)
+        if removed:
+            self._pending_deletes.add(key)
+            for row in removed:
+                self._notify('on_delete', row)
+            self._changed()
 
+    @_locked
     def update_transaction(self, transaction_id, updated_data):
         """
         Update a transaction by ID.
@@ -74,14 +368,38 @@ class TransactionManager:
         Args:
             transaction_id (str): ID of transaction to update
             updated_data (dict): Dictionary of updated values
+
+        Raises:
+            ValueError: If the amount is not a number, or a new id is not an
+                integer or belongs to another transaction. Nothing is changed.
         """
-        transactions = self.load_transactions()
-        for t in transactions:
-            if t['id'] == str(transaction_id):
-                for field in self.fieldnames:
+        self._ensure_loaded()
+        key = parse_id(transaction_id)
+        t = self._rows.get(key)
+        if t is None:
+            return
+
+        if 'id' in updated_data:
+            new_key = parse_id(str(updated_data['id']))
+            if type(new_key) is not int:
+                raise ValueError(f"id must be an integer, got {updated_data['id']!r}")
+            if new_key != key and new_key in self._rows:
+                raise ValueError(f"id {new_key} is already used by another transaction")
+        cents = to_cents(updated_data['amount']) if 'amount' in updated_data else t.cents
+        old = t.copy()
+        for field in self.fieldnames:
+
+            if field in updated_data:
+                t[field] = str(updated_data[field])
+        t.cents = cents
 
-                    if field in updated_data:
-                        t[field] = str(updated_data[field])
-                break
-            
-        self.save_transactions(transactions)
+        if t.id != key:
+            # ID changed: re-key the row while keeping file order
+            self._rows.rekey(key, t)
+            self._next_id = max(self._next_id, t.id + 1)
+            self._pending_deletes.add(key)
+            self._pending_appends.append(t)
+        else:
+            self._pending_updates.add(t.id)
+        self._notify('on_update', old, t)
+        self._changed()